@@ -0,0 +1,92 @@
+"""
+ResponseCache microbenchmark
+
+Measures per-operation latency of get/set/evict at increasing cache sizes.
+With O(1) eviction the per-op latency should stay flat as CACHE_SIZE grows.
+
+Usage:
+    python benchmarks/bench_cache.py [--sizes 1000 10000 100000] [--ops 200000]
+    python benchmarks/bench_cache.py --shards 8 --threads 8
+"""
+import argparse
+import hashlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.cache_service import create_response_cache  # noqa: E402
+
+
+def _keys(count: int, offset: int = 0) -> list:
+    return [hashlib.sha256(str(i + offset).encode()).hexdigest() for i in range(count)]
+
+
+def bench(size: int, ops: int, shards: int = 1) -> dict:
+    """Fill a cache of ``size`` entries, then time set-at-capacity and get"""
+    cache = create_response_cache(size, 3600, shards)
+    for key in _keys(size):
+        cache.set(key, "x")
+
+    # Every set below is a miss at capacity and therefore evicts
+    new_keys = _keys(ops, offset=size)
+    start = time.perf_counter()
+    for key in new_keys:
+        cache.set(key, "x")
+    set_ns = (time.perf_counter() - start) / ops * 1e9
+
+    start = time.perf_counter()
+    for key in new_keys:
+        cache.get(key)
+    get_ns = (time.perf_counter() - start) / ops * 1e9
+
+    return {'size': size, 'set_evict_ns': set_ns, 'get_ns': get_ns}
+
+
+def bench_threaded(size: int, ops: int, shards: int, threads: int) -> float:
+    """Run mixed get/set from several threads, return wall-clock ns per op"""
+    cache = create_response_cache(size, 3600, shards)
+    per_thread = ops // threads
+    key_sets = [_keys(per_thread, offset=i * per_thread) for i in range(threads)]
+
+    def worker(keys: list) -> None:
+        for key in keys:
+            if cache.get(key) is None:
+                cache.set(key, "x")
+
+    workers = [threading.Thread(target=worker, args=(keys,)) for keys in key_sets]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--ops', type=int, default=200_000)
+    parser.add_argument('--shards', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.threads > 1:
+        print(f"{'CACHE_SIZE':>12} | {'shards':>6} | {'threads':>7} | {'ns/op':>8}")
+        print("-" * 44)
+        for size in args.sizes:
+            ns = bench_threaded(size, args.ops, args.shards, args.threads)
+            print(f"{size:>12,} | {args.shards:>6} | {args.threads:>7} | {ns:>8.0f}")
+        return
+
+    print(f"{'CACHE_SIZE':>12} | {'set+evict ns/op':>16} | {'get ns/op':>10}")
+    print("-" * 46)
+    for size in args.sizes:
+        result = bench(size, args.ops, args.shards)
+        print(f"{result['size']:>12,} | {result['set_evict_ns']:>16.0f} | {result['get_ns']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Streaming copy benchmark
+
+Compares characters copied and shipped to the UI per response for the old
+``full_response += chunk; yield full_response`` loop against delta streaming
+with coalesced updates (StreamBuffer + coalesce_stream).
+
+Usage:
+    python benchmarks/bench_streaming.py [--tokens 4000] [--tokens-per-sec 250] [--interval 0.05]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.streaming import coalesce_stream  # noqa: E402
+
+CHUNK = "word "  # ~1 token per streamed chunk
+
+
+def quadratic(tokens: int) -> dict:
+    """Old behaviour: rebuild and ship the whole response on every chunk"""
+    full_response = ""
+    copied = shipped = updates = 0
+    for _ in range(tokens):
+        full_response += CHUNK
+        copied += len(full_response)
+        shipped += len(full_response)
+        updates += 1
+    return {'copied': copied, 'shipped': shipped, 'updates': updates}
+
+
+def coalesced(tokens: int, tokens_per_sec: float, interval: float) -> dict:
+    """Delta streaming, with a simulated clock advancing at the model's token rate"""
+    clock = [0.0]
+
+    def deltas():
+        for _ in range(tokens):
+            clock[0] += 1.0 / tokens_per_sec
+            yield CHUNK
+
+    copied = shipped = updates = 0
+    for text in coalesce_stream(deltas(), interval, clock=lambda: clock[0]):
+        copied += len(text)  # one join per flush
+        shipped += len(text)
+        updates += 1
+    return {'copied': copied, 'shipped': shipped, 'updates': updates}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tokens', type=int, default=4000)
+    parser.add_argument('--tokens-per-sec', type=float, default=250.0)
+    parser.add_argument('--interval', type=float, default=0.05)
+    args = parser.parse_args()
+
+    before = quadratic(args.tokens)
+    after = coalesced(args.tokens, args.tokens_per_sec, args.interval)
+
+    print(f"{args.tokens} tokens @ {args.tokens_per_sec:.0f} tok/s, {args.interval * 1000:.0f} ms coalescing")
+    print(f"{'':>12} | {'UI updates':>10} | {'chars copied':>14} | {'chars shipped':>14}")
+    print("-" * 60)
+    for name, result in (("before", before), ("after", after)):
+        print(f"{name:>12} | {result['updates']:>10,} | {result['copied']:>14,} | {result['shipped']:>14,}")
+    print(f"\nReduction: {before['shipped'] / max(1, after['shipped']):.0f}x fewer characters shipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Static prompt size report
+
+Prints the estimated token overhead of every reasoning mode / template pair
+(system prompt plus template, before any query or history), as reported by
+PromptEngine.size_report(). With --max-tokens it exits non-zero when any pair
+is over the limit, so CI can catch prompt bloat.
+
+Usage:
+    python benchmarks/prompt_sizes.py [--max-tokens 1500]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.prompt_engine import PromptEngine  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max-tokens', type=int, default=None)
+    args = parser.parse_args()
+
+    report = PromptEngine.size_report()
+    templates = list(report['templates'])
+    width = max(len(mode) for mode in report['overhead'])
+
+    print(f"{'template':>{width}} | " + " | ".join(f"{name[:10]:>10}" for name in templates))
+    print(f"{'(tokens)':>{width}} | " + " | ".join(f"{report['templates'][name]:>10,}" for name in templates))
+    print("-" * (width + 13 * len(templates)))
+    for mode, row in report['overhead'].items():
+        print(f"{mode:>{width}} | " + " | ".join(f"{row[name]:>10,}" for name in templates))
+    print(f"\nSelf-critique prompt: {report['critique']:,} tokens plus the response")
+
+    largest = max(tokens for row in report['overhead'].values() for tokens in row.values())
+    if args.max_tokens is not None and largest > args.max_tokens:
+        print(f"\nFAIL: largest prompt overhead is {largest:,} tokens (limit {args.max_tokens:,})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 """
 API layer package initialization
 """
+from .client_pool import GroqClientPool, GroqKey
 from .groq_client import GroqClientManager
 
-__all__ = ['GroqClientManager']
+__all__ = [
+    'GroqClientManager',
+    'GroqClientPool',
+    'GroqKey'
+]
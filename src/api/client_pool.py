@@ -0,0 +1,162 @@
+"""
+Multi-key Groq client pool with least-loaded routing
+"""
+import itertools
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+from groq import Groq, AsyncGroq
+from src.services.rate_limiter import RateLimiter, TokenRateLimiter
+from src.utils.logger import logger
+
+
+class GroqKey:
+    """
+    🔑 ONE API KEY AND ITS QUOTA STATE
+    Groq's request and token limits apply per key, so every key carries its
+    own request limiter and per-model token limiter
+    """
+    
+    def __init__(self, api_key: str, client: Groq, async_client: AsyncGroq,
+                 rate_limiter: RateLimiter, token_limiter: TokenRateLimiter):
+        self.name = f"…{api_key[-4:]}"
+        self.client = client
+        self.async_client = async_client
+        self.rate_limiter = rate_limiter
+        self.token_limiter = token_limiter
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.ejected_until = 0.0
+    
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+
+class GroqClientPool:
+    """
+    🔀 GROQ CLIENT POOL
+    Routes each request to the healthy key with the fewest requests in
+    flight, breaking ties by the most remaining request budget and then
+    round-robin. Keys that fail authentication or run out of their request
+    quota are ejected for a while; when every key is ejected ``acquire``
+    returns None, so callers fail fast instead of queueing on a dead key.
+    """
+    
+    def __init__(self, keys: List[GroqKey]):
+        if not keys:
+            raise ValueError("GroqClientPool needs at least one key")
+        self.keys = keys
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+    
+    def _pick(self, exclude: Iterable[GroqKey], ejected: bool = False) -> Optional[GroqKey]:
+        """
+        Least-loaded healthy candidate (lock must be held); None if all are
+        excluded or ejected. With ``ejected``, falls back to the soonest back
+        """
+        now = time.monotonic()
+        candidates = [key for key in self.keys if key not in exclude]
+        healthy = [key for key in candidates if not key.is_ejected(now)]
+        if not healthy:
+            return min(candidates, key=lambda key: key.ejected_until) if ejected and candidates else None
+        
+        start = next(self._rotation) % len(self.keys)
+        
+        def load(key: GroqKey) -> tuple:
+            position = (self.keys.index(key) - start) % len(self.keys)
+            return key.in_flight, -key.rate_limiter.get_stats()['remaining'], position
+        
+        return min(healthy, key=load)
+    
+    def acquire(self, exclude: Iterable[GroqKey] = ()) -> Optional[GroqKey]:
+        """
+        🔑 LEASE THE LEAST-LOADED KEY
+        Counts it as in flight until ``release``; None if every key is excluded or ejected
+        """
+        with self._lock:
+            key = self._pick(tuple(exclude))
+            if key is not None:
+                key.in_flight += 1
+                key.requests += 1
+            return key
+    
+    def release(self, key: GroqKey) -> None:
+        """
+        🔓 END A LEASE
+        """
+        with self._lock:
+            key.in_flight -= 1
+    
+    def eject(self, key: GroqKey, seconds: float, reason: str) -> None:
+        """
+        ⏏️ TAKE A KEY OUT OF ROTATION FOR ``seconds``
+        """
+        with self._lock:
+            key.errors += 1
+            key.ejected_until = max(key.ejected_until, time.monotonic() + seconds)
+        logger.warning(f"⏏️ API key {key.name} ejected for {seconds:.0f}s ({reason})")
+    
+    def has_healthy(self, exclude: Iterable[GroqKey] = ()) -> bool:
+        """
+        ✅ WHETHER ANY KEY OUTSIDE ``exclude`` IS IN ROTATION
+        """
+        now = time.monotonic()
+        excluded = tuple(exclude)
+        with self._lock:
+            return any(key not in excluded and not key.is_ejected(now) for key in self.keys)
+    
+    def available_in(self, exclude: Iterable[GroqKey] = ()) -> float:
+        """
+        ⏳ SECONDS UNTIL A KEY OUTSIDE ``exclude`` IS BACK IN ROTATION
+        """
+        now = time.monotonic()
+        excluded = tuple(exclude)
+        with self._lock:
+            returns = [key.ejected_until - now for key in self.keys if key not in excluded]
+        return max(0.0, min(returns, default=0.0))
+    
+    def observe_waits(self, on_wait: Optional[Callable[[float], None]]) -> None:
+        """
+        ⏳ REPORT EVERY KEY'S RATE-LIMIT WAITS TO ``on_wait``
+        """
+        for key in self.keys:
+            key.rate_limiter.on_wait = on_wait
+            key.token_limiter.on_wait = on_wait
+            for bucket in key.token_limiter.buckets.values():
+                bucket.on_wait = on_wait
+    
+    def get_stats(self) -> List[dict]:
+        """
+        📊 PER-KEY ROUTING STATISTICS
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = list(self.keys)
+        return [{
+            'key': key.name,
+            'in_flight': key.in_flight,
+            'requests': key.requests,
+            'errors': key.errors,
+            'ejected_for': round(max(0.0, key.ejected_until - now), 1),
+            'remaining': key.rate_limiter.get_stats()['remaining']
+        } for key in keys]
+    
+    def peek(self) -> GroqKey:
+        """The key ``acquire`` would pick (or the soonest back), without leasing it"""
+        with self._lock:
+            return self._pick((), ejected=True)
+    
+    @property
+    def client(self) -> Groq:
+        """
+        ✅ CLIENT OF THE LEAST-LOADED KEY
+        """
+        return self.peek().client
+    
+    @property
+    def async_client(self) -> AsyncGroq:
+        """
+        ✅ ASYNC CLIENT OF THE LEAST-LOADED KEY
+        """
+        return self.peek().async_client
@@ -1,10 +1,15 @@
 """
 Groq API client manager with singleton pattern
 """
+import asyncio
+import importlib.util
 import os
 import threading
 from typing import Optional
-from groq import Groq
+import httpx
+from groq import Groq, AsyncGroq
+from src.api.client_pool import GroqClientPool, GroqKey
+from src.services.rate_limiter import RateLimiter, TokenRateLimiter
 from src.utils.logger import logger
 from src.config.settings import AppConfig
 
@@ -16,7 +21,10 @@ class GroqClientManager:
     """
     _instance: Optional['GroqClientManager'] = None
     _lock = threading.Lock()
-    _client: Optional[Groq] = None
+    _pool: Optional[GroqClientPool] = None
+    _http_client: Optional[httpx.Client] = None
+    _async_http_client: Optional[httpx.AsyncClient] = None
+    _http2 = False
     _initialized = False
     
     def __new__(cls):
@@ -36,10 +44,14 @@ class GroqClientManager:
     def _initialize_client(self) -> None:
         """
         🔧 INITIALIZE GROQ CLIENT
+        One client per API key (GROQ_API_KEYS, comma-separated, or GROQ_API_KEY),
+        all sharing one HTTP connection pool
         """
-        api_key = os.getenv('GROQ_API_KEY')
+        api_keys = [key.strip() for key in os.getenv('GROQ_API_KEYS', '').split(',') if key.strip()]
+        if not api_keys and os.getenv('GROQ_API_KEY'):
+            api_keys = [os.getenv('GROQ_API_KEY')]
         
-        if not api_key:
+        if not api_keys:
             logger.error("❌ GROQ_API_KEY not found in environment variables")
             raise EnvironmentError(
                 "GROQ_API_KEY not set. Please add it to your .env file:\n"
@@ -47,30 +59,116 @@ class GroqClientManager:
             )
         
         try:
-            self._client = Groq(
-                api_key=api_key,
-                timeout=AppConfig.REQUEST_TIMEOUT
+            timeout = httpx.Timeout(AppConfig.REQUEST_TIMEOUT, connect=AppConfig.HTTP_CONNECT_TIMEOUT)
+            limits = httpx.Limits(
+                max_connections=AppConfig.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=AppConfig.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=AppConfig.HTTP_KEEPALIVE_EXPIRY
+            )
+            # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+            self._http2 = AppConfig.ENABLE_HTTP2 and importlib.util.find_spec('h2') is not None
+            
+            self._http_client = httpx.Client(timeout=timeout, limits=limits, http2=self._http2)
+            self._async_http_client = httpx.AsyncClient(timeout=timeout, limits=limits, http2=self._http2)
+            self._pool = GroqClientPool([
+                GroqKey(
+                    api_key,
+                    Groq(api_key=api_key, timeout=timeout, http_client=self._http_client),
+                    AsyncGroq(api_key=api_key, timeout=timeout, http_client=self._async_http_client),
+                    RateLimiter(AppConfig.RATE_LIMIT_REQUESTS, AppConfig.RATE_LIMIT_WINDOW),
+                    TokenRateLimiter(AppConfig.RATE_LIMIT_TPM, AppConfig.RATE_LIMIT_TPM_MODELS)
+                )
+                for api_key in api_keys
+            ])
+            logger.info(
+                f"✅ Groq client initialized successfully "
+                f"({len(api_keys)} API key(s), {'HTTP/2' if self._http2 else 'HTTP/1.1'}, "
+                f"pool of {AppConfig.HTTP_MAX_CONNECTIONS})"
             )
-            logger.info("✅ Groq client initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Groq client: {e}")
             raise
     
     @property
-    def client(self) -> Groq:
+    def pool(self) -> GroqClientPool:
         """
-        ✅ GET GROQ CLIENT INSTANCE
+        🔀 GET THE PER-KEY CLIENT POOL
         """
-        if self._client is None:
+        if self._pool is None:
             raise RuntimeError("Groq client not initialized")
-        return self._client
+        return self._pool
+    
+    @property
+    def client(self) -> Groq:
+        """
+        ✅ GET GROQ CLIENT INSTANCE (OF THE LEAST-LOADED KEY)
+        """
+        return self.pool.client
+    
+    @property
+    def async_client(self) -> AsyncGroq:
+        """
+        ✅ GET ASYNC GROQ CLIENT INSTANCE (OF THE LEAST-LOADED KEY)
+        """
+        return self.pool.async_client
+    
+    def warm_up(self) -> bool:
+        """
+        🔥 OPEN A POOLED CONNECTION AHEAD OF THE FIRST REQUEST
+        Pays the DNS/TCP/TLS handshake at startup so the first chat request
+        reuses a kept-alive connection. Needs no API key and spends no quota;
+        the async pool warms on its first request (its connections belong to
+        the event loop that serves them)
+        """
+        if self._pool is None or self._http_client is None:
+            return False
+        
+        try:
+            self._http_client.head(str(self._pool.client.base_url))
+            logger.info("🔥 Groq connection pool warmed up")
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Connection warm-up failed: {e}")
+            return False
+    
+    def get_pool_stats(self) -> dict:
+        """
+        📊 GET CONNECTION POOL STATISTICS
+        httpx has no public API for this: the counts come from the transport's
+        private httpcore pool (``_transport._pool.connections``, as laid out in
+        httpx 0.23-0.28). If that layout changes, ``pool_stats`` is False and
+        the counts stay at zero instead of failing
+        """
+        stats = {
+            'http2': self._http2,
+            'max_connections': AppConfig.HTTP_MAX_CONNECTIONS,
+            'max_keepalive': AppConfig.HTTP_MAX_KEEPALIVE,
+            'pool_stats': True,
+            'connections': 0,
+            'active': 0,
+            'idle': 0
+        }
+        for http_client in (self._http_client, self._async_http_client):
+            if http_client is None:
+                continue
+            try:
+                idle = [connection.is_idle() for connection in list(http_client._transport._pool.connections)]
+            except (AttributeError, TypeError):
+                stats['pool_stats'] = False
+                continue
+            stats['connections'] += len(idle)
+            stats['idle'] += sum(idle)
+            stats['active'] += len(idle) - sum(idle)
+        
+        stats['utilization'] = round(stats['active'] / stats['max_connections'] * 100, 1)
+        return stats
     
     def health_check(self) -> bool:
         """
         🏥 HEALTH CHECK
         """
         try:
-            if self._client is None:
+            if self._pool is None:
                 logger.warning("⚠️ Health check failed: Client not initialized")
                 return False
             
@@ -85,6 +183,28 @@ class GroqClientManager:
         🔄 RESET CLIENT (FOR TESTING)
         """
         with self._lock:
-            self._client = None
+            if self._http_client is not None:
+                self._http_client.close()
+            if self._async_http_client is not None:
+                self._close_async_client(self._async_http_client)
+            self._pool = None
+            self._http_client = None
+            self._async_http_client = None
             self._initialized = False
             logger.info("🔄 Groq client reset")
+    
+    @staticmethod
+    def _close_async_client(http_client: httpx.AsyncClient) -> None:
+        """Close the async client on the running event loop, or on a fresh one if there is none"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        try:
+            if loop is not None:
+                loop.create_task(http_client.aclose())
+            else:
+                asyncio.run(http_client.aclose())
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close the async HTTP client: {e}")
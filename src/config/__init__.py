@@ -2,7 +2,7 @@
 Configuration package initialization
 """
 from .settings import AppConfig
-from .constants import ReasoningMode, ModelConfig
+from .constants import AUTO_MODEL_ID, ReasoningMode, ModelConfig
 from .env import load_environment
 
-__all__ = ['AppConfig', 'ReasoningMode', 'ModelConfig', 'load_environment']
+__all__ = ['AppConfig', 'AUTO_MODEL_ID', 'ReasoningMode', 'ModelConfig', 'load_environment']
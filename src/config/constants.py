@@ -3,6 +3,9 @@ Application constants and enums
 """
 from enum import Enum
 
+# Model choice that lets the router pick a ModelConfig entry per request
+AUTO_MODEL_ID = "auto"
+
 
 class ReasoningMode(Enum):
     """
@@ -111,3 +114,8 @@ class ModelConfig(Enum):
     def is_fast(self) -> bool:
         """Check if model is optimized for speed"""
         return "instant" in self.model_id.lower() or self.params_b < 10
+    
+    @property
+    def is_chat(self) -> bool:
+        """Check if model serves general chat (not a guard model or deprecated)"""
+        return "guard" not in self.model_id.lower() and "deprecated" not in self.description.lower()
@@ -22,6 +22,9 @@ def load_environment() -> None:
     # Validate required environment variables
     required_vars = ['GROQ_API_KEY']
     missing_vars = [var for var in required_vars if not os.getenv(var)]
+    if os.getenv('GROQ_API_KEYS'):
+        # Several comma-separated keys stand in for GROQ_API_KEY
+        missing_vars = [var for var in missing_vars if var != 'GROQ_API_KEY']
     
     if missing_vars:
         logger.error(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
@@ -18,6 +18,13 @@ class AppConfig:
     # Conversation Settings
     MAX_HISTORY_LENGTH: ClassVar[int] = int(os.getenv('MAX_HISTORY_LENGTH', '10'))
     MAX_CONVERSATION_STORAGE: ClassVar[int] = int(os.getenv('MAX_CONVERSATION_STORAGE', '1000'))
+    CONTEXT_MAX_PROMPT_TOKENS: ClassVar[int] = int(os.getenv('CONTEXT_MAX_PROMPT_TOKENS', '6000'))  # cap per request
+    CONTEXT_MIN_PROMPT_TOKENS: ClassVar[int] = int(os.getenv('CONTEXT_MIN_PROMPT_TOKENS', '1024'))  # never less
+    CONTEXT_SAFETY_MARGIN: ClassVar[float] = float(os.getenv('CONTEXT_SAFETY_MARGIN', '0.1'))  # for estimate error
+    STABLE_PROMPT_PREFIX: ClassVar[bool] = os.getenv('STABLE_PROMPT_PREFIX', 'false').lower() == 'true'
+    ENABLE_SUMMARY: ClassVar[bool] = os.getenv('ENABLE_SUMMARY', 'false').lower() == 'true'
+    SUMMARY_MODEL: ClassVar[str] = os.getenv('SUMMARY_MODEL', 'llama-3.1-8b-instant')
+    SUMMARY_MAX_TOKENS: ClassVar[int] = int(os.getenv('SUMMARY_MAX_TOKENS', '400'))
     
     # Model Parameters
     DEFAULT_TEMPERATURE: ClassVar[float] = float(os.getenv('DEFAULT_TEMPERATURE', '0.7'))
@@ -32,22 +39,52 @@ class AppConfig:
     REQUEST_TIMEOUT: ClassVar[int] = int(os.getenv('REQUEST_TIMEOUT', '60'))
     MAX_RETRIES: ClassVar[int] = int(os.getenv('MAX_RETRIES', '3'))
     RETRY_DELAY: ClassVar[float] = float(os.getenv('RETRY_DELAY', '1.0'))
+    HTTP_CONNECT_TIMEOUT: ClassVar[float] = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5.0'))
+    HTTP_MAX_CONNECTIONS: ClassVar[int] = int(os.getenv('HTTP_MAX_CONNECTIONS', '20'))
+    HTTP_MAX_KEEPALIVE: ClassVar[int] = int(os.getenv('HTTP_MAX_KEEPALIVE', '10'))
+    HTTP_KEEPALIVE_EXPIRY: ClassVar[float] = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60'))
+    ENABLE_HTTP2: ClassVar[bool] = os.getenv('ENABLE_HTTP2', 'true').lower() == 'true'
+    ENABLE_CONNECTION_WARMUP: ClassVar[bool] = os.getenv('ENABLE_CONNECTION_WARMUP', 'true').lower() == 'true'
+    KEY_EJECT_SECONDS: ClassVar[int] = int(os.getenv('KEY_EJECT_SECONDS', '300'))  # after an auth failure
     
     # Cache Settings
     CACHE_SIZE: ClassVar[int] = int(os.getenv('CACHE_SIZE', '100'))
     CACHE_TTL: ClassVar[int] = int(os.getenv('CACHE_TTL', '3600'))
     ENABLE_CACHE: ClassVar[bool] = os.getenv('ENABLE_CACHE', 'true').lower() == 'true'
+    CACHE_SHARDS: ClassVar[int] = int(os.getenv('CACHE_SHARDS', '1'))
+    CACHE_PERSIST: ClassVar[bool] = os.getenv('CACHE_PERSIST', 'false').lower() == 'true'
+    CACHE_COMPACT_INTERVAL: ClassVar[int] = int(os.getenv('CACHE_COMPACT_INTERVAL', '300'))
+    ENABLE_SEMANTIC_CACHE: ClassVar[bool] = os.getenv('ENABLE_SEMANTIC_CACHE', 'false').lower() == 'true'
+    SEMANTIC_CACHE_THRESHOLD: ClassVar[float] = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.9'))
+    CACHE_REPLAY_MODE: ClassVar[str] = os.getenv('CACHE_REPLAY_MODE', 'instant').lower()  # instant | original | fixed
+    CACHE_REPLAY_RATE: ClassVar[float] = float(os.getenv('CACHE_REPLAY_RATE', '50'))  # chunks/s in fixed mode
+    ENABLE_SINGLE_FLIGHT: ClassVar[bool] = os.getenv('ENABLE_SINGLE_FLIGHT', 'true').lower() == 'true'
     
     # Rate Limiting
     RATE_LIMIT_REQUESTS: ClassVar[int] = int(os.getenv('RATE_LIMIT_REQUESTS', '50'))
     RATE_LIMIT_WINDOW: ClassVar[int] = int(os.getenv('RATE_LIMIT_WINDOW', '60'))
     ENABLE_RATE_LIMITING: ClassVar[bool] = os.getenv('ENABLE_RATE_LIMITING', 'true').lower() == 'true'
+    RATE_LIMIT_TPM: ClassVar[int] = int(os.getenv('RATE_LIMIT_TPM', '30000'))  # tokens per minute, per model
+    RATE_LIMIT_TPM_MODELS: ClassVar[dict] = {  # per-model overrides: "model_id=tpm,model_id=tpm"
+        model.strip(): int(limit) for model, _, limit in
+        (item.partition('=') for item in os.getenv('RATE_LIMIT_TPM_MODELS', '').split(',') if '=' in item)
+    }
+    MAX_RATE_LIMIT_WAIT: ClassVar[float] = float(os.getenv('MAX_RATE_LIMIT_WAIT', '60'))  # seconds; longer fails fast
+    
+    # Model Routing
+    ENABLE_MODEL_FALLBACK: ClassVar[bool] = os.getenv('ENABLE_MODEL_FALLBACK', 'false').lower() == 'true'
+    ROUTER_MAX_FALLBACKS: ClassVar[int] = int(os.getenv('ROUTER_MAX_FALLBACKS', '2'))  # other models tried per call
+    ROUTER_LATENCY_WINDOW: ClassVar[int] = int(os.getenv('ROUTER_LATENCY_WINDOW', '100'))  # samples kept per model
+    ROUTER_LATENCY_BUDGET: ClassVar[float] = float(os.getenv('ROUTER_LATENCY_BUDGET', '2.0'))  # p95 TTFT seconds for auto
+    ROUTER_COOLDOWN: ClassVar[float] = float(os.getenv('ROUTER_COOLDOWN', '60'))  # seconds a failing model sits out
     
     # File Storage
     BASE_DIR: ClassVar[Path] = Path(__file__).parent.parent.parent
     EXPORT_DIR: ClassVar[Path] = BASE_DIR / os.getenv('EXPORT_DIR', 'exports')
     BACKUP_DIR: ClassVar[Path] = BASE_DIR / os.getenv('BACKUP_DIR', 'backups')
     LOG_DIR: ClassVar[Path] = BASE_DIR / 'logs'
+    CACHE_DIR: ClassVar[Path] = BASE_DIR / os.getenv('CACHE_DIR', 'cache')
+    CACHE_DB_PATH: ClassVar[Path] = CACHE_DIR / 'responses.db'
     MAX_EXPORT_SIZE_MB: ClassVar[int] = 50
     
     # UI Theme
@@ -59,8 +96,16 @@ class AppConfig:
     ENABLE_ANALYTICS: ClassVar[bool] = True
     ANALYTICS_BATCH_SIZE: ClassVar[int] = 10
     
+    # Streaming
+    STREAM_UPDATE_INTERVAL: ClassVar[float] = float(os.getenv('STREAM_UPDATE_INTERVAL', '0.05'))  # seconds
+    STREAM_UPDATE_MAX_CHARS: ClassVar[int] = int(os.getenv('STREAM_UPDATE_MAX_CHARS', '4096'))
+    STREAM_RESUME: ClassVar[bool] = os.getenv('STREAM_RESUME', 'true').lower() == 'true'  # continue cut-off streams
+    
     # Performance
     MAX_WORKERS: ClassVar[int] = int(os.getenv('MAX_WORKERS', '3'))
+    ENGINE_WORKERS: ClassVar[int] = int(os.getenv('ENGINE_WORKERS', '0'))  # 0 = largest fan-out; <= MAX_WORKERS
+    ENABLE_ASYNC_STREAMING: ClassVar[bool] = os.getenv('ENABLE_ASYNC_STREAMING', 'true').lower() == 'true'
+    MAX_CONCURRENT_STREAMS: ClassVar[int] = int(os.getenv('MAX_CONCURRENT_STREAMS', '64'))
     ENABLE_PARALLEL_PROCESSING: ClassVar[bool] = True
     
     # Security
@@ -73,6 +118,29 @@ class AppConfig:
     ENABLE_SELF_CRITIQUE: ClassVar[bool] = True
     ENABLE_SIDEBAR_TOGGLE: ClassVar[bool] = True
     
+    # Self-Critique
+    CRITIQUE_MODE: ClassVar[str] = os.getenv('CRITIQUE_MODE', 'sequential').lower()  # sequential | pipelined
+    CRITIQUE_TRIGGER_TOKENS: ClassVar[int] = int(os.getenv('CRITIQUE_TRIGGER_TOKENS', '300'))
+    CRITIQUE_MODEL: ClassVar[str] = os.getenv('CRITIQUE_MODEL', '')  # empty = same model as the answer
+    
+    # Reasoning Engines (multi-call implementations of reasoning modes)
+    ENABLE_REASONING_ENGINES: ClassVar[bool] = os.getenv('ENABLE_REASONING_ENGINES', 'false').lower() == 'true'
+    SC_SAMPLES: ClassVar[int] = int(os.getenv('SC_SAMPLES', '5'))
+    SC_QUORUM: ClassVar[int] = int(os.getenv('SC_QUORUM', '3'))  # agreeing paths that end sampling early
+    SC_CLUSTER_THRESHOLD: ClassVar[float] = float(os.getenv('SC_CLUSTER_THRESHOLD', '0.8'))
+    SC_MIN_TEMPERATURE: ClassVar[float] = float(os.getenv('SC_MIN_TEMPERATURE', '0.5'))  # floor for sampling
+    TOT_BEAM_WIDTH: ClassVar[int] = int(os.getenv('TOT_BEAM_WIDTH', '2'))
+    TOT_BRANCHING: ClassVar[int] = int(os.getenv('TOT_BRANCHING', '3'))  # candidate steps per path per level
+    TOT_MAX_DEPTH: ClassVar[int] = int(os.getenv('TOT_MAX_DEPTH', '2'))
+    TOT_EVAL_CACHE_SIZE: ClassVar[int] = int(os.getenv('TOT_EVAL_CACHE_SIZE', '512'))
+    DEBATE_AGENTS: ClassVar[int] = int(os.getenv('DEBATE_AGENTS', '3'))
+    DEBATE_ROUNDS: ClassVar[int] = int(os.getenv('DEBATE_ROUNDS', '3'))
+    DEBATE_MODELS: ClassVar[list] = [m.strip() for m in os.getenv('DEBATE_MODELS', '').split(',') if m.strip()]
+    DEBATE_JUDGE_MODEL: ClassVar[str] = os.getenv('DEBATE_JUDGE_MODEL', '')  # empty = selected model
+    DEBATE_CONVERGENCE: ClassVar[float] = float(os.getenv('DEBATE_CONVERGENCE', '0.7'))
+    REFLEXION_MAX_ITERATIONS: ClassVar[int] = int(os.getenv('REFLEXION_MAX_ITERATIONS', '3'))
+    REFLEXION_MIN_DELTA: ClassVar[float] = float(os.getenv('REFLEXION_MIN_DELTA', '0.02'))  # fraction of the draft
+    
     @classmethod
     def validate(cls) -> bool:
         """Validates all configuration parameters"""
@@ -84,10 +152,31 @@ class AppConfig:
             assert cls.MIN_TOKENS <= cls.DEFAULT_MAX_TOKENS <= cls.MAX_TOKENS
             assert cls.MAX_HISTORY_LENGTH > 0
             assert cls.MAX_CONVERSATION_STORAGE >= cls.MAX_HISTORY_LENGTH
+            assert cls.CONTEXT_MAX_PROMPT_TOKENS > 0 and 0.0 <= cls.CONTEXT_SAFETY_MARGIN < 1.0
+            assert 0 < cls.CONTEXT_MIN_PROMPT_TOKENS <= cls.CONTEXT_MAX_PROMPT_TOKENS
+            assert 0 < cls.SUMMARY_MAX_TOKENS < cls.CONTEXT_MAX_PROMPT_TOKENS
             assert cls.CACHE_SIZE > 0 and cls.CACHE_TTL > 0
+            assert cls.CACHE_SHARDS >= 1 and cls.CACHE_COMPACT_INTERVAL > 0
+            assert 0.0 < cls.SEMANTIC_CACHE_THRESHOLD <= 1.0
+            assert cls.CACHE_REPLAY_MODE in ('instant', 'original', 'fixed') and cls.CACHE_REPLAY_RATE > 0
             assert cls.RATE_LIMIT_REQUESTS > 0 and cls.RATE_LIMIT_WINDOW > 0
+            assert cls.MAX_RATE_LIMIT_WAIT >= 0
+            assert cls.RATE_LIMIT_TPM > 0 and all(limit > 0 for limit in cls.RATE_LIMIT_TPM_MODELS.values())
+            assert cls.ROUTER_MAX_FALLBACKS >= 0 and cls.ROUTER_LATENCY_WINDOW >= 1
+            assert cls.ROUTER_LATENCY_BUDGET > 0 and cls.ROUTER_COOLDOWN >= 0
             assert cls.REQUEST_TIMEOUT > 0 and cls.MAX_RETRIES >= 0
-            assert 1 <= cls.MAX_WORKERS <= 10
+            assert 0 < cls.HTTP_CONNECT_TIMEOUT <= cls.REQUEST_TIMEOUT
+            assert 1 <= cls.HTTP_MAX_KEEPALIVE <= cls.HTTP_MAX_CONNECTIONS and cls.HTTP_KEEPALIVE_EXPIRY > 0
+            assert cls.KEY_EJECT_SECONDS > 0
+            assert 1 <= cls.MAX_WORKERS <= 10 and cls.ENGINE_WORKERS >= 0
+            assert cls.MAX_CONCURRENT_STREAMS >= 1
+            assert cls.CRITIQUE_MODE in ('sequential', 'pipelined') and cls.CRITIQUE_TRIGGER_TOKENS > 0
+            assert 1 <= cls.SC_QUORUM <= cls.SC_SAMPLES and 0.0 < cls.SC_CLUSTER_THRESHOLD <= 1.0
+            assert 0.0 <= cls.SC_MIN_TEMPERATURE <= 2.0
+            assert min(cls.TOT_BEAM_WIDTH, cls.TOT_BRANCHING, cls.TOT_MAX_DEPTH, cls.TOT_EVAL_CACHE_SIZE) >= 1
+            assert cls.DEBATE_AGENTS >= 1 and cls.DEBATE_ROUNDS >= 1 and 0.0 < cls.DEBATE_CONVERGENCE <= 1.0
+            assert cls.REFLEXION_MAX_ITERATIONS >= 1 and 0.0 <= cls.REFLEXION_MIN_DELTA < 1.0
+            assert cls.STREAM_UPDATE_INTERVAL >= 0 and cls.STREAM_UPDATE_MAX_CHARS > 0
             assert cls.MAX_INPUT_LENGTH >= 1000
             
             logger.info("✅ Configuration validation passed")
@@ -102,7 +191,7 @@ class AppConfig:
         # Import logger here to avoid circular import
         from src.utils.logger import logger
         
-        directories = [cls.EXPORT_DIR, cls.BACKUP_DIR, cls.LOG_DIR]
+        directories = [cls.EXPORT_DIR, cls.BACKUP_DIR, cls.LOG_DIR, cls.CACHE_DIR]
         
         try:
             for directory in directories:
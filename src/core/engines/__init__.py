@@ -0,0 +1,16 @@
+"""
+Multi-call reasoning engines
+"""
+from .base import ReasoningEngine
+from .self_consistency import SelfConsistencyEngine
+from .tree_of_thoughts import TreeOfThoughtsEngine
+from .debate import DebateEngine
+from .reflexion import ReflexionEngine
+
+__all__ = [
+    'ReasoningEngine',
+    'SelfConsistencyEngine',
+    'TreeOfThoughtsEngine',
+    'DebateEngine',
+    'ReflexionEngine'
+]
@@ -0,0 +1,58 @@
+"""
+Base class for multi-call reasoning engines
+"""
+import contextvars
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Generator, List, Optional
+from src.models.metrics import ConversationMetrics
+from src.utils.tokens import token_counter
+
+# (messages, model, temperature, max_tokens, stage_tokens=None): the reasoner's streaming call,
+# which appends the completion tokens of each request it sends to ``stage_tokens``
+CallAPI = Callable[..., Generator[str, None, None]]
+
+
+def stage_tokens(reported: List[int], text: str) -> int:
+    """Completion tokens the API reported for a stage's calls, or ``text`` counted locally if none were"""
+    return sum(reported) if reported else token_counter.count(text)
+
+
+class ReasoningEngine:
+    """
+    ⚙️ MULTI-CALL REASONING ENGINE
+    Replaces the single completion of a reasoning mode with an orchestrated
+    set of API calls run on the reasoner's worker pool. ``run`` streams
+    progress and the final answer as deltas, and may set ``depth`` and
+    ``confidence`` on the response state for metrics.
+    """
+    
+    def __init__(self, call_api: CallAPI, executor: Executor, metrics: ConversationMetrics):
+        self.call_api = call_api
+        self.executor = executor
+        self.metrics = metrics
+    
+    def run(self, state: Any, history: List[Dict], template: str) -> Generator[str, None, None]:
+        raise NotImplementedError
+    
+    def complete(self, messages: List[Dict], model: str, temperature: float, max_tokens: int,
+                 cancel: Optional[threading.Event] = None, tokens: Optional[List[int]] = None) -> str:
+        """
+        🔌 RUN ONE COMPLETION TO THE END
+        Stops reading (and closes the stream) as soon as ``cancel`` is set;
+        the reported completion tokens go to ``tokens``
+        """
+        parts = []
+        stream = self.call_api(messages, model, temperature, max_tokens, stage_tokens=tokens)
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    break
+                parts.append(chunk)
+        finally:
+            stream.close()
+        return "".join(parts)
+    
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Schedule a call on the reasoner's worker pool, in the caller's context (for token accounting)"""
+        return self.executor.submit(contextvars.copy_context().run, fn, *args)
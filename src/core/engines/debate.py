@@ -0,0 +1,149 @@
+"""
+Multi-agent debate engine (Du et al., 2023)
+"""
+import itertools
+import re
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, List, Optional
+from src.core.engines.base import ReasoningEngine, stage_tokens
+from src.core.prompt_engine import PromptEngine
+from src.services.semantic_index import SemanticCacheIndex
+from src.utils.helpers import normalize_query
+from src.utils.logger import logger
+
+
+@dataclass
+class _Turn:
+    """One agent's argument in one round"""
+    agent: int
+    name: str
+    model: str
+    text: str
+    tokens: int = 0
+    
+    @property
+    def position(self) -> str:
+        """The agent's one-sentence position (whole argument if it gave none)"""
+        matches = DebateEngine.POSITION_PATTERN.findall(self.text)
+        return matches[-1].strip().strip("*").strip() if matches else self.text
+
+
+class DebateEngine(ReasoningEngine):
+    """
+    🗣️ CONCURRENT MULTI-AGENT DEBATE
+    Every round, all agents argue in parallel (each persona may run on its
+    own model) and arguments stream out as they finish. Rounds stop early
+    once the agents' stated positions converge, measured by MinHash
+    similarity; a judge then streams the synthesis.
+    """
+    
+    POSITION_PATTERN = re.compile(r"position\**\s*[:：]\s*\**\s*(.+)", re.IGNORECASE)
+    ARGUMENT_WORDS = 200
+    ARGUMENT_TOKENS = 500
+    
+    def __init__(self, call_api, executor, metrics, agents: int = 3, rounds: int = 3,
+                 models: Optional[List[str]] = None, judge_model: str = "",
+                 convergence: float = 0.7):
+        super().__init__(call_api, executor, metrics)
+        self.agents = agents
+        self.rounds = rounds
+        self.models = list(models or [])
+        self.judge_model = judge_model
+        self.convergence = convergence
+        self._signer = SemanticCacheIndex(convergence)  # only used to sign positions
+        self.personas = list(itertools.islice(itertools.cycle(PromptEngine.DEBATE_PERSONAS), agents))
+    
+    def agreement(self, turns: List[_Turn]) -> float:
+        """Mean pairwise similarity of the agents' positions (1.0 for a single agent)"""
+        signatures = [self._signer.signature(normalize_query(turn.position)) for turn in turns]
+        pairs = list(itertools.combinations(signatures, 2))
+        if not pairs:
+            return 1.0
+        return sum(self._signer.similarity(a, b) for a, b in pairs) / len(pairs)
+    
+    def _argue(self, agent: int, model: str, temperature: float, problem: str,
+               previous: Optional[List[_Turn]]) -> _Turn:
+        persona = self.personas[agent]
+        if previous is None:
+            messages = PromptEngine.build_debate_messages(
+                "opening", persona, problem=problem, words=self.ARGUMENT_WORDS
+            )
+        else:
+            # An agent whose last turn failed argues from the others' turns alone
+            own = next((turn.text for turn in previous if turn.agent == agent), None)
+            own = own or "(none - you missed the last round; respond to the arguments below)"
+            others = "\n\n".join(f"**{turn.name}:** {turn.text}" for turn in previous if turn.agent != agent)
+            messages = PromptEngine.build_debate_messages(
+                "rebuttal", persona, problem=problem, own=own, others=others, words=self.ARGUMENT_WORDS
+            )
+        tokens: List[int] = []
+        text = self.complete(messages, model, temperature, self.ARGUMENT_TOKENS, tokens=tokens)
+        return _Turn(agent, persona[0], model, text.strip(), stage_tokens(tokens, text))
+    
+    def run(self, state: Any, history: List[Dict], template: str) -> Generator[str, None, None]:
+        """
+        🗣️ DEBATE IN ROUNDS, THEN STREAM THE JUDGE'S SYNTHESIS
+        """
+        problem = PromptEngine.apply_template(template, state.query)
+        models = [self.models[i % len(self.models)] if self.models else state.model
+                  for i in range(self.agents)]
+        
+        yield f"### 🗣️ Multi-Agent Debate: {self.agents} agents, up to {self.rounds} rounds\n\n"
+        
+        previous: Optional[List[_Turn]] = None
+        agreement = 0.0
+        rounds_run = 0
+        for round_number in range(1, self.rounds + 1):
+            round_start = time.time()
+            futures = {
+                self.submit(self._argue, agent, models[agent], state.temperature, problem, previous): agent
+                for agent in range(self.agents)
+            }
+            
+            yield f"#### Round {round_number}\n\n"
+            turns: List[_Turn] = []
+            for future in as_completed(futures):
+                try:
+                    turn = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Debate agent {futures[future] + 1} failed: {e}")
+                    continue
+                turns.append(turn)
+                yield f"**{turn.name}** ({turn.model}):\n{turn.text}\n\n"
+            
+            if not turns:
+                if previous is None:
+                    raise RuntimeError("All debate agents failed")
+                break
+            
+            turns.sort(key=lambda turn: turn.agent)
+            rounds_run = round_number
+            agreement = self.agreement(turns)
+            self.metrics.record_stage(f"debate_round_{round_number}", time.time() - round_start,
+                                      sum(turn.tokens for turn in turns))
+            previous = turns
+            
+            if agreement >= self.convergence:
+                yield f"*Positions converged ({agreement:.0%} agreement) - ending the debate early.*\n\n"
+                break
+        
+        state.depth = rounds_run
+        state.confidence = 100.0 * agreement
+        logger.info(f"🗣️ Debate finished after {rounds_run} round(s), agreement {agreement:.2f}")
+        
+        yield "---\n\n### ⚖️ Judge's Synthesis\n\n"
+        
+        judge_start = time.time()
+        parts, tokens = [], []
+        transcript = "\n\n".join(f"**{turn.name}:** {turn.text}" for turn in previous)
+        # The judge may run on a model with a smaller window than the one requested
+        judge = self.judge_model or state.model
+        max_tokens = PromptEngine.completion_budget(judge, state.max_tokens)
+        messages = PromptEngine.build_debate_messages("judge", history=history, model=judge, max_tokens=max_tokens,
+                                                      problem=problem, transcript=transcript)
+        for chunk in self.call_api(messages, judge, state.temperature, max_tokens, stage_tokens=tokens):
+            parts.append(chunk)
+            yield chunk
+        self.metrics.record_stage("debate_judge", time.time() - judge_start, stage_tokens(tokens, "".join(parts)))
@@ -0,0 +1,100 @@
+"""
+Reflexion engine with patch-based refinement (Shinn et al., 2023)
+"""
+import re
+import time
+from typing import Any, Dict, Generator, List, Tuple
+from src.core.engines.base import ReasoningEngine, stage_tokens
+from src.core.prompt_engine import PromptEngine
+from src.config.constants import ReasoningMode
+from src.utils.logger import logger
+from src.utils.tokens import token_counter
+
+
+class ReflexionEngine(ReasoningEngine):
+    """
+    🔁 ITERATIVE REFLEXION WITH INCREMENTAL EDITS
+    Streams a draft, then repeatedly asks for SEARCH/REPLACE edits against
+    it instead of a full rewrite, applying them locally. Iteration stops
+    when a pass changes less than ``min_delta`` of the draft. Output tokens
+    a full rewrite would have cost are reported as tokens saved. The draft
+    streams in a collapsible section and only the final answer is kept
+    (``state.final_answer``), so the response isn't cached twice over.
+    """
+    
+    DRAFT_OPEN = "<details open>\n<summary>📝 Draft</summary>\n\n"
+    DRAFT_CLOSE = "\n\n</details>\n\n"
+    
+    PATCH_PATTERN = re.compile(
+        r"<{5,}\s*SEARCH[ \t]*\n(.*?)\n={5,}[ \t]*\n(.*?)\n?>{5,}\s*REPLACE", re.DOTALL
+    )
+    
+    def __init__(self, call_api, executor, metrics, max_iterations: int = 3, min_delta: float = 0.02):
+        super().__init__(call_api, executor, metrics)
+        self.max_iterations = max_iterations
+        self.min_delta = min_delta
+    
+    @classmethod
+    def apply_patches(cls, draft: str, reply: str) -> Tuple[str, int, float]:
+        """
+        🩹 APPLY SEARCH/REPLACE EDITS
+        Returns (new_draft, edits_applied, fraction_of_draft_changed); edits
+        whose SEARCH text isn't found verbatim are skipped
+        """
+        applied = 0
+        changed = 0
+        for search, replace in cls.PATCH_PATTERN.findall(reply):
+            if not search or search not in draft or search == replace:
+                continue
+            draft = draft.replace(search, replace, 1)
+            applied += 1
+            changed += max(len(search), len(replace))
+        return draft, applied, changed / max(1, len(draft))
+    
+    def run(self, state: Any, history: List[Dict], template: str) -> Generator[str, None, None]:
+        """
+        🔁 DRAFT, THEN REFINE WITH PATCHES
+        """
+        problem = PromptEngine.apply_template(template, state.query)
+        
+        draft_start = time.time()
+        parts, tokens = [], []
+        messages = PromptEngine.build_messages(state.query, ReasoningMode.CHAIN_OF_THOUGHT, template, history,
+                                               state.model, state.max_tokens)
+        yield self.DRAFT_OPEN
+        for chunk in self.call_api(messages, state.model, state.temperature, state.max_tokens, stage_tokens=tokens):
+            parts.append(chunk)
+            yield chunk
+        yield self.DRAFT_CLOSE
+        draft = original = "".join(parts)
+        self.metrics.record_stage("reflexion_draft", time.time() - draft_start, stage_tokens(tokens, draft))
+        
+        yield "### 🔁 Reflexion\n\n"
+        
+        passes = edits_total = tokens_saved = 0
+        for passes in range(1, self.max_iterations + 1):
+            pass_start = time.time()
+            tokens = []
+            reply = self.complete(PromptEngine.build_reflexion_messages(problem, draft),
+                                  state.model, state.temperature, state.max_tokens, tokens=tokens)
+            draft, applied, delta = self.apply_patches(draft, reply)
+            reply_tokens = stage_tokens(tokens, reply)
+            tokens_saved += max(0, token_counter.count(draft) - reply_tokens)  # what a full rewrite would cost
+            edits_total += applied
+            self.metrics.record_stage(f"reflexion_pass_{passes}", time.time() - pass_start, reply_tokens)
+            
+            yield f"- Pass {passes}: {applied} edit(s) applied, {delta:.0%} of the draft changed\n"
+            if delta < self.min_delta:
+                break
+        
+        state.depth = passes
+        state.corrections = edits_total
+        state.self_critiqued = True
+        state.final_answer = draft
+        self.metrics.add_tokens_saved(tokens_saved)
+        logger.info(f"🔁 Reflexion: {edits_total} edit(s) over {passes} pass(es), ~{tokens_saved} output tokens saved")
+        
+        if draft == original:
+            yield "\nNo changes were needed - the draft above is final.\n"
+        else:
+            yield f"\n### ✨ Refined Answer\n\n{draft}"
@@ -0,0 +1,159 @@
+"""
+Parallel Self-Consistency engine (Wang et al., 2022)
+"""
+import re
+import threading
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generator, List, Tuple
+from src.core.engines.base import ReasoningEngine
+from src.core.prompt_engine import PromptEngine
+from src.services.semantic_index import SemanticCacheIndex
+from src.utils.helpers import normalize_query
+from src.utils.logger import logger
+
+
+@dataclass
+class _AnswerCluster:
+    """Sampled paths whose final answers agree"""
+    answer: str
+    canonical: str
+    numbers: Tuple[str, ...]
+    signature: Tuple[int, ...]
+    members: List[int] = field(default_factory=list)
+
+
+class SelfConsistencyEngine(ReasoningEngine):
+    """
+    🎲 PARALLEL SELF-CONSISTENCY
+    Samples independent chain-of-thought solutions concurrently, clusters
+    their final answers (numbers must match exactly; only free-text answers
+    are grouped by similarity) and returns the majority. Stops as soon as a quorum
+    of paths agrees, so the slowest samples don't set the response latency.
+    """
+    
+    ANSWER_PATTERN = re.compile(r"final answer\**\s*[:：]\s*\**\s*(.+)", re.IGNORECASE)
+    NUMBER_PATTERN = re.compile(r"-?\d{1,3}(?:,\d{3})+(?:\.\d+)?|-?\d+(?:\.\d+)?")
+    
+    def __init__(self, call_api, executor, metrics, samples: int = 5, quorum: int = 3,
+                 cluster_threshold: float = 0.8, min_temperature: float = 0.5):
+        super().__init__(call_api, executor, metrics)
+        self.samples = samples
+        self.quorum = min(quorum, samples)
+        self.cluster_threshold = cluster_threshold
+        self.min_temperature = min_temperature
+        self._signer = SemanticCacheIndex(cluster_threshold)  # only used to sign answers
+    
+    @classmethod
+    def extract_answer(cls, text: str) -> str:
+        """
+        🎯 EXTRACT THE FINAL ANSWER OF A SAMPLED PATH
+        Falls back to the last non-empty line when no "Final Answer:" marker is present
+        """
+        matches = cls.ANSWER_PATTERN.findall(text)
+        if matches:
+            answer = matches[-1]
+        else:
+            lines = [line for line in text.strip().splitlines() if line.strip()]
+            answer = lines[-1] if lines else ""
+        return answer.strip().strip("*").strip()
+    
+    @staticmethod
+    def canonical(answer: str) -> str:
+        """Comparable form of an answer (numbers compare by value)"""
+        text = normalize_query(answer).strip("*`$ ").rstrip(".!")
+        try:
+            return format(float(text.replace(",", "")), "g")
+        except ValueError:
+            return text
+    
+    @classmethod
+    def numbers(cls, answer: str) -> Tuple[str, ...]:
+        """The numbers in an answer, in order and by value ("1,200.0" and "1200" are equal)"""
+        return tuple(format(float(number.replace(",", "")), "g") for number in cls.NUMBER_PATTERN.findall(answer))
+    
+    def _agree(self, cluster: _AnswerCluster, canonical: str, numbers: Tuple[str, ...],
+               signature: Tuple[int, ...]) -> bool:
+        """
+        Whether an answer matches a cluster: answers with numbers must have
+        exactly the same numbers; fuzzy similarity only groups free text
+        """
+        if cluster.canonical == canonical:
+            return True
+        if cluster.numbers or numbers:
+            return cluster.numbers == numbers
+        return self._signer.similarity(cluster.signature, signature) >= self.cluster_threshold
+    
+    def _assign(self, clusters: List[_AnswerCluster], answer: str, path: int) -> _AnswerCluster:
+        """Add a path to the cluster its answer matches, opening a new one if none does"""
+        canonical = self.canonical(answer)
+        numbers = self.numbers(canonical)
+        signature = self._signer.signature(canonical)
+        for cluster in clusters:
+            if self._agree(cluster, canonical, numbers, signature):
+                cluster.members.append(path)
+                return cluster
+        
+        cluster = _AnswerCluster(answer, canonical, numbers, signature, [path])
+        clusters.append(cluster)
+        return cluster
+    
+    def run(self, state: Any, history: List[Dict], template: str) -> Generator[str, None, None]:
+        """
+        🎲 SAMPLE, VOTE AND STREAM THE CONSENSUS
+        """
+        messages = PromptEngine.build_sample_messages(state.query, template, history, state.model, state.max_tokens)
+        cancel = threading.Event()
+        # Near-greedy sampling makes every path the same paid call, so sample at least this warm
+        temperature = max(state.temperature, self.min_temperature)
+        if temperature != state.temperature:
+            logger.info(f"🎲 Sampling at temperature {temperature} instead of {state.temperature}")
+        futures = {
+            self.submit(self.complete, messages, state.model, temperature, state.max_tokens, cancel): i
+            for i in range(self.samples)
+        }
+        
+        yield f"### 🎲 Self-Consistency: sampling {self.samples} reasoning paths\n\n"
+        
+        clusters: List[_AnswerCluster] = []
+        texts: Dict[int, str] = {}
+        winner = None
+        try:
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Self-consistency path {path + 1} failed: {e}")
+                    yield f"- Path {path + 1}: ⚠️ failed\n"
+                    continue
+                
+                texts[path] = text
+                answer = self.extract_answer(text)
+                cluster = self._assign(clusters, answer, path)
+                yield f"- Path {path + 1}: **{answer or '(no answer)'}**\n"
+                
+                if len(cluster.members) >= self.quorum:
+                    winner = cluster
+                    break
+        finally:
+            cancel.set()
+            for future in futures:
+                future.cancel()
+        
+        if not texts:
+            raise RuntimeError("All self-consistency samples failed")
+        
+        early = winner is not None and len(texts) < self.samples
+        if winner is None:
+            winner = max(clusters, key=lambda c: len(c.members))
+        
+        votes = len(winner.members)
+        state.depth = len(texts)
+        state.confidence = 100.0 * votes / len(texts)
+        logger.info(f"🎲 Self-consistency: {votes}/{len(texts)} paths agree"
+                    f"{' (quorum reached early)' if early else ''}")
+        
+        note = ", quorum reached early" if early else ""
+        yield f"\n**Consensus:** {winner.answer} ({votes}/{len(texts)} paths agree{note})\n\n---\n\n"
+        yield texts[winner.members[0]]
@@ -0,0 +1,162 @@
+"""
+Tree-of-Thoughts search engine (Yao et al., 2023)
+"""
+import hashlib
+import re
+import time
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, List, Tuple
+from src.core.engines.base import ReasoningEngine, stage_tokens
+from src.core.prompt_engine import PromptEngine
+from src.services.cache_service import ResponseCache
+from src.utils.logger import logger
+
+
+@dataclass
+class _Thought:
+    """A partial reasoning path and its evaluation score"""
+    steps: Tuple[str, ...]
+    score: float = 0.0
+    
+    @property
+    def text(self) -> str:
+        if not self.steps:
+            return "(no steps yet)"
+        return "\n".join(f"Step {i + 1}: {step}" for i, step in enumerate(self.steps))
+
+
+class TreeOfThoughtsEngine(ReasoningEngine):
+    """
+    🌳 BEAM-SEARCH TREE OF THOUGHTS
+    Each level expands every path in the beam into ``branching`` candidate
+    steps (one API call each), scores candidates in parallel as soon as
+    they arrive, and keeps the best ``beam_width``. Evaluations are
+    memoized by (state hash, model), so re-scoring a known path is free.
+    The final solution is streamed from the best path.
+    """
+    
+    SCORE_PATTERN = re.compile(r"score\W*(\d+(?:\.\d+)?)", re.IGNORECASE)
+    EXPAND_TOKENS = 300
+    EVALUATE_TOKENS = 80
+    
+    def __init__(self, call_api, executor, metrics, beam_width: int = 2, branching: int = 3,
+                 max_depth: int = 2, eval_cache_size: int = 512, eval_cache_ttl: int = 3600):
+        super().__init__(call_api, executor, metrics)
+        self.beam_width = beam_width
+        self.branching = branching
+        self.max_depth = max_depth
+        self.evaluations = ResponseCache(maxsize=eval_cache_size, ttl=eval_cache_ttl)
+    
+    @staticmethod
+    def _state_key(problem: str, thought: _Thought, model: str) -> str:
+        return hashlib.sha256(f"{model}|{problem}|{thought.text}".encode()).hexdigest()
+    
+    @classmethod
+    def parse_score(cls, text: str) -> float:
+        """Score from an evaluation reply (0 when it can't be read), clamped to 1-10"""
+        match = cls.SCORE_PATTERN.search(text)
+        return min(10.0, max(1.0, float(match.group(1)))) if match else 0.0
+    
+    def _expand(self, problem: str, parent: _Thought, index: int, state: Any) -> Tuple[str, int]:
+        messages = PromptEngine.build_tot_messages(
+            "expand", problem=problem, path=parent.text, index=index + 1, count=self.branching
+        )
+        tokens: List[int] = []
+        step = self.complete(messages, state.model, state.temperature, self.EXPAND_TOKENS, tokens=tokens).strip()
+        return step, stage_tokens(tokens, step)
+    
+    def _evaluate(self, problem: str, thought: _Thought, state: Any) -> Tuple[float, int]:
+        key = self._state_key(problem, thought, state.model)
+        cached = self.evaluations.get(key)
+        if cached is not None:
+            return cached, 0
+        
+        messages = PromptEngine.build_tot_messages("evaluate", problem=problem, path=thought.text)
+        tokens: List[int] = []
+        reply = self.complete(messages, state.model, 0.0, self.EVALUATE_TOKENS, tokens=tokens)
+        score = self.parse_score(reply)
+        self.evaluations.set(key, score)
+        return score, stage_tokens(tokens, reply)
+    
+    def _search_level(self, problem: str, beam: List[_Thought], state: Any) -> Tuple[List[_Thought], int]:
+        """
+        🔀 EXPAND AND SCORE ONE LEVEL
+        Returns the scored candidates and the tokens spent on them
+        """
+        expansions: Dict[Future, _Thought] = {
+            self.submit(self._expand, problem, parent, i, state): parent
+            for parent in beam for i in range(self.branching)
+        }
+        evaluations: Dict[Future, _Thought] = {}
+        seen = set()  # duplicate branches are only scored once
+        tokens = 0
+        
+        for future in as_completed(expansions):
+            try:
+                step, used = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Tree-of-Thoughts expansion failed: {e}")
+                continue
+            tokens += used
+            thought = _Thought(expansions[future].steps + (step,))
+            if step and thought.steps not in seen:
+                seen.add(thought.steps)
+                evaluations[self.submit(self._evaluate, problem, thought, state)] = thought
+        
+        candidates = []
+        for future in as_completed(evaluations):
+            try:
+                score, used = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Tree-of-Thoughts evaluation failed: {e}")
+                continue
+            tokens += used
+            thought = evaluations[future]
+            thought.score = score
+            candidates.append(thought)
+        
+        return candidates, tokens
+    
+    def run(self, state: Any, history: List[Dict], template: str) -> Generator[str, None, None]:
+        """
+        🌳 SEARCH, THEN STREAM THE SOLUTION ALONG THE BEST PATH
+        """
+        problem = PromptEngine.apply_template(template, state.query)
+        beam = [_Thought(())]
+        
+        yield (f"### 🌳 Tree of Thoughts: beam {self.beam_width}, "
+               f"{self.branching} branches, depth {self.max_depth}\n\n")
+        
+        depth = 0
+        for depth in range(1, self.max_depth + 1):
+            level_start = time.time()
+            candidates, tokens = self._search_level(problem, beam, state)
+            latency = time.time() - level_start
+            self.metrics.record_stage(f"tot_level_{depth}", latency, tokens)
+            
+            if not candidates:
+                if depth == 1:
+                    raise RuntimeError("Tree-of-Thoughts search produced no candidate steps")
+                depth -= 1
+                break
+            
+            beam = sorted(candidates, key=lambda t: t.score, reverse=True)[:self.beam_width]
+            yield (f"- **Level {depth}:** {len(candidates)} branches scored, kept {len(beam)} "
+                   f"(best {beam[0].score:g}/10) in {latency:.1f}s\n")
+        
+        best = beam[0]
+        state.depth = depth
+        state.confidence = best.score * 10
+        logger.info(f"🌳 Tree-of-Thoughts: best path scored {best.score:g}/10 at depth {depth}")
+        
+        yield f"\n**Selected path:**\n{best.text}\n\n---\n\n"
+        
+        solve_start = time.time()
+        parts, tokens = [], []
+        messages = PromptEngine.build_tot_messages("solve", history, state.model, state.max_tokens,
+                                                   problem=problem, path=best.text)
+        for chunk in self.call_api(messages, state.model, state.temperature, state.max_tokens, stage_tokens=tokens):
+            parts.append(chunk)
+            yield chunk
+        self.metrics.record_stage("tot_solve", time.time() - solve_start, stage_tokens(tokens, "".join(parts)))
@@ -1,9 +1,41 @@
 """
 Centralized prompt management and template system
 """
+import math
+import sys
 from typing import Dict, List, Optional
-from src.config.constants import ReasoningMode
+from src.config.constants import ReasoningMode, ModelConfig
+from src.config.settings import AppConfig
+from src.utils.helpers import truncate_text
 from src.utils.logger import logger
+from src.utils.tokens import MESSAGE_OVERHEAD_TOKENS, count_pieces, token_counter
+
+
+class CompiledPrompt:
+    """
+    📦 PROMPT PRECOMPILED AROUND ONE SLOT
+    The static text before and after the slot is split out, interned and
+    token-counted once, so rendering is a single concatenation instead of a
+    ``str.format`` pass over the whole multi-KB prompt
+    """
+    __slots__ = ("prefix", "suffix", "prefix_pieces", "suffix_pieces")
+    
+    def __init__(self, text: str, slot: Optional[str] = None):
+        prefix, found, suffix = text.partition(slot) if slot else (text, "", "")
+        if not found:
+            prefix, suffix = text, ""
+        self.prefix = sys.intern(prefix)
+        self.suffix = sys.intern(suffix)
+        self.prefix_pieces = count_pieces(prefix)
+        self.suffix_pieces = count_pieces(suffix)
+    
+    @property
+    def static_tokens(self) -> int:
+        """Estimated tokens of the static segments (calibrated like every other count)"""
+        return math.ceil((self.prefix_pieces + self.suffix_pieces) * token_counter.ratio)
+    
+    def render(self, value: str) -> str:
+        return self.prefix + value + self.suffix
 
 
 class PromptEngine:
@@ -540,14 +572,56 @@ Give straightforward, high-quality answers that directly address what the user n
 - Be concise while remaining complete[web:1][web:5]"""
     }
     
+    # Compiled forms of the prompts above, filled in by compile_prompts() at import
+    _COMPILED_SYSTEM: Dict[ReasoningMode, CompiledPrompt] = {}
+    _COMPILED_TEMPLATES: Dict[str, CompiledPrompt] = {}
+    _COMPILED_CRITIQUE: Dict[bool, CompiledPrompt] = {}
+    _STABLE_PREFIXES: Dict[tuple, str] = {}
+    
+    # Stable-prefix layout: the template's instructions join the system prompt and refer to the query
+    STABLE_TEMPLATE_SEPARATOR = "\n\n---\n\n**Apply this framework to the user's latest message:**\n\n"
+    STABLE_QUERY_MARKER = "[the user's latest message]"
+    
+    @classmethod
+    def compile_prompts(cls) -> None:
+        """
+        📦 PRECOMPILE THE STATIC PROMPTS
+        Runs once at import; call again after changing SYSTEM_PROMPTS or TEMPLATES
+        """
+        cls._COMPILED_SYSTEM = {mode: CompiledPrompt(prompt) for mode, prompt in cls.SYSTEM_PROMPTS.items()}
+        cls._COMPILED_TEMPLATES = {
+            name: CompiledPrompt(template, "{query}") for name, template in cls.TEMPLATES.items() if template
+        }
+        cls._COMPILED_CRITIQUE = {
+            partial: CompiledPrompt(cls.CRITIQUE_PROMPT.replace("{partial_note}", note), "{original_response}")
+            for partial, note in ((False, ""), (True, cls.CRITIQUE_PARTIAL_NOTE))
+        }
+        cls._STABLE_PREFIXES = {
+            (mode, name): sys.intern(
+                system.prefix + cls.STABLE_TEMPLATE_SEPARATOR + template.render(cls.STABLE_QUERY_MARKER)
+            )
+            for mode, system in cls._COMPILED_SYSTEM.items()
+            for name, template in cls._COMPILED_TEMPLATES.items()
+        }
+    
     @classmethod
     def get_system_prompt(cls, mode: ReasoningMode) -> str:
         """
         ✅ GET SYSTEM PROMPT FOR REASONING MODE
         """
-        prompt = cls.SYSTEM_PROMPTS.get(mode, cls.SYSTEM_PROMPTS[ReasoningMode.SIMPLE])
+        compiled = cls._COMPILED_SYSTEM.get(mode) or cls._COMPILED_SYSTEM[ReasoningMode.SIMPLE]
         logger.debug(f"📝 Retrieved system prompt for mode: {mode}")
-        return prompt
+        return compiled.prefix
+    
+    @classmethod
+    def get_stable_prefix(cls, mode: ReasoningMode, template_name: str) -> str:
+        """
+        🧩 SYSTEM PROMPT WITH THE TEMPLATE'S INSTRUCTIONS FOLDED IN
+        Byte-identical for every request with the same mode and template, so
+        the provider can reuse its cached prefix; the query goes in the user
+        message on its own
+        """
+        return cls._STABLE_PREFIXES.get((mode, template_name)) or cls.get_system_prompt(mode)
     
     @classmethod
     def apply_template(cls, template_name: str, query: str) -> str:
@@ -558,51 +632,329 @@ Give straightforward, high-quality answers that directly address what the user n
             logger.warning(f"⚠️ Template '{template_name}' not found, using query as-is")
             return query
         
-        template = cls.TEMPLATES[template_name]
+        compiled = cls._COMPILED_TEMPLATES.get(template_name)
         
-        if not template:  # Custom template
+        if compiled is None:  # Custom template
             return query
         
-        formatted = template.format(query=query)
+        formatted = compiled.render(query)
         logger.debug(f"📝 Applied template: {template_name}")
         return formatted
     
+    @classmethod
+    def size_report(cls) -> Dict:
+        """
+        📏 STATIC PROMPT SIZES IN TOKENS
+        Per system prompt, per template, for the critique prompt, and the
+        fixed overhead of every mode/template pair (system and user message
+        before any query or history) - for budgeting and catching bloat in CI
+        """
+        system = {mode.value: compiled.static_tokens for mode, compiled in cls._COMPILED_SYSTEM.items()}
+        templates = {
+            name: cls._COMPILED_TEMPLATES[name].static_tokens if name in cls._COMPILED_TEMPLATES else 0
+            for name in cls.TEMPLATES
+        }
+        return {
+            'system': system,
+            'templates': templates,
+            'critique': cls._COMPILED_CRITIQUE[False].static_tokens,
+            'overhead': {
+                mode: {name: tokens + template_tokens + 2 * MESSAGE_OVERHEAD_TOKENS
+                       for name, template_tokens in templates.items()}
+                for mode, tokens in system.items()
+            }
+        }
+    
+    @staticmethod
+    def context_budget(model: Optional[str] = None, max_tokens: Optional[int] = None) -> int:
+        """
+        📏 PROMPT TOKENS AVAILABLE FOR ONE CALL
+        The model's context window minus the completion budget, capped at
+        CONTEXT_MAX_PROMPT_TOKENS, less a safety margin for estimation error.
+        Never below CONTEXT_MIN_PROMPT_TOKENS (see completion_budget)
+        """
+        limit = AppConfig.CONTEXT_MAX_PROMPT_TOKENS
+        if model is not None:
+            try:
+                window = ModelConfig.get_by_id(model).max_context
+                completion = max_tokens or AppConfig.DEFAULT_MAX_TOKENS
+                limit = min(limit, max(window - completion, AppConfig.CONTEXT_MIN_PROMPT_TOKENS))
+            except ValueError:
+                pass
+        return max(0, int(limit * (1 - AppConfig.CONTEXT_SAFETY_MARGIN)))
+    
+    @staticmethod
+    def completion_budget(model: str, max_tokens: int) -> int:
+        """
+        📏 COMPLETION TOKENS THAT STILL LEAVE ROOM FOR THE PROMPT
+        ``max_tokens`` lowered so CONTEXT_MIN_PROMPT_TOKENS of the model's
+        window stay free; unknown models keep what was asked for
+        """
+        try:
+            window = ModelConfig.get_by_id(model).max_context
+        except ValueError:
+            return max_tokens
+        return max(AppConfig.MIN_TOKENS, min(max_tokens, window - AppConfig.CONTEXT_MIN_PROMPT_TOKENS))
+    
+    @staticmethod
+    def pack_history(history: Optional[List[Dict]], budget: int) -> List[Dict]:
+        """
+        📦 FIT THE MOST RECENT HISTORY INTO ``budget`` TOKENS
+        Messages are taken newest first until the next one doesn't fit.
+        Token counts are cached per message, so re-packing a growing
+        conversation every turn only counts what is new
+        """
+        packed, used = [], 0
+        for msg in reversed(history or []):
+            if msg.get("role") not in ["user", "assistant"]:
+                continue
+            cost = token_counter.count_message(msg)
+            if used + cost > budget:
+                break
+            packed.append({"role": msg["role"], "content": msg["content"]})
+            used += cost
+        
+        packed.reverse()
+        while packed and packed[0]["role"] == "assistant":
+            packed.pop(0)  # don't open with a reply whose question was cut
+        return packed
+    
+    @classmethod
+    def _with_history(cls, system: Dict, history: Optional[List[Dict]], user: Dict,
+                      model: Optional[str], max_tokens: Optional[int],
+                      summary: Optional[str] = None) -> List[Dict]:
+        """
+        System message, the running summary of older turns (if any), as much
+        recent history as the budget leaves room for, then the user message
+        """
+        head = [system]
+        if summary:
+            head.append({"role": "system", "content": cls.SUMMARY_HEADER + summary})
+        budget = cls.context_budget(model, max_tokens) - token_counter.count_messages(head + [user])
+        return head + cls.pack_history(history, budget) + [user]
+    
     @classmethod
     def build_messages(cls, 
-                      query: str, 
-                      mode: ReasoningMode,
-                      template: str = "Custom",
-                      history: Optional[List[Dict]] = None) -> List[Dict]:
+                       query: str, 
+                       mode: ReasoningMode,
+                       template: str = "Custom",
+                       history: Optional[List[Dict]] = None,
+                       model: Optional[str] = None,
+                       max_tokens: Optional[int] = None,
+                       summary: Optional[str] = None) -> List[Dict]:
         """
         ✅ BUILD MESSAGE ARRAY FOR API
+        History is packed into the prompt budget for ``model`` with room left
+        for ``max_tokens``, after the running ``summary`` of older turns.
+        With STABLE_PROMPT_PREFIX the template goes into the system message,
+        which then always comes first and never varies for a mode/template
         """
-        messages = [
-            {"role": "system", "content": cls.get_system_prompt(mode)}
+        if AppConfig.STABLE_PROMPT_PREFIX:
+            system = {"role": "system", "content": cls.get_stable_prefix(mode, template)}
+            formatted_query = query
+        else:
+            system = {"role": "system", "content": cls.get_system_prompt(mode)}
+            # Add current query with template
+            formatted_query = cls.apply_template(template, query)
+        user = {"role": "user", "content": formatted_query}
+        
+        messages = cls._with_history(system, history, user, model, max_tokens, summary)
+        
+        logger.debug(f"📝 Built message array with {len(messages)} messages")
+        return messages
+    
+    # Rolling summary of turns that no longer fit the prompt verbatim
+    SUMMARY_HEADER = "**Summary of the earlier conversation:**\n"
+    
+    SUMMARY_PROMPT = """**SUMMARY SO FAR:**
+{summary}
+
+**NEW TURNS TO FOLD IN:**
+{turns}
+
+Update the summary so it also covers the new turns. Keep facts, decisions, constraints, user preferences and open questions; drop pleasantries and worked-out detail. Reply with the updated summary only, in at most {words} words."""
+    
+    @classmethod
+    def build_summary_messages(cls, summary: str, turns: List[Dict], words: int,
+                               max_chars_per_turn: int = 2000) -> List[Dict]:
+        """
+        ✅ BUILD MESSAGES THAT FOLD TURNS INTO A RUNNING SUMMARY
+        """
+        text = "\n\n".join(
+            f"**{msg['role'].title()}:** {truncate_text(msg['content'], max_chars_per_turn)}" for msg in turns
+        )
+        return [
+            {"role": "system", "content": "You maintain a concise running summary of a conversation."},
+            {"role": "user", "content": cls.SUMMARY_PROMPT.format(
+                summary=summary or "(empty)", turns=text, words=words
+            )}
         ]
+    
+    # Appended to sampled paths so their answers can be extracted and compared
+    FINAL_ANSWER_INSTRUCTION = (
+        "\n\nReason independently, then end with a single line of the form:\n"
+        "**Final Answer:** <your answer, as short as possible>"
+    )
+    
+    # Tree-of-Thoughts search stages (the engine fills in the fields)
+    TOT_PROMPTS: Dict[str, str] = {
+        "expand": """**PROBLEM:**
+{problem}
+
+**REASONING SO FAR:**
+{path}
+
+Propose the single most useful next reasoning step toward solving the problem. This is candidate {index} of {count}, so take a distinct angle from the obvious one when you can. Reply with the step only, in at most a few sentences.""",
         
-        # Add conversation history
-        if history:
-            for msg in history[-10:]:  # Last 10 messages
-                if msg.get("role") in ["user", "assistant"]:
-                    messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    })
+        "evaluate": """**PROBLEM:**
+{problem}
+
+**PARTIAL REASONING:**
+{path}
+
+Rate how likely this reasoning is to lead to a correct and complete solution. Reply with "Score: N" (N from 1 to 10) followed by one sentence of justification.""",
         
-        # Add current query with template
-        formatted_query = cls.apply_template(template, query)
-        messages.append({"role": "user", "content": formatted_query})
+        "solve": """**PROBLEM:**
+{problem}
+
+**SELECTED REASONING PATH (from tree search):**
+{path}
+
+Write the complete final solution. Follow the selected path, correct any step that turns out to be wrong, and finish with a clear final answer."""
+    }
+    
+    @classmethod
+    def build_tot_messages(cls, stage: str, history: Optional[List[Dict]] = None,
+                           model: Optional[str] = None, max_tokens: Optional[int] = None, **fields) -> List[Dict]:
+        """
+        ✅ BUILD MESSAGES FOR ONE TREE-OF-THOUGHTS STAGE
+        Only the final "solve" stage sees the conversation history
+        """
+        system = {"role": "system", "content": "You are a careful, systematic problem solver."}
+        user = {"role": "user", "content": cls.TOT_PROMPTS[stage].format(**fields)}
+        return cls._with_history(system, history if stage == "solve" else None, user, model, max_tokens)
+    
+    # Multi-agent debate: (name, system prompt) per persona, cycled when there are more agents
+    DEBATE_PERSONAS: List[tuple] = [
+        ("Advocate", "You argue for the most well-supported answer, building the strongest positive case."),
+        ("Skeptic", "You probe for flaws, hidden assumptions, counterexamples and missing evidence."),
+        ("Pragmatist", "You focus on practical consequences, trade-offs and what actually works."),
+        ("Domain Expert", "You bring precise technical knowledge and correct factual errors."),
+    ]
+    
+    DEBATE_PROMPTS: Dict[str, str] = {
+        "opening": """**QUESTION:**
+{problem}
+
+Give your argument in at most {words} words. End with a single line of the form:
+**Position:** <your position in one sentence>""",
         
-        logger.debug(f"📝 Built message array with {len(messages)} messages")
+        "rebuttal": """**QUESTION:**
+{problem}
+
+**YOUR PREVIOUS ARGUMENT:**
+{own}
+
+**OTHER AGENTS' ARGUMENTS:**
+{others}
+
+Concede the points that are right, rebut the ones that are wrong, and refine your argument in at most {words} words. End with a single line of the form:
+**Position:** <your position in one sentence>""",
+        
+        "judge": """**QUESTION:**
+{problem}
+
+**FINAL ROUND OF THE DEBATE:**
+{transcript}
+
+As an impartial judge, synthesize the strongest arguments into the best final answer. Note where the agents agreed and how their disagreements should be resolved."""
+    }
+    
+    @classmethod
+    def build_debate_messages(cls, stage: str, persona: Optional[tuple] = None,
+                              history: Optional[List[Dict]] = None, model: Optional[str] = None,
+                              max_tokens: Optional[int] = None, **fields) -> List[Dict]:
+        """
+        ✅ BUILD MESSAGES FOR ONE DEBATE TURN
+        Agents speak in their persona; only the judge sees the conversation history
+        """
+        if persona is not None:
+            system = f"You are the {persona[0]} in a structured multi-agent debate. {persona[1]}"
+        else:
+            system = "You are an impartial judge synthesizing a multi-agent debate."
+        user = {"role": "user", "content": cls.DEBATE_PROMPTS[stage].format(**fields)}
+        return cls._with_history({"role": "system", "content": system},
+                                 history if stage == "judge" else None, user, model, max_tokens)
+    
+    # Reflexion: ask for targeted edits against the draft instead of a full rewrite
+    REFLEXION_PATCH_PROMPT = """**QUESTION:**
+{problem}
+
+**CURRENT DRAFT:**
+{draft}
+
+Critically review the draft for errors, gaps and unclear passages. Do NOT rewrite it. Reply only with the edits it needs, each in this exact form:
+
+<<<<<<< SEARCH
+<exact text copied from the draft>
+=======
+<replacement text>
+>>>>>>> REPLACE
+
+Keep each SEARCH block short but unique within the draft. To add new text, SEARCH for the sentence it should follow and repeat that sentence in the replacement. If the draft needs no changes, reply with NO CHANGES."""
+    
+    @classmethod
+    def build_reflexion_messages(cls, problem: str, draft: str) -> List[Dict]:
+        """
+        ✅ BUILD MESSAGES FOR ONE REFLEXION PASS
+        """
+        return [
+            {"role": "system", "content": "You are a critical reviewer who fixes drafts with minimal, precise edits."},
+            {"role": "user", "content": cls.REFLEXION_PATCH_PROMPT.format(problem=problem, draft=draft)}
+        ]
+    
+    CONTINUE_PROMPT = "Your previous response was cut off. Continue exactly where it stopped, without repeating anything."
+    
+    @classmethod
+    def build_continuation_messages(cls, messages: List[Dict], partial_response: str) -> List[Dict]:
+        """
+        ✅ BUILD MESSAGES THAT REQUEST ONLY THE REST OF AN INTERRUPTED RESPONSE
+        """
+        return messages + [
+            {"role": "assistant", "content": partial_response},
+            {"role": "user", "content": cls.CONTINUE_PROMPT}
+        ]
+    
+    @classmethod
+    def build_sample_messages(cls,
+                              query: str,
+                              template: str = "Custom",
+                              history: Optional[List[Dict]] = None,
+                              model: Optional[str] = None,
+                              max_tokens: Optional[int] = None) -> List[Dict]:
+        """
+        ✅ BUILD MESSAGES FOR ONE SELF-CONSISTENCY SAMPLE
+        A chain-of-thought solution that ends with an extractable final answer
+        """
+        messages = cls.build_messages(query, ReasoningMode.CHAIN_OF_THOUGHT, template, history, model, max_tokens)
+        messages[-1]["content"] += cls.FINAL_ANSWER_INSTRUCTION
         return messages
     
     @classmethod
-    def get_self_critique_prompt(cls, original_response: str) -> str:
+    def get_self_critique_prompt(cls, original_response: str, partial: bool = False) -> str:
         """
         ✅ GENERATE ENHANCED SELF-CRITIQUE PROMPT
+        ``partial`` marks a response that is still being written (pipelined critique)
         """
-        return f"""Perform rigorous self-critique and refinement of your previous response:
-
+        return cls._COMPILED_CRITIQUE[partial].render(original_response)
+    
+    CRITIQUE_PARTIAL_NOTE = (
+        "\n**NOTE:** The response below is the opening part of an answer that is still being "
+        "written. Critique what is there and flag anything the remainder must address.\n"
+    )
+    
+    CRITIQUE_PROMPT = """Perform rigorous self-critique and refinement of your previous response:
+{partial_note}
 **ORIGINAL RESPONSE:**
 {original_response}
 
@@ -656,3 +1008,6 @@ Give straightforward, high-quality answers that directly address what the user n
 - Demonstrate meaningful enhancement in the refined version
 
 Be thorough, honest, and constructive in your self-evaluation.[web:8][web:17][web:20]"""
+
+
+PromptEngine.compile_prompts()
@@ -1,24 +1,170 @@
 """
 Advanced reasoning engine - Main business logic
 """
+import asyncio
+import contextvars
+import queue
+import threading
 import time
 import hashlib
-from typing import Generator, List, Dict, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Generator, List, Dict, Optional, Any, Tuple
+import groq
+from src.api.client_pool import GroqKey
 from src.api.groq_client import GroqClientManager
 from src.core.prompt_engine import PromptEngine
 from src.core.conversation import ConversationManager
-from src.services.cache_service import ResponseCache
-from src.services.rate_limiter import RateLimiter
+from src.core.summarizer import ConversationSummarizer
+from src.core.engines import (
+    DebateEngine, ReasoningEngine, ReflexionEngine, SelfConsistencyEngine, TreeOfThoughtsEngine
+)
+from src.services.cache_service import create_response_cache
+from src.services.persistent_cache import SQLiteCacheStore
+from src.services.semantic_index import SemanticCacheIndex
+from src.services.single_flight import Flight, SingleFlight
+from src.services.model_router import ModelRouter
 from src.services.export_service import ConversationExporter
 from src.services.analytics_service import AnalyticsService
 from src.models.metrics import ConversationMetrics
 from src.models.entry import ConversationEntry
+from src.models.cached_response import CachedResponse
 from src.config.settings import AppConfig
-from src.config.constants import ReasoningMode, ModelConfig
+from src.config.constants import AUTO_MODEL_ID, ReasoningMode, ModelConfig
 from src.utils.logger import logger
 from src.utils.decorators import handle_groq_errors, with_rate_limit
 from src.utils.validators import validate_input
-from src.utils.helpers import generate_session_id
+from src.utils.helpers import generate_session_id, normalize_query
+from src.utils.streaming import coalesce_stream, acoalesce_stream
+from src.utils.tokens import chars_to_tokens, token_counter
+from src.utils.rate_limit_headers import (
+    QuotaExceededError, advertised_wait, describe_wait, parse_rate_limit_headers
+)
+
+
+@dataclass
+class _ResponseState:
+    """
+    Per-request streaming state shared by the sync and async pipelines
+    """
+    query: str
+    model: str
+    reasoning_mode: ReasoningMode
+    enable_critique: bool
+    temperature: float
+    max_tokens: int
+    use_cache: bool
+    cache_key: str = ""
+    cache_scope: str = ""
+    start_time: float = field(default_factory=time.time)
+    chunks: List[str] = field(default_factory=list)
+    delays: List[float] = field(default_factory=list)
+    chars: int = 0
+    last_chunk_time: float = field(default_factory=time.time)
+    depth: int = 1
+    confidence: float = 95.0
+    corrections: int = 0
+    self_critiqued: bool = False  # an engine already critiqued its own answer
+    final_answer: Optional[str] = None  # what to cache and save, when the stream also showed drafts
+    failed: bool = False  # generation ended in an error message
+    usage: "_ResponseUsage" = field(default_factory=lambda: _ResponseUsage())
+    
+    def record(self, chunk: str) -> None:
+        """Append a chunk, noting when it arrived (for paced cache replay)"""
+        now = time.time()
+        self.chunks.append(chunk)
+        self.chars += len(chunk)
+        self.delays.append(now - self.last_chunk_time)
+        self.last_chunk_time = now
+    
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+    
+    @property
+    def critique_requested(self) -> bool:
+        return self.enable_critique and AppConfig.ENABLE_SELF_CRITIQUE and not self.self_critiqued
+
+
+class _TokenUsage:
+    """
+    Tokens used by one streamed API call: the usage block Groq sends with
+    the final chunk when present, otherwise an estimate from the text
+    """
+    def __init__(self, prompt_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.completion_parts: List[str] = []
+        self.reported: Optional[int] = None
+        self.reported_prompt: Optional[int] = None
+        self.reported_completion: Optional[int] = None
+        self.cached_prompt = 0
+        self.ttft: Optional[float] = None
+        self.sent = False
+    
+    def observe(self, chunk: Any) -> None:
+        if chunk.choices and chunk.choices[0].delta.content:
+            self.completion_parts.append(chunk.choices[0].delta.content)
+        usage = getattr(chunk, 'usage', None) or getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+        if getattr(usage, 'total_tokens', None):
+            self.reported = usage.total_tokens
+            self.reported_prompt = getattr(usage, 'prompt_tokens', None)
+            self.reported_completion = getattr(usage, 'completion_tokens', None)
+            details = getattr(usage, 'prompt_tokens_details', None)
+            self.cached_prompt = getattr(details, 'cached_tokens', None) or 0  # served from the prefix cache
+    
+    @property
+    def prompt(self) -> int:
+        return self.reported_prompt if self.reported_prompt is not None else self.prompt_tokens
+    
+    @property
+    def completion(self) -> int:
+        if self.reported_completion is not None:
+            return self.reported_completion
+        return token_counter.count("".join(self.completion_parts))
+    
+    @property
+    def total(self) -> int:
+        if not self.sent:
+            return 0  # the request never reached the API
+        if self.reported is not None:
+            return self.reported
+        return self.prompt + self.completion
+
+
+class _ResponseUsage:
+    """
+    Tokens across every API call made for one response (answer, engine
+    stages, critique); ``estimated`` if any call came without a usage block.
+    ``served`` maps a requested model to the fallback model that answered it
+    """
+    def __init__(self):
+        self.prompt = 0
+        self.completion = 0
+        self.cached = 0
+        self.calls = 0
+        self.estimated = False
+        self.served: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, call: _TokenUsage) -> None:
+        with self._lock:
+            self.prompt += call.prompt
+            self.completion += call.completion
+            self.cached += call.cached_prompt
+            self.calls += 1
+            self.estimated = self.estimated or call.reported is None
+    
+    @property
+    def total(self) -> int:
+        return self.prompt + self.completion
+
+
+# The response whose API calls are being made; set around each step of its stream
+_response_usage: contextvars.ContextVar[Optional[_ResponseUsage]] = contextvars.ContextVar(
+    "response_usage", default=None
+)
+
+_STREAM_DONE = object()
 
 
 class AdvancedReasoner:
@@ -34,47 +180,841 @@ class AdvancedReasoner:
         self.prompt_engine = PromptEngine()
         
         # Services
-        self.cache = ResponseCache(AppConfig.CACHE_SIZE, AppConfig.CACHE_TTL)
-        self.rate_limiter = RateLimiter(AppConfig.RATE_LIMIT_REQUESTS, AppConfig.RATE_LIMIT_WINDOW)
+        persistent_cache = None
+        if AppConfig.CACHE_PERSIST:
+            persistent_cache = SQLiteCacheStore(
+                AppConfig.CACHE_DB_PATH, AppConfig.CACHE_TTL, AppConfig.CACHE_COMPACT_INTERVAL
+            )
+        self.cache = create_response_cache(
+            AppConfig.CACHE_SIZE, AppConfig.CACHE_TTL, AppConfig.CACHE_SHARDS, persistent_cache
+        )
+        self.semantic_index = None
+        if AppConfig.ENABLE_SEMANTIC_CACHE:
+            self.semantic_index = SemanticCacheIndex(
+                AppConfig.SEMANTIC_CACHE_THRESHOLD, maxsize=AppConfig.CACHE_SIZE
+            )
+        self.client_manager.pool.observe_waits(self._record_rate_limit_wait)
+        self.single_flight = SingleFlight()
+        self.router = ModelRouter(AppConfig.ROUTER_LATENCY_WINDOW, AppConfig.ROUTER_COOLDOWN,
+                                  AppConfig.ROUTER_LATENCY_BUDGET)
         self.exporter = ConversationExporter()
         self.analytics = AnalyticsService()
+        self.executor = ThreadPoolExecutor(max_workers=AppConfig.MAX_WORKERS, thread_name_prefix="reasoner")
+        self.engine_executor = ThreadPoolExecutor(max_workers=self._engine_workers(), thread_name_prefix="engine")
         
         # Metrics and state
         self.metrics = ConversationMetrics()
+        self.engines = self._build_engines() if AppConfig.ENABLE_REASONING_ENGINES else {}
+        self.summarizer = None
+        if AppConfig.ENABLE_SUMMARY:
+            summary_model = (self._known_models([AppConfig.SUMMARY_MODEL])
+                             or [ModelConfig.get_recommended().model_id])[0]
+            self.summarizer = ConversationSummarizer(
+                self._call_groq_api, self.executor, self.metrics, summary_model, AppConfig.SUMMARY_MAX_TOKENS
+            )
         self.session_id = generate_session_id()
         
         logger.info(f"✅ AdvancedReasoner initialized | Session: {self.session_id[:8]}...")
     
+    def _record_rate_limit_wait(self, seconds: float) -> None:
+        self.metrics.record_rate_limit_wait(seconds)
+    
+    def _apply_rate_limit_headers(self, key: GroqKey, model: str, headers: Any) -> None:
+        """
+        📨 FEED GROQ'S RATE-LIMIT HEADERS BACK INTO THE KEY'S LIMITERS
+        Requests are budgeted per day and tokens per minute (per model)
+        """
+        limits = parse_rate_limit_headers(headers)
+        key.rate_limiter.update_from_headers(limits['remaining_requests'], limits['reset_requests'])
+        key.token_limiter.update_from_headers(
+            model, limits['remaining_tokens'], limits['reset_tokens'], limits['limit_tokens']
+        )
+    
+    def _admit(self, key: GroqKey, model: str, tokens: int, max_wait: float) -> int:
+        """
+        ⏱️ WAIT FOR THE KEY'S REQUEST AND TOKEN BUDGETS
+        Returns the tokens reserved. A budget that won't be back within
+        ``max_wait`` (e.g. the daily request quota) raises QuotaExceededError
+        """
+        if not key.rate_limiter.acquire(timeout=max_wait):
+            raise QuotaExceededError.after(key.rate_limiter.available_in())
+        reserved = key.token_limiter.reserve(model, tokens, timeout=max_wait)
+        if not reserved:
+            key.rate_limiter.reconcile(1, 0)
+            raise QuotaExceededError.after(key.token_limiter.bucket(model).available_in(tokens), f"{model} token")
+        return reserved
+    
+    async def _aadmit(self, key: GroqKey, model: str, tokens: int, max_wait: float) -> int:
+        """Async counterpart of _admit"""
+        if not await key.rate_limiter.aacquire(timeout=max_wait):
+            raise QuotaExceededError.after(key.rate_limiter.available_in())
+        reserved = await key.token_limiter.areserve(model, tokens, timeout=max_wait)
+        if not reserved:
+            key.rate_limiter.reconcile(1, 0)
+            raise QuotaExceededError.after(key.token_limiter.bucket(model).available_in(tokens), f"{model} token")
+        return reserved
+    
+    def _fail_over(self, key: GroqKey, model: str, error: Exception, tried: List[GroqKey]) -> bool:
+        """
+        ⏏️ SIDELINE A KEY AFTER AN AUTH OR RATE-LIMIT ERROR
+        Auth failures and an exhausted request quota eject the key. Token
+        limits are per model, so any other 429 only pauses the key's bucket
+        for ``model``. Returns True if another key can take the request right
+        away; otherwise the error goes to the retry layer
+        """
+        pool = self.client_manager.pool
+        if isinstance(error, groq.AuthenticationError):
+            pool.eject(key, AppConfig.KEY_EJECT_SECONDS, "authentication failed")
+        elif isinstance(error, groq.RateLimitError):
+            response = getattr(error, 'response', None)
+            headers = response.headers if response is not None else {}
+            seconds = advertised_wait(headers) or AppConfig.RATE_LIMIT_WINDOW
+            if parse_rate_limit_headers(headers)['remaining_requests'] == 0:
+                pool.eject(key, seconds, "request quota exhausted")
+            else:
+                key.token_limiter.bucket(model).pause(seconds)
+                logger.warning(f"⏳ API key {key.name} rate limited on {model}; pausing it for {seconds:.0f}s")
+        else:
+            return False
+        
+        tried.append(key)
+        return pool.has_healthy(tried)
+    
+    def _no_key_error(self, tried: List[GroqKey]) -> QuotaExceededError:
+        """Error for a request that finds every API key ejected"""
+        seconds = self.client_manager.pool.available_in(tried)
+        return QuotaExceededError(
+            f"Every Groq API key is out of rotation (rate limited or rejected); "
+            f"the first is back in {describe_wait(seconds)}.", seconds
+        )
+    
+    @staticmethod
+    def _continuation(messages: List[Dict], max_tokens: int, resume_from: str) -> Tuple[List[Dict], int]:
+        """Messages and remaining token budget for resuming after ``resume_from`` (unchanged if empty)"""
+        if not resume_from:
+            return messages, max_tokens
+        logger.info(f"🔁 Resuming interrupted stream after {len(resume_from)} characters")
+        remaining = max(1, max_tokens - chars_to_tokens(len(resume_from)))
+        return PromptEngine.build_continuation_messages(messages, resume_from), remaining
+    
+    def _build_engines(self) -> Dict[ReasoningMode, ReasoningEngine]:
+        """
+        ⚙️ MULTI-CALL ENGINES FOR MODES THAT HAVE ONE
+        Other modes are answered by a single completion with the mode's system prompt
+        """
+        deps = (self._call_groq_api, self.engine_executor, self.metrics)
+        judge_models = self._known_models([AppConfig.DEBATE_JUDGE_MODEL]) if AppConfig.DEBATE_JUDGE_MODEL else []
+        return {
+            ReasoningMode.SELF_CONSISTENCY: SelfConsistencyEngine(
+                *deps, AppConfig.SC_SAMPLES, AppConfig.SC_QUORUM, AppConfig.SC_CLUSTER_THRESHOLD,
+                AppConfig.SC_MIN_TEMPERATURE
+            ),
+            ReasoningMode.TREE_OF_THOUGHTS: TreeOfThoughtsEngine(
+                *deps, AppConfig.TOT_BEAM_WIDTH, AppConfig.TOT_BRANCHING, AppConfig.TOT_MAX_DEPTH,
+                AppConfig.TOT_EVAL_CACHE_SIZE, AppConfig.CACHE_TTL
+            ),
+            ReasoningMode.DEBATE: DebateEngine(
+                *deps, AppConfig.DEBATE_AGENTS, AppConfig.DEBATE_ROUNDS, self._known_models(AppConfig.DEBATE_MODELS),
+                (judge_models or [""])[0], AppConfig.DEBATE_CONVERGENCE
+            ),
+            ReasoningMode.REFLEXION: ReflexionEngine(
+                *deps, AppConfig.REFLEXION_MAX_ITERATIONS, AppConfig.REFLEXION_MIN_DELTA
+            )
+        }
+    
+    @staticmethod
+    def _engine_workers() -> int:
+        """
+        Threads for engine fan-out: its own pool, so samples, branches and agents
+        don't queue behind (or starve) the critique and summary work on ``executor``.
+        Sized to the largest fan-out (or ENGINE_WORKERS), never above MAX_WORKERS
+        """
+        fan_out = AppConfig.ENGINE_WORKERS or max(
+            AppConfig.SC_SAMPLES, AppConfig.TOT_BEAM_WIDTH * AppConfig.TOT_BRANCHING, AppConfig.DEBATE_AGENTS
+        )
+        return min(fan_out, AppConfig.MAX_WORKERS)
+    
+    @staticmethod
+    def _known_models(model_ids: List[str]) -> List[str]:
+        """Drop (and warn about) configured model IDs that aren't in ModelConfig"""
+        known = {model.model_id for model in ModelConfig}
+        for model_id in model_ids:
+            if model_id not in known:
+                logger.warning(f"⚠️ Ignoring unknown model in configuration: {model_id}")
+        return [model_id for model_id in model_ids if model_id in known]
+    
     def _generate_cache_key(self, query: str, model: str, mode: str, 
-                           temp: float, tokens: int) -> str:
+                            temp: float, tokens: int) -> str:
         """
         🔑 GENERATE CACHE KEY
+        Queries are normalized so whitespace, case and unicode variants share a key
         """
-        key_string = f"{query}|{model}|{mode}|{temp}|{tokens}"
+        key_string = f"{normalize_query(query)}|{self._cache_scope(model, mode, temp, tokens)}"
         return hashlib.sha256(key_string.encode()).hexdigest()
     
-    @handle_groq_errors(max_retries=AppConfig.MAX_RETRIES, retry_delay=AppConfig.RETRY_DELAY)
-    def _call_groq_api(self, messages: List[Dict], model: str, 
-                       temperature: float, max_tokens: int) -> Generator[str, None, None]:
+    @staticmethod
+    def _cache_scope(model: str, mode: str, temp: float, tokens: int) -> str:
+        """Generation settings a cached answer is only valid for"""
+        return f"{model}|{mode}|{temp}|{tokens}"
+    
+    def _lookup_cache(self, query: str, cache_key: str, scope: str) -> Optional[Any]:
+        """
+        💾 EXACT CACHE LOOKUP WITH FUZZY FALLBACK
+        """
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.metrics.update_cache_stats(hit=True)
+            logger.info("✅ Cache hit - returning cached response")
+            return cached
+        
+        if self.semantic_index is not None:
+            match = self.semantic_index.lookup(scope, normalize_query(query))
+            if match is not None:
+                cached = self.cache.get(match[0], fuzzy=True)
+                if cached is not None:
+                    self.metrics.update_cache_stats(hit=True, fuzzy=True)
+                    logger.info(f"✅ Fuzzy cache hit (similarity {match[1]:.2f}) - returning cached response")
+                    return cached
+        
+        self.metrics.update_cache_stats(hit=False)
+        return None
+    
+    def _store_cache(self, query: str, cache_key: str, scope: str, response: Any) -> None:
+        """
+        💾 STORE RESPONSE AND INDEX ITS QUERY FOR FUZZY LOOKUPS
+        """
+        self.cache.set(cache_key, response)
+        if self.semantic_index is not None:
+            self.semantic_index.add(scope, normalize_query(query), cache_key)
+    
+    def _replay_cached(self, cached: Any) -> Generator[str, None, None]:
+        """
+        ⏯️ REPLAY A CACHED RESPONSE THROUGH THE STREAMING CONTRACT
+        Instantly, with the originally recorded pacing, or at a fixed chunk rate
+        """
+        for chunk, delay in self._replay_plan(cached):
+            if delay:
+                time.sleep(delay)
+            yield chunk
+    
+    async def _areplay_cached(self, cached: Any) -> AsyncGenerator[str, None]:
+        """
+        ⏯️ REPLAY A CACHED RESPONSE WITHOUT BLOCKING THE EVENT LOOP
+        """
+        for chunk, delay in self._replay_plan(cached):
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+    
+    @staticmethod
+    def _replay_plan(cached: Any) -> List[Tuple[str, float]]:
+        """(chunk, delay) pairs for replaying a cached entry under CACHE_REPLAY_MODE"""
+        if not isinstance(cached, CachedResponse):
+            return [(cached, 0.0)]  # plain string from an older cache entry
+        
+        if AppConfig.CACHE_REPLAY_MODE == 'instant' or not len(cached):
+            return [(cached.text, 0.0)]
+        
+        if AppConfig.CACHE_REPLAY_MODE == 'original':
+            return list(cached.iter_chunks())
+        
+        fixed_delay = 1.0 / AppConfig.CACHE_REPLAY_RATE
+        return [(chunk, fixed_delay) for chunk, _ in cached.iter_chunks()]
+    
+    def clear_cache(self) -> None:
+        """Clear the response cache and its similarity index"""
+        self.cache.clear()
+        if self.semantic_index is not None:
+            self.semantic_index.clear()
+    
+    # Errors after which a call moves on to a fallback model (before any output)
+    FALLBACK_ERRORS = (groq.APIConnectionError, groq.InternalServerError, groq.NotFoundError, groq.RateLimitError)
+    
+    def _model_candidates(self, model: str, tokens: int) -> Generator[str, None, None]:
+        """The requested model, then (if enabled) compatible fallbacks for a ``tokens``-sized call"""
+        yield model
+        if AppConfig.ENABLE_MODEL_FALLBACK:
+            yield from self.router.fallbacks(model, tokens)[:AppConfig.ROUTER_MAX_FALLBACKS]
+    
+    def _record_fallback(self, failed: str, model: str, error: Exception) -> None:
+        logger.warning(f"↪️ {failed} failed ({type(error).__name__}); falling back to {model}")
+        self.router.record_decision('fallback')
+        self.metrics.record_route('fallback')
+    
+    @staticmethod
+    def _record_served(requested: str, served: str) -> None:
+        """Note on the current response that ``served`` answered a call for ``requested``"""
+        response_usage = _response_usage.get()
+        if response_usage is not None and served != requested:
+            response_usage.served[requested] = served
+    
+    def _prepare_call(self, messages: List[Dict], max_tokens: int,
+                      resume_from: str) -> Tuple[List[Dict], int, int]:
+        """Messages and completion budget for a call (resuming after ``resume_from``), and the prompt's tokens"""
+        messages, max_tokens = self._continuation(messages, max_tokens, resume_from)
+        return messages, max_tokens, token_counter.count_messages(messages)
+    
+    def _next_candidate(self, model: str, candidate: str, failed: str, last_error: Optional[Exception]) -> float:
+        """Note a fallback to ``candidate`` (if it is one) and return how long it may wait for a key"""
+        if last_error is not None:
+            self._record_fallback(failed, candidate, last_error)
+        # A fallback only helps if it can start now; one whose budget is paused is skipped
+        return AppConfig.MAX_RATE_LIMIT_WAIT if candidate == model else 0
+    
+    def _candidate_failed(self, error: Exception, started: bool, candidate: str,
+                          last_error: Optional[Exception], failed: str) -> Tuple[Exception, str]:
+        """
+        The (error, model) to report if no later candidate succeeds; re-raises
+        ``error`` if output had already streamed, since it can't be taken back
+        """
+        if isinstance(error, QuotaExceededError):
+            # A skipped fallback doesn't hide why the requested model failed
+            return (error, candidate) if last_error is None else (last_error, failed)
+        if started:
+            raise error
+        self.router.record_failure(candidate)
+        return error, candidate
+    
+    def _observe_chunk(self, usage: _TokenUsage, model: str, chunk: Any, request_start: float) -> Optional[str]:
+        """Account one streamed chunk (timing the first) and return its text"""
+        if usage.ttft is None:
+            usage.ttft = time.monotonic() - request_start
+            self.router.record_latency(model, usage.ttft)
+        usage.observe(chunk)
+        if chunk.choices and chunk.choices[0].delta.content:
+            return chunk.choices[0].delta.content
+        return None
+    
+    def _settle_request(self, key: GroqKey, model: str, messages: List[Dict], reserved: int,
+                        usage: _TokenUsage, stage_tokens: Optional[List[int]]) -> None:
+        """
+        🧾 RECONCILE ONE REQUEST'S TOKENS
+        Returns the key, settles its token reservation against what was used,
+        and credits the usage to the response, the caller's stage and the
+        token-estimate calibration
+        """
+        key.token_limiter.reconcile(model, reserved, usage.total)
+        self.client_manager.pool.release(key)
+        response_usage = _response_usage.get()
+        if response_usage is not None and usage.sent:
+            response_usage.add(usage)
+        if stage_tokens is not None and usage.sent:
+            stage_tokens.append(usage.completion)
+        if usage.reported_prompt:
+            token_counter.calibrate(messages, usage.reported_prompt)
+            self.metrics.record_prompt_usage(usage.reported_prompt, usage.cached_prompt, usage.ttft)
+    
+    @handle_groq_errors(max_retries=AppConfig.MAX_RETRIES, retry_delay=AppConfig.RETRY_DELAY,
+                        max_wait=AppConfig.MAX_RATE_LIMIT_WAIT, metrics_attr='metrics',
+                        resume=AppConfig.STREAM_RESUME)
+    def _call_groq_api(self, messages: List[Dict], model: str, temperature: float, max_tokens: int,
+                       resume_from: str = "",
+                       stage_tokens: Optional[List[int]] = None) -> Generator[str, None, None]:
         """
         🔌 CALL GROQ API WITH STREAMING
+        Falls back to a compatible model if the call fails before any output.
+        ``resume_from`` (set by the retry layer) requests only the continuation of an interrupted stream.
+        The completion tokens of every request sent are appended to ``stage_tokens``, when given
         """
-        if AppConfig.ENABLE_RATE_LIMITING:
-            self.rate_limiter.acquire()
+        messages, max_tokens, prompt_tokens = self._prepare_call(messages, max_tokens, resume_from)
+        last_error, failed = None, model
         
-        client = self.client_manager.client
+        for candidate in self._model_candidates(model, prompt_tokens + max_tokens):
+            max_wait = self._next_candidate(model, candidate, failed, last_error)
+            completion = self._stream_completion(messages, candidate, temperature, max_tokens,
+                                                 prompt_tokens, max_wait, stage_tokens)
+            started = False
+            try:
+                for chunk in completion:
+                    if not started:
+                        self._record_served(model, candidate)
+                    started = True
+                    yield chunk
+                return
+            except (QuotaExceededError, *self.FALLBACK_ERRORS) as e:
+                last_error, failed = self._candidate_failed(e, started, candidate, last_error, failed)
+            finally:
+                completion.close()
+        raise last_error
+    
+    def _stream_completion(self, messages: List[Dict], model: str, temperature: float, max_tokens: int,
+                           prompt_tokens: int, max_wait: float,
+                           stage_tokens: Optional[List[int]] = None) -> Generator[str, None, None]:
+        """
+        One model's completion stream, on the least-loaded API key (failing over between keys).
+        Waits up to ``max_wait`` for a key's budget, then tries the next key
+        """
+        pool = self.client_manager.pool
+        tried: List[GroqKey] = []
         
-        stream = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=True
+        while True:
+            key = pool.acquire(exclude=tried)
+            if key is None:
+                raise self._no_key_error(tried)
+            reserved = 0
+            usage = _TokenUsage(prompt_tokens)
+            try:
+                if AppConfig.ENABLE_RATE_LIMITING:
+                    try:
+                        reserved = self._admit(key, model, prompt_tokens + max_tokens, max_wait)
+                    except QuotaExceededError:
+                        tried.append(key)
+                        if pool.has_healthy(tried):
+                            continue
+                        raise
+                
+                request_start = time.monotonic()
+                try:
+                    raw = key.client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True
+                    )
+                except (groq.AuthenticationError, groq.RateLimitError) as e:
+                    if self._fail_over(key, model, e, tried):
+                        continue
+                    raise
+                usage.sent = True
+                self._apply_rate_limit_headers(key, model, raw.headers)
+                stream = raw.parse()
+                
+                for chunk in stream:
+                    content = self._observe_chunk(usage, model, chunk, request_start)
+                    if content:
+                        yield content
+                return
+            finally:
+                self._settle_request(key, model, messages, reserved, usage, stage_tokens)
+    
+    @handle_groq_errors(max_retries=AppConfig.MAX_RETRIES, retry_delay=AppConfig.RETRY_DELAY,
+                        max_wait=AppConfig.MAX_RATE_LIMIT_WAIT, metrics_attr='metrics',
+                        resume=AppConfig.STREAM_RESUME)
+    async def _acall_groq_api(self, messages: List[Dict], model: str, temperature: float, max_tokens: int,
+                              resume_from: str = "",
+                              stage_tokens: Optional[List[int]] = None) -> AsyncGenerator[str, None]:
+        """
+        🔌 CALL GROQ API WITH ASYNC STREAMING
+        """
+        messages, max_tokens, prompt_tokens = self._prepare_call(messages, max_tokens, resume_from)
+        last_error, failed = None, model
+        
+        for candidate in self._model_candidates(model, prompt_tokens + max_tokens):
+            max_wait = self._next_candidate(model, candidate, failed, last_error)
+            completion = self._astream_completion(messages, candidate, temperature, max_tokens,
+                                                  prompt_tokens, max_wait, stage_tokens)
+            started = False
+            try:
+                async for chunk in completion:
+                    if not started:
+                        self._record_served(model, candidate)
+                    started = True
+                    yield chunk
+                return
+            except (QuotaExceededError, *self.FALLBACK_ERRORS) as e:
+                last_error, failed = self._candidate_failed(e, started, candidate, last_error, failed)
+            finally:
+                await completion.aclose()
+        raise last_error
+    
+    async def _astream_completion(self, messages: List[Dict], model: str, temperature: float, max_tokens: int,
+                                  prompt_tokens: int, max_wait: float,
+                                  stage_tokens: Optional[List[int]] = None) -> AsyncGenerator[str, None]:
+        """Async counterpart of _stream_completion"""
+        pool = self.client_manager.pool
+        tried: List[GroqKey] = []
+        
+        while True:
+            key = pool.acquire(exclude=tried)
+            if key is None:
+                raise self._no_key_error(tried)
+            reserved = 0
+            usage = _TokenUsage(prompt_tokens)
+            try:
+                if AppConfig.ENABLE_RATE_LIMITING:
+                    try:
+                        reserved = await self._aadmit(key, model, prompt_tokens + max_tokens, max_wait)
+                    except QuotaExceededError:
+                        tried.append(key)
+                        if pool.has_healthy(tried):
+                            continue
+                        raise
+                
+                request_start = time.monotonic()
+                try:
+                    raw = await key.async_client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True
+                    )
+                except (groq.AuthenticationError, groq.RateLimitError) as e:
+                    if self._fail_over(key, model, e, tried):
+                        continue
+                    raise
+                usage.sent = True
+                self._apply_rate_limit_headers(key, model, raw.headers)
+                stream = await raw.parse()
+                
+                async for chunk in stream:
+                    content = self._observe_chunk(usage, model, chunk, request_start)
+                    if content:
+                        yield content
+                return
+            finally:
+                self._settle_request(key, model, messages, reserved, usage, stage_tokens)
+    
+    def _build_answer_messages(self, state: _ResponseState, history: List[Dict], template: str) -> List[Dict]:
+        """
+        📝 PROMPT FOR A SINGLE-CALL ANSWER
+        Turns that don't fit verbatim are covered by the running summary, when one is ready.
+        The summary takes room from the history, so what's evicted is counted after packing with it
+        """
+        messages = self.prompt_engine.build_messages(state.query, state.reasoning_mode, template, history,
+                                                     state.model, state.max_tokens)
+        evicted = len(history or []) - (len(messages) - 2)
+        if self.summarizer is None or evicted <= 0:
+            return messages
+        
+        summary = self.summarizer.peek(history)
+        if summary:
+            messages = self.prompt_engine.build_messages(state.query, state.reasoning_mode, template, history,
+                                                         state.model, state.max_tokens, summary)
+            evicted = len(history) - (len(messages) - 3)
+        self.summarizer.summarize(history, evicted)
+        return messages
+    
+    def _history_notice(self, state: _ResponseState, history: List[Dict], template: str) -> Optional[str]:
+        """
+        ✂️ NOTICE FOR EARLIER TURNS LEFT OUT OF THE PROMPT
+        Only when no running summary stands in for them, so the user knows
+        the model didn't see them rather than finding out from the answer
+        """
+        turns = len(history or [])
+        if not turns or (self.summarizer is not None and self.summarizer.peek(history)):
+            return None
+        messages = self.prompt_engine.build_messages(state.query, state.reasoning_mode, template, history,
+                                                     state.model, state.max_tokens)
+        dropped = turns - (len(messages) - 2)
+        if dropped <= 0:
+            return None
+        logger.info(f"✂️ {dropped} of {turns} history messages don't fit the prompt for {state.model}")
+        return (f"⚠️ **Notice:** The {dropped} earliest of {turns} messages in this conversation didn't fit "
+                f"alongside a {state.max_tokens}-token reply and were left out.\n\n")
+    
+    def _answer_stream(self, state: _ResponseState, history: List[Dict],
+                       template: str) -> Generator[str, None, None]:
+        """The answer's deltas, from the mode's engine if it has one"""
+        engine = self.engines.get(state.reasoning_mode)
+        if engine is not None:
+            return engine.run(state, history, template)
+        
+        messages = self._build_answer_messages(state, history, template)
+        return self._call_groq_api(messages, state.model, state.temperature, state.max_tokens)
+    
+    def _aanswer_stream(self, state: _ResponseState, history: List[Dict],
+                        template: str) -> AsyncGenerator[str, None]:
+        """Async counterpart of _answer_stream (engines run on worker threads)"""
+        engine = self.engines.get(state.reasoning_mode)
+        if engine is not None:
+            return self._aiterate(engine.run(state, history, template))
+        
+        messages = self._build_answer_messages(state, history, template)
+        return self._acall_groq_api(messages, state.model, state.temperature, state.max_tokens)
+    
+    @staticmethod
+    def _metered(state: _ResponseState, stream: Generator[str, None, None]) -> Generator[str, None, None]:
+        """
+        📏 ATTRIBUTE THE API CALLS ``stream`` MAKES TO THIS RESPONSE
+        The context variable is set around every step rather than once, since
+        consumers such as Gradio may advance the stream from different threads
+        """
+        try:
+            while True:
+                token = _response_usage.set(state.usage)
+                try:
+                    chunk = next(stream, _STREAM_DONE)
+                finally:
+                    _response_usage.reset(token)
+                if chunk is _STREAM_DONE:
+                    return
+                yield chunk
+        finally:
+            stream.close()
+    
+    @staticmethod
+    async def _ametered(state: _ResponseState, stream: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+        """Async counterpart of _metered"""
+        try:
+            while True:
+                token = _response_usage.set(state.usage)
+                try:
+                    chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    _response_usage.reset(token)
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    @staticmethod
+    async def _aiterate(stream: Generator[str, None, None]) -> AsyncGenerator[str, None]:
+        """Drive a blocking generator from the event loop, one step per worker-thread hop"""
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, stream, _STREAM_DONE)
+                if chunk is _STREAM_DONE:
+                    return
+                yield chunk
+        finally:
+            try:
+                stream.close()
+            except ValueError:
+                pass  # cancelled mid-step; the worker thread finishes that step on its own
+    
+    @staticmethod
+    def _flight_key(state: _ResponseState, history: List[Dict], template: str) -> str:
+        """
+        🔑 KEY OF EVERYTHING THAT SHAPES A STREAM
+        The cache key plus what it leaves out: critique, the template and the
+        conversation the answer is given in
+        """
+        digest = hashlib.sha256(f"{state.cache_key}|{state.enable_critique}|{template}".encode())
+        for msg in history or []:
+            digest.update(f"\x1e{msg.get('role')}\x1f{msg.get('content')}".encode())
+        return digest.hexdigest()
+    
+    def _join_flight(self, state: _ResponseState, history: List[Dict],
+                     template: str) -> Tuple[Optional[Flight], bool]:
+        """
+        🛫 COALESCE WITH AN IDENTICAL IN-FLIGHT REQUEST
+        Only for requests that could be served from the cache, and only with
+        one whose whole request shape matches (see _flight_key).
+        Returns (flight, is_leader), or (None, True) when coalescing doesn't apply
+        """
+        if not (AppConfig.ENABLE_SINGLE_FLIGHT and state.use_cache and AppConfig.ENABLE_CACHE):
+            return None, True
+        flight, leader = self.single_flight.join(self._flight_key(state, history, template))
+        if not leader:
+            self.metrics.record_coalesced()
+        return flight, leader
+    
+    @staticmethod
+    def _abandoned_flight_notice(flight: Flight) -> str:
+        """Delta telling a follower the request it joined was cancelled or failed"""
+        notice = "⚠️ **Notice:** The identical request this one joined didn't complete. Please retry."
+        return f"\n\n{notice}" if flight.chunks else notice
+    
+    def _resolve_model(self, model: str, query: str, history: List[Dict], reasoning_mode: ReasoningMode,
+                       template: str, max_tokens: int) -> str:
+        """
+        🧭 THE ROUTER'S PICK WHEN THE USER CHOSE "auto"
+        Sized by the prompt this request will send plus its completion budget
+        """
+        if model != AUTO_MODEL_ID:
+            return model
+        messages = self.prompt_engine.build_messages(query, reasoning_mode, template, history,
+                                                     max_tokens=max_tokens)
+        self.metrics.record_route('auto')
+        return self.router.auto(token_counter.count_messages(messages) + max_tokens)
+    
+    def _begin_response(self, query: str, model: str, reasoning_mode: ReasoningMode,
+                        enable_critique: bool, temperature: float, max_tokens: int,
+                        use_cache: bool) -> Tuple[_ResponseState, Optional[str]]:
+        """
+        🚦 VALIDATE INPUT AND KEY THE REQUEST
+        Returns (state, input_error)
+        """
+        budget = self.prompt_engine.completion_budget(model, max_tokens)
+        if budget < max_tokens:
+            logger.info(f"📏 max_tokens {max_tokens} leaves no room for the prompt on {model}; using {budget}")
+            max_tokens = budget
+        state = _ResponseState(query, model, reasoning_mode, enable_critique,
+                               temperature, max_tokens, use_cache)
+        
+        # Validate input
+        is_valid, error_msg = validate_input(query, AppConfig.MAX_INPUT_LENGTH)
+        if not is_valid:
+            return state, f"❌ **Input Error:** {error_msg}"
+        
+        state.cache_key = self._generate_cache_key(query, model, reasoning_mode.value, temperature, max_tokens)
+        state.cache_scope = self._cache_scope(model, reasoning_mode.value, temperature, max_tokens)
+        return state, None
+    
+    def _check_cache(self, state: _ResponseState) -> Optional[Any]:
+        """
+        💾 CACHED RESPONSE FOR THE REQUEST, IF CACHING APPLIES
+        May read the SQLite L2 tier, so the async path runs it on a worker thread
+        """
+        if state.use_cache and AppConfig.ENABLE_CACHE:
+            return self._lookup_cache(state.query, state.cache_key, state.cache_scope)
+        
+        self.metrics.update_cache_stats(hit=False)
+        return None
+    
+    @staticmethod
+    def _critique_messages(answer: str, partial: bool = False) -> List[Dict]:
+        """Build the self-critique request for an answer"""
+        return [
+            {"role": "system", "content": "You are a critical reviewer."},
+            {"role": "user", "content": PromptEngine.get_self_critique_prompt(answer, partial)}
+        ]
+    
+    CRITIQUE_HEADER = "\n\n---\n\n### 🔍 Self-Critique\n"
+    
+    @staticmethod
+    def _should_start_critique(state: _ResponseState, chunk: str) -> bool:
+        """Pipelined mode: start critiquing once enough of the answer exists, at a line boundary"""
+        return (AppConfig.CRITIQUE_MODE == 'pipelined'
+                and state.critique_requested
+                and chars_to_tokens(state.chars) >= AppConfig.CRITIQUE_TRIGGER_TOKENS
+                and "\n" in chunk)
+    
+    def _critique_stream(self, state: _ResponseState, partial: bool = False) -> Generator[str, None, None]:
+        """
+        🔍 STREAM THE CRITIQUE OF THE ANSWER SO FAR
+        Sequential mode runs this on the caller's thread, after the answer
+        """
+        model = AppConfig.CRITIQUE_MODEL or state.model
+        logger.debug(f"🔍 Starting {'pipelined' if partial else 'sequential'} critique on {model}")
+        return self._call_groq_api(self._critique_messages(state.text, partial), model,
+                                   state.temperature, state.max_tokens // 2)
+    
+    def _start_critique(self, state: _ResponseState) -> Tuple[queue.Queue, threading.Event]:
+        """
+        🔍 PIPELINED MODE: CRITIQUE THE PARTIAL ANSWER ON A WORKER THREAD
+        Chunks are handed back through a queue; set the event to abandon it
+        """
+        output: queue.Queue = queue.Queue()
+        cancel = threading.Event()
+        stream = self._critique_stream(state, partial=True)
+        
+        def run() -> None:
+            try:
+                for chunk in stream:
+                    if cancel.is_set():
+                        break
+                    output.put(chunk)
+                output.put(_STREAM_DONE)
+            except Exception as e:
+                output.put(e)
+            finally:
+                stream.close()
+        
+        self.executor.submit(contextvars.copy_context().run, run)  # bill the critique to this response
+        return output, cancel
+    
+    @staticmethod
+    def _drain_critique(output: queue.Queue) -> Generator[str, None, None]:
+        """Yield critique chunks as the worker produces them"""
+        while True:
+            item = output.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    def _acritique_stream(self, state: _ResponseState, partial: bool = False) -> AsyncGenerator[str, None]:
+        """Async counterpart of _critique_stream"""
+        model = AppConfig.CRITIQUE_MODEL or state.model
+        logger.debug(f"🔍 Starting {'pipelined' if partial else 'sequential'} critique on {model}")
+        return self._acall_groq_api(self._critique_messages(state.text, partial), model,
+                                    state.temperature, state.max_tokens // 2)
+    
+    def _astart_critique(self, state: _ResponseState) -> Tuple[asyncio.Queue, asyncio.Task]:
+        """
+        🔍 PIPELINED MODE: CRITIQUE THE PARTIAL ANSWER AS A BACKGROUND TASK
+        """
+        output: asyncio.Queue = asyncio.Queue()
+        stream = self._acritique_stream(state, partial=True)
+        
+        async def run() -> None:
+            try:
+                async for chunk in stream:
+                    await output.put(chunk)
+                await output.put(_STREAM_DONE)
+            except Exception as e:
+                await output.put(e)
+            finally:
+                await stream.aclose()
+        
+        return output, asyncio.ensure_future(run())
+    
+    @staticmethod
+    async def _adrain_critique(output: asyncio.Queue) -> AsyncGenerator[str, None]:
+        while True:
+            item = await output.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    def _finish_response(self, state: _ResponseState) -> None:
+        """
+        ✅ CACHE, RECORD METRICS AND SAVE THE CONVERSATION
+        """
+        full_response = state.text
+        served_model = state.usage.served.get(state.model, state.model)
+        if served_model != state.model:
+            logger.info(f"↪️ {state.model} was unavailable; {served_model} answered instead")
+        
+        # Cache response (a fallback's answer isn't what a request for the model it replaced should replay)
+        if state.use_cache and AppConfig.ENABLE_CACHE and served_model == state.model:
+            cached = (CachedResponse.from_chunks(state.chunks, state.delays) if state.final_answer is None
+                      else CachedResponse.from_chunks([state.final_answer], [0.0]))
+            self._store_cache(state.query, state.cache_key, state.cache_scope, cached)
+        
+        # Update metrics
+        elapsed_time = time.time() - state.start_time
+        usage = state.usage
+        if usage.calls == 0:  # nothing reported back (e.g. every call failed over): estimate locally
+            usage.completion, usage.estimated = token_counter.count(full_response), True
+        
+        self.metrics.update(
+            tokens=usage.total,
+            completion_tokens=usage.completion,
+            time_taken=elapsed_time,
+            depth=state.depth,
+            corrections=state.corrections + (1 if state.critique_requested else 0),
+            confidence=state.confidence
+        )
+        
+        # Save conversation
+        entry = ConversationEntry(
+            user_message=state.query,
+            assistant_response=full_response if state.final_answer is None else state.final_answer,
+            model=served_model,
+            reasoning_mode=state.reasoning_mode.value,
+            temperature=state.temperature,
+            max_tokens=state.max_tokens,
+            tokens_used=usage.total,
+            prompt_tokens=usage.prompt,
+            completion_tokens=usage.completion,
+            cached_tokens=usage.cached,
+            tokens_estimated=usage.estimated,
+            inference_time=elapsed_time,
+            critique_enabled=state.enable_critique,
+            cache_hit=False
         )
         
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        self.conversation_manager.add_conversation(entry)
+        
+        estimated = " (estimated)" if usage.estimated else ""
+        logger.info(f"✅ Response generated in {elapsed_time:.2f}s | Tokens: {usage.prompt} prompt "
+                    f"({usage.cached} cached) + {usage.completion} completion{estimated}")
+    
+    def _fail_response(self, state: _ResponseState, error: Exception) -> str:
+        """Record a generation error and return the delta that reports it"""
+        state.failed = True
+        self.metrics.increment_errors()
+        error_msg = f"❌ **Error:** {str(error)}"
+        logger.error(f"Response generation error: {error}", exc_info=True)
+        return f"\n\n{error_msg}" if state.chunks else error_msg
     
     def generate_response(
         self,
@@ -90,92 +1030,198 @@ class AdvancedReasoner:
     ) -> Generator[str, None, None]:
         """
         🧠 GENERATE RESPONSE WITH STREAMING
+        Yields the accumulated response, coalesced to at most one update per
+        STREAM_UPDATE_INTERVAL so consumers don't re-render on every token
         """
-        # Validate input
-        is_valid, error_msg = validate_input(query, AppConfig.MAX_INPUT_LENGTH)
-        if not is_valid:
-            yield f"❌ **Input Error:** {error_msg}"
+        yield from coalesce_stream(
+            self.stream_response(query, history, model, reasoning_mode, enable_critique,
+                                 temperature, max_tokens, template, use_cache),
+            AppConfig.STREAM_UPDATE_INTERVAL,
+            AppConfig.STREAM_UPDATE_MAX_CHARS
+        )
+    
+    def stream_response(
+        self,
+        query: str,
+        history: List[Dict],
+        model: str,
+        reasoning_mode: ReasoningMode,
+        enable_critique: bool = True,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        template: str = "Custom",
+        use_cache: bool = True
+    ) -> Generator[str, None, None]:
+        """
+        🧠 STREAM RESPONSE DELTAS
+        Yields only the new text of each chunk; an empty delta marks a pause
+        """
+        model = self._resolve_model(model, query, history, reasoning_mode, template, max_tokens)
+        state, input_error = self._begin_response(
+            query, model, reasoning_mode, enable_critique, temperature, max_tokens, use_cache
+        )
+        if input_error:
+            yield input_error
+            return
+        cached = self._check_cache(state)
+        if cached is not None:
+            yield from self._replay_cached(cached)
             return
         
-        start_time = time.time()
-        
-        # Check cache
-        cache_key = self._generate_cache_key(query, model, reasoning_mode.value, temperature, max_tokens)
-        
-        if use_cache and AppConfig.ENABLE_CACHE:
-            cached = self.cache.get(cache_key)
-            if cached:
-                self.metrics.update_cache_stats(hit=True)
-                logger.info("✅ Cache hit - returning cached response")
-                yield cached
-                return
-        
-        self.metrics.update_cache_stats(hit=False)
-        
-        # Build messages
-        messages = self.prompt_engine.build_messages(query, reasoning_mode, template, history)
-        
-        # Stream response
-        full_response = ""
+        flight, leader = self._join_flight(state, history, template)
+        if flight is None:
+            yield from self._metered(state, self._generate_stream(state, history, template))
+        elif leader:
+            completed = False
+            try:
+                for chunk in self._metered(state, self._generate_stream(state, history, template)):
+                    flight.publish(chunk)
+                    yield chunk
+                completed = not state.failed
+            finally:
+                self.single_flight.land(flight, completed)
+        else:
+            yield from flight.subscribe()
+            if not flight.completed:
+                yield self._abandoned_flight_notice(flight)
+    
+    def _generate_stream(self, state: _ResponseState, history: List[Dict],
+                         template: str) -> Generator[str, None, None]:
+        """
+        🧠 GENERATE THE ANSWER (AND CRITIQUE) FOR A CACHE MISS
+        """
+        critique = None
         try:
-            for chunk in self._call_groq_api(messages, model, temperature, max_tokens):
-                full_response += chunk
-                yield full_response
-            
-            # Self-critique if enabled
-            if enable_critique and AppConfig.ENABLE_SELF_CRITIQUE:
-                critique_prompt = self.prompt_engine.get_self_critique_prompt(full_response)
-                critique_messages = [
-                    {"role": "system", "content": "You are a critical reviewer."},
-                    {"role": "user", "content": critique_prompt}
-                ]
-                
-                critique_response = ""
-                for chunk in self._call_groq_api(critique_messages, model, temperature, max_tokens // 2):
-                    critique_response += chunk
-                
-                full_response += f"\n\n---\n\n### 🔍 Self-Critique\n{critique_response}"
-                yield full_response
-            
-            # Cache response
-            if use_cache and AppConfig.ENABLE_CACHE:
-                self.cache.set(cache_key, full_response)
-            
-            # Update metrics
-            elapsed_time = time.time() - start_time
-            tokens_estimate = len(full_response.split())
+            notice = self._history_notice(state, history, template)
+            if notice:
+                yield notice  # not recorded: it's about this history, which the cache doesn't key on
+            for chunk in self._answer_stream(state, history, template):
+                state.record(chunk)
+                yield chunk
+                if critique is None and self._should_start_critique(state, chunk):
+                    critique = self._start_critique(state)
             
-            self.metrics.update(
-                tokens=tokens_estimate,
-                time_taken=elapsed_time,
-                depth=1,
-                corrections=1 if enable_critique else 0,
-                confidence=95.0
-            )
-            
-            # Save conversation
-            entry = ConversationEntry(
-                user_message=query,
-                assistant_response=full_response,
-                model=model,
-                reasoning_mode=reasoning_mode.value,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                tokens_used=tokens_estimate,
-                inference_time=elapsed_time,
-                critique_enabled=enable_critique,
-                cache_hit=False
-            )
+            # Self-critique if enabled (already running if pipelined, otherwise streamed right here)
+            if state.critique_requested:
+                yield ""  # flush the answer before waiting on the critique call
+                state.record(self.CRITIQUE_HEADER)
+                yield self.CRITIQUE_HEADER
+                chunks = self._critique_stream(state) if critique is None else self._drain_critique(critique[0])
+                for chunk in chunks:
+                    state.record(chunk)
+                    yield chunk
             
-            self.conversation_manager.add_conversation(entry)
+            self._finish_response(state)
+        
+        except Exception as e:
+            yield self._fail_response(state, e)
+        finally:
+            if critique is not None:
+                critique[1].set()
+    
+    async def agenerate_response(
+        self,
+        query: str,
+        history: List[Dict],
+        model: str,
+        reasoning_mode: ReasoningMode,
+        enable_critique: bool = True,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        template: str = "Custom",
+        use_cache: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """
+        🧠 GENERATE RESPONSE WITH ASYNC STREAMING
+        Async counterpart of generate_response for event-loop consumers
+        """
+        async for text in acoalesce_stream(
+            self.astream_response(query, history, model, reasoning_mode, enable_critique,
+                                  temperature, max_tokens, template, use_cache),
+            AppConfig.STREAM_UPDATE_INTERVAL,
+            AppConfig.STREAM_UPDATE_MAX_CHARS
+        ):
+            yield text
+    
+    async def astream_response(
+        self,
+        query: str,
+        history: List[Dict],
+        model: str,
+        reasoning_mode: ReasoningMode,
+        enable_critique: bool = True,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        template: str = "Custom",
+        use_cache: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """
+        🧠 STREAM RESPONSE DELTAS ASYNCHRONOUSLY
+        """
+        model = self._resolve_model(model, query, history, reasoning_mode, template, max_tokens)
+        state, input_error = self._begin_response(
+            query, model, reasoning_mode, enable_critique, temperature, max_tokens, use_cache
+        )
+        if input_error:
+            yield input_error
+            return
+        cached = await asyncio.to_thread(self._check_cache, state)
+        if cached is not None:
+            async for chunk in self._areplay_cached(cached):
+                yield chunk
+            return
+        
+        flight, leader = self._join_flight(state, history, template)
+        if flight is None:
+            async for chunk in self._ametered(state, self._agenerate_stream(state, history, template)):
+                yield chunk
+        elif leader:
+            completed = False
+            try:
+                async for chunk in self._ametered(state, self._agenerate_stream(state, history, template)):
+                    flight.publish(chunk)
+                    yield chunk
+                completed = not state.failed
+            finally:
+                self.single_flight.land(flight, completed)
+        else:
+            async for chunk in flight.asubscribe():
+                yield chunk
+            if not flight.completed:
+                yield self._abandoned_flight_notice(flight)
+    
+    async def _agenerate_stream(self, state: _ResponseState, history: List[Dict],
+                                template: str) -> AsyncGenerator[str, None]:
+        """
+        🧠 GENERATE THE ANSWER (AND CRITIQUE) FOR A CACHE MISS ASYNCHRONOUSLY
+        """
+        critique = None
+        try:
+            notice = self._history_notice(state, history, template)
+            if notice:
+                yield notice  # not recorded: it's about this history, which the cache doesn't key on
+            async for chunk in self._aanswer_stream(state, history, template):
+                state.record(chunk)
+                yield chunk
+                if critique is None and self._should_start_critique(state, chunk):
+                    critique = self._astart_critique(state)
             
-            logger.info(f"✅ Response generated in {elapsed_time:.2f}s | Tokens: {tokens_estimate}")
+            if state.critique_requested:
+                yield ""
+                state.record(self.CRITIQUE_HEADER)
+                yield self.CRITIQUE_HEADER
+                chunks = self._acritique_stream(state) if critique is None else self._adrain_critique(critique[0])
+                async for chunk in chunks:
+                    state.record(chunk)
+                    yield chunk
             
+            await asyncio.to_thread(self._finish_response, state)  # writes the cache's SQLite tier
+        
         except Exception as e:
-            self.metrics.increment_errors()
-            error_msg = f"❌ **Error:** {str(e)}"
-            logger.error(f"Response generation error: {e}", exc_info=True)
-            yield error_msg
+            yield self._fail_response(state, e)
+        finally:
+            if critique is not None:
+                critique[1].cancel()
     
     # Convenience properties
     @property
@@ -196,6 +1242,8 @@ class AdvancedReasoner:
     def clear_history(self) -> None:
         """Clear conversation history"""
         self.conversation_manager.clear_history()
+        if self.summarizer is not None:
+            self.summarizer.clear()
     
     def export_conversation(self, format_type: str, include_metadata: bool = True) -> Tuple[str, Optional[str]]:
         """
@@ -223,5 +1271,6 @@ class AdvancedReasoner:
             self.session_id,
             self.model_usage,
             self.mode_usage,
-            self.cache.get_stats()
+            self.cache.get_stats(),
+            self.router.get_stats()
         )
@@ -0,0 +1,135 @@
+"""
+Rolling conversation summarization for long sessions
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from src.core.engines.base import CallAPI, stage_tokens
+from src.core.prompt_engine import PromptEngine
+from src.models.metrics import ConversationMetrics
+from src.utils.logger import logger
+
+
+@dataclass
+class _RunningSummary:
+    """A summary of the first ``covered`` messages of a conversation"""
+    text: str
+    covered: int
+
+
+class ConversationSummarizer:
+    """
+    📜 ROLLING CONVERSATION SUMMARY
+    Turns that no longer fit the prompt verbatim are folded into a running
+    summary by a cheap model on the worker pool, so long sessions keep a
+    constant prompt size. Requests use whatever summary is ready and never
+    wait for a fold. Summaries are keyed by a hash of exactly the messages
+    they cover, so a summary is only ever reused for a history that starts
+    with those same messages (one shared reasoner serves every session).
+    """
+    
+    def __init__(self, call_api: CallAPI, executor: Executor, metrics: ConversationMetrics,
+                 model: str, max_tokens: int, max_summaries: int = 256):
+        self.call_api = call_api
+        self.executor = executor
+        self.metrics = metrics
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_summaries = max_summaries
+        self._summaries: "OrderedDict[str, _RunningSummary]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _prefix_keys(history: List[Dict], limit: int) -> List[str]:
+        """``keys[i]`` identifies ``history[:i + 1]`` (chained hash over role and content)"""
+        keys, digest = [], b""
+        for msg in history[:limit]:
+            digest = hashlib.sha256(
+                digest + f"{msg.get('role')}\0{msg.get('content')}\0".encode()
+            ).digest()
+            keys.append(digest.hex())
+        return keys
+    
+    def _best(self, keys: List[str]) -> Tuple[str, int]:
+        """Longest finished summary of a prefix in ``keys`` (lock must be held): (text, covered)"""
+        for covered in range(len(keys), 0, -1):
+            summary = self._summaries.get(keys[covered - 1])
+            if summary is not None:
+                self._summaries.move_to_end(keys[covered - 1])
+                return summary.text, summary.covered
+        return "", 0
+    
+    def peek(self, history: List[Dict]) -> Optional[str]:
+        """
+        📜 LATEST FINISHED SUMMARY OF A PREFIX OF ``history`` (None if there is none)
+        """
+        keys = self._prefix_keys(history, len(history))
+        with self._lock:
+            text, _ = self._best(keys)
+        return text or None
+    
+    def summarize(self, history: List[Dict], evicted: int) -> Optional[str]:
+        """
+        📜 SUMMARY FOR A CONVERSATION WHOSE FIRST ``evicted`` MESSAGES DON'T FIT
+        Returns the latest finished summary covering at most those messages
+        (None if there is none yet) and schedules folding in the rest
+        """
+        if evicted <= 0:
+            return None
+        
+        keys = self._prefix_keys(history, evicted)
+        with self._lock:
+            text, covered = self._best(keys)
+            target = keys[-1]
+            schedule = covered < len(keys) and target not in self._pending
+            if schedule:
+                self._pending.add(target)
+        
+        if schedule:
+            self.executor.submit(self._fold, target, text, history[covered:len(keys)], len(keys))
+        return text or None
+    
+    def _fold(self, key: str, previous: str, turns: List[Dict], covered: int) -> None:
+        """Worker: fold ``turns`` into ``previous``, giving the summary of the first ``covered`` messages"""
+        start = time.time()
+        text, tokens = "", []
+        try:
+            words = max(50, self.max_tokens * 3 // 4)
+            messages = PromptEngine.build_summary_messages(previous, turns, words)
+            text = "".join(self.call_api(messages, self.model, 0.2, self.max_tokens, stage_tokens=tokens)).strip()
+        except Exception as e:
+            logger.warning(f"⚠️ Conversation summary update failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                if text:
+                    self._summaries[key] = _RunningSummary(text, covered)
+                    if len(self._summaries) > self.max_summaries:
+                        self._summaries.popitem(last=False)
+        
+        if text:
+            self.metrics.record_stage("summary", time.time() - start, stage_tokens(tokens, text))
+            logger.info(f"📜 Folded {len(turns)} message(s) into the running summary ({len(text.split())} words)")
+    
+    def clear(self) -> None:
+        """
+        🗑️ FORGET ALL SUMMARIES
+        """
+        with self._lock:
+            self._summaries.clear()
+    
+    def get_stats(self) -> dict:
+        """
+        📊 GET SUMMARIZER STATISTICS
+        """
+        with self._lock:
+            return {
+                'summaries': len(self._summaries),
+                'pending': len(self._pending),
+                'covered_messages': sum(summary.covered for summary in self._summaries.values())
+            }
@@ -3,6 +3,7 @@ Data models package initialization
 """
 from .metrics import ConversationMetrics
 from .entry import ConversationEntry
+from .cached_response import CachedResponse
 from .config_models import ReasoningMode, ModelConfig
 
-__all__ = ['ConversationMetrics', 'ConversationEntry', 'ReasoningMode', 'ModelConfig']
+__all__ = ['ConversationMetrics', 'ConversationEntry', 'CachedResponse', 'ReasoningMode', 'ModelConfig']
@@ -0,0 +1,37 @@
+"""
+Cached streaming response data model
+"""
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+
+@dataclass
+class CachedResponse:
+    """
+    💾 STREAMED RESPONSE STORED AS CHUNK OFFSETS INTO ONE BUFFER
+    ``offsets[i]`` is the end of chunk ``i`` in ``text`` and ``delays[i]`` the
+    seconds that elapsed before it originally arrived
+    """
+    text: str = ""
+    offsets: List[int] = field(default_factory=list)
+    delays: List[float] = field(default_factory=list)
+    
+    @classmethod
+    def from_chunks(cls, chunks: List[str], delays: List[float]) -> 'CachedResponse':
+        """Build from a list of streamed chunks and their arrival delays"""
+        offsets = []
+        end = 0
+        for chunk in chunks:
+            end += len(chunk)
+            offsets.append(end)
+        return cls("".join(chunks), offsets, list(delays))
+    
+    def iter_chunks(self) -> Iterator[Tuple[str, float]]:
+        """Yield (chunk, original_delay) pairs in stream order"""
+        start = 0
+        for end, delay in zip(self.offsets, self.delays):
+            yield self.text[start:end], delay
+            start = end
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
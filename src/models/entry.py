@@ -21,7 +21,11 @@ class ConversationEntry:
     entry_id: str = field(default_factory=lambda: str(uuid.uuid4()))
     temperature: float = 0.7
     max_tokens: int = 4000
-    tokens_used: int = 0
+    tokens_used: int = 0  # prompt + completion, across every API call for the response
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # prompt tokens served from the provider's prefix cache
+    tokens_estimated: bool = False  # some call had no usage block, so part of the count is a local estimate
     inference_time: float = 0.0
     reasoning_depth: int = 1
     confidence_score: float = 100.0
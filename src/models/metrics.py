@@ -4,7 +4,7 @@ Conversation metrics data model
 from dataclasses import dataclass, field
 from datetime import datetime
 import threading
-from typing import Dict
+from typing import Any, Dict, Optional
 from src.utils.helpers import format_timestamp
 
 
@@ -15,7 +15,9 @@ class ConversationMetrics:
     """
     total_conversations: int = 0
     tokens_used: int = 0
+    completion_tokens: int = 0
     inference_time: float = 0.0
+    total_inference_time: float = 0.0
     reasoning_depth: int = 0
     self_corrections: int = 0
     confidence_score: float = 0.0
@@ -26,50 +28,150 @@ class ConversationMetrics:
     error_count: int = 0
     cache_hits: int = 0
     cache_misses: int = 0
+    cache_fuzzy_hits: int = 0
+    coalesced_requests: int = 0
+    tokens_saved: int = 0
+    rate_limit_waits: int = 0
+    rate_limit_wait_time: float = 0.0
+    api_retries: int = 0
+    api_resumes: int = 0
+    retry_backoff_time: float = 0.0
+    auto_routed: int = 0
+    model_fallbacks: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    prefix_cache_calls: int = 0
+    prefix_cache_hits: int = 0
+    ttft_cached: float = 0.0
+    ttft_uncached: float = 0.0
+    stage_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
     
     def update(self, tokens: int, time_taken: float, depth: int = 1, 
-               corrections: int = 0, confidence: float = 100.0) -> None:
+               corrections: int = 0, confidence: float = 100.0,
+               completion_tokens: Optional[int] = None) -> None:
         """
         ✅ THREAD-SAFE METRIC UPDATE
+        ``tokens`` counts toward the total; throughput and the peak use the
+        generated ``completion_tokens`` (defaults to ``tokens``)
         """
+        generated = tokens if completion_tokens is None else completion_tokens
         with self._lock:
             self.total_conversations += 1
             self.tokens_used += tokens
+            self.completion_tokens += generated
             self.inference_time = time_taken
+            self.total_inference_time += time_taken
             self.reasoning_depth = depth
             self.self_corrections = corrections
             self.confidence_score = confidence
             
-            if tokens > self.peak_tokens:
-                self.peak_tokens = tokens
+            if generated > self.peak_tokens:
+                self.peak_tokens = generated
             
-            if self.total_conversations > 0:
-                total_time = self.inference_time * self.total_conversations
-                self.avg_response_time = total_time / self.total_conversations
-                
-                if self.avg_response_time > 0:
-                    self.tokens_per_second = self.tokens_used / (self.avg_response_time * self.total_conversations)
+            self.avg_response_time = self.total_inference_time / self.total_conversations
+            if self.total_inference_time > 0:
+                self.tokens_per_second = self.completion_tokens / self.total_inference_time
     
     def increment_errors(self) -> None:
         """Increment error count"""
         with self._lock:
             self.error_count += 1
     
-    def update_cache_stats(self, hit: bool) -> None:
+    def update_cache_stats(self, hit: bool, fuzzy: bool = False) -> None:
         """Update cache statistics"""
         with self._lock:
-            if hit:
+            if hit and fuzzy:
+                self.cache_fuzzy_hits += 1
+            elif hit:
                 self.cache_hits += 1
             else:
                 self.cache_misses += 1
     
+    def record_coalesced(self) -> None:
+        """Count a request served by following an identical in-flight request"""
+        with self._lock:
+            self.coalesced_requests += 1
+    
+    def record_stage(self, name: str, latency: float, tokens: int = 0) -> None:
+        """Accumulate latency and tokens for one stage of a multi-call reasoning engine"""
+        with self._lock:
+            stage = self.stage_stats.setdefault(name, {'runs': 0, 'latency': 0.0, 'tokens': 0})
+            stage['runs'] += 1
+            stage['latency'] += latency
+            stage['tokens'] += tokens
+    
+    def record_rate_limit_wait(self, seconds: float) -> None:
+        """Record time a request spent waiting on a rate limiter"""
+        with self._lock:
+            self.rate_limit_waits += 1
+            self.rate_limit_wait_time += seconds
+    
+    def record_retry(self, backoff: float, resumed: bool = False) -> None:
+        """Record an API retry, the time spent backing off, and whether it resumed partial output"""
+        with self._lock:
+            self.api_retries += 1
+            self.retry_backoff_time += backoff
+            if resumed:
+                self.api_resumes += 1
+    
+    def record_route(self, decision: str) -> None:
+        """Count a model routing decision: 'auto' (router picked the model) or 'fallback'"""
+        with self._lock:
+            if decision == 'auto':
+                self.auto_routed += 1
+            elif decision == 'fallback':
+                self.model_fallbacks += 1
+    
+    def record_prompt_usage(self, prompt_tokens: int, cached_tokens: int, ttft: Optional[float] = None) -> None:
+        """Record a call's reported prompt tokens, those served from the provider's prefix cache, and its TTFT"""
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.cached_prompt_tokens += cached_tokens
+            self.prefix_cache_calls += 1
+            if cached_tokens:
+                self.prefix_cache_hits += 1
+            if ttft is not None:
+                if cached_tokens:
+                    self.ttft_cached += ttft
+                else:
+                    self.ttft_uncached += ttft
+    
+    def get_prefix_cache_stats(self) -> Dict[str, Any]:
+        """Provider prefix-cache hit rates and the average time to first token with and without a hit"""
+        with self._lock:
+            calls, hits = self.prefix_cache_calls, self.prefix_cache_hits
+            misses = calls - hits
+            avg_cached = self.ttft_cached / hits if hits else None
+            avg_uncached = self.ttft_uncached / misses if misses else None
+            return {
+                'calls': calls,
+                'hit_rate': round(hits / calls * 100, 1) if calls else 0.0,
+                'token_hit_rate': round(self.cached_prompt_tokens / max(1, self.prompt_tokens) * 100, 1),
+                'cached_tokens': self.cached_prompt_tokens,
+                'ttft_cached': avg_cached,
+                'ttft_uncached': avg_uncached,
+                'ttft_saved': avg_uncached - avg_cached if hits and misses else None
+            }
+    
+    def add_tokens_saved(self, tokens: int) -> None:
+        """Record output tokens avoided (e.g. patches instead of a full rewrite)"""
+        with self._lock:
+            self.tokens_saved += tokens
+    
+    def get_stage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of per-stage totals"""
+        with self._lock:
+            return {name: dict(stage) for name, stage in self.stage_stats.items()}
+    
     def reset(self) -> None:
         """Reset all metrics"""
         with self._lock:
             self.total_conversations = 0
             self.tokens_used = 0
+            self.completion_tokens = 0
             self.inference_time = 0.0
+            self.total_inference_time = 0.0
             self.reasoning_depth = 0
             self.self_corrections = 0
             self.confidence_score = 0.0
@@ -79,4 +181,21 @@ class ConversationMetrics:
             self.error_count = 0
             self.cache_hits = 0
             self.cache_misses = 0
+            self.cache_fuzzy_hits = 0
+            self.coalesced_requests = 0
+            self.tokens_saved = 0
+            self.rate_limit_waits = 0
+            self.rate_limit_wait_time = 0.0
+            self.api_retries = 0
+            self.api_resumes = 0
+            self.retry_backoff_time = 0.0
+            self.auto_routed = 0
+            self.model_fallbacks = 0
+            self.prompt_tokens = 0
+            self.cached_prompt_tokens = 0
+            self.prefix_cache_calls = 0
+            self.prefix_cache_hits = 0
+            self.ttft_cached = 0.0
+            self.ttft_uncached = 0.0
+            self.stage_stats = {}
             self.session_start = format_timestamp()
@@ -1,9 +1,25 @@
 """
 Services package initialization
 """
-from .cache_service import ResponseCache
-from .rate_limiter import RateLimiter
+from .cache_service import ResponseCache, ShardedResponseCache, create_response_cache
+from .persistent_cache import SQLiteCacheStore
+from .semantic_index import SemanticCacheIndex
+from .rate_limiter import RateLimiter, TokenRateLimiter
+from .single_flight import SingleFlight
+from .model_router import ModelRouter
 from .export_service import ConversationExporter
 from .analytics_service import AnalyticsService
 
-__all__ = ['ResponseCache', 'RateLimiter', 'ConversationExporter', 'AnalyticsService']
+__all__ = [
+    'ResponseCache',
+    'ShardedResponseCache',
+    'create_response_cache',
+    'SQLiteCacheStore',
+    'SemanticCacheIndex',
+    'RateLimiter',
+    'TokenRateLimiter',
+    'SingleFlight',
+    'ModelRouter',
+    'ConversationExporter',
+    'AnalyticsService'
+]
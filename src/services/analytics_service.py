@@ -1,7 +1,7 @@
 """
 Analytics and insights generation service
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from collections import Counter
 from src.models.entry import ConversationEntry
 from src.models.metrics import ConversationMetrics
@@ -15,11 +15,12 @@ class AnalyticsService:
     
     @staticmethod
     def generate_analytics(conversations: List[ConversationEntry],
-                          metrics: ConversationMetrics,
-                          session_id: str,
-                          model_usage: Dict[str, int],
-                          mode_usage: Dict[str, int],
-                          cache_stats: dict) -> Dict[str, Any]:
+                           metrics: ConversationMetrics,
+                           session_id: str,
+                           model_usage: Dict[str, int],
+                           mode_usage: Dict[str, int],
+                           cache_stats: dict,
+                           routing_stats: Optional[dict] = None) -> Dict[str, Any]:
         """
         📊 GENERATE COMPREHENSIVE ANALYTICS
         """
@@ -54,8 +55,21 @@ class AnalyticsService:
             'mode_distribution': dict(mode_usage),
             'cache_hits': cache_stats.get('hits', 0),
             'cache_misses': cache_stats.get('misses', 0),
+            'cache_fuzzy_hits': cache_stats.get('fuzzy_hits', 0),
             'cache_hit_rate': cache_stats.get('hit_rate', '0.0'),
+            'coalesced_requests': metrics.coalesced_requests,
             'error_count': metrics.error_count,
+            'tokens_saved': metrics.tokens_saved,
+            'rate_limit_waits': metrics.rate_limit_waits,
+            'rate_limit_wait_time': metrics.rate_limit_wait_time,
+            'api_retries': metrics.api_retries,
+            'api_resumes': metrics.api_resumes,
+            'retry_backoff_time': metrics.retry_backoff_time,
+            'stage_stats': metrics.get_stage_stats(),
+            'auto_routed': metrics.auto_routed,
+            'model_fallbacks': metrics.model_fallbacks,
+            'model_latency': (routing_stats or {}).get('models', {}),
+            'prefix_cache': metrics.get_prefix_cache_stats(),
             'avg_confidence': sum(conv.confidence_score for conv in conversations) / len(conversations) if conversations else 0
         }
         
@@ -64,7 +78,7 @@ class AnalyticsService:
     
     @staticmethod
     def search_conversations(conversations: List[ConversationEntry], 
-                           keyword: str) -> List[tuple]:
+                             keyword: str) -> List[tuple]:
         """
         🔍 SEARCH CONVERSATIONS BY KEYWORD
         """
@@ -3,67 +3,166 @@ Response caching service with LRU and TTL
 """
 import time
 import threading
-from typing import Dict, Tuple, Optional, Any
+from collections import OrderedDict
+from typing import Tuple, Optional, Any
 from src.utils.logger import logger
 
 
 class ResponseCache:
     """
     💾 THREAD-SAFE LRU CACHE WITH TTL
+    O(1) get/set/evict backed by two OrderedDicts:
+    - ``cache`` is kept in recency order (least recently used first)
+    - ``_expiry`` is kept in write-time order, so expired entries are always at its head
+    An optional persistent ``l2`` store is read on L1 miss and written on set
     """
-    def __init__(self, maxsize: int = 100, ttl: int = 3600):
-        self.cache: Dict[str, Tuple[Any, float]] = {}
+    # Number of expired entries purged per write (amortized expiry sweep)
+    SWEEP_BATCH = 8
+    
+    def __init__(self, maxsize: int = 100, ttl: int = 3600, l2=None):
+        self.cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
         self.maxsize = maxsize
         self.ttl = ttl
         self.lock = threading.Lock()
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.l2 = l2
+        self.l2_hits = 0
+        self.fuzzy_hits = 0
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: str, fuzzy: bool = False) -> Optional[Any]:
         """
         ✅ GET CACHED VALUE WITH TTL CHECK
+        ``fuzzy`` marks a follow-up lookup for a near-duplicate query: a hit is
+        counted as a fuzzy hit and a miss is not counted again
         """
         with self.lock:
-            if key not in self.cache:
-                self.misses += 1
-                return None
-            
-            value, timestamp = self.cache[key]
-            
-            # Check if expired
-            if time.time() - timestamp > self.ttl:
-                del self.cache[key]
-                self.misses += 1
-                logger.debug(f"🕐 Cache expired for key: {key[:20]}...")
+            entry = self.cache.get(key)
+            if entry is not None:
+                value, timestamp = entry
+                
+                # Check if expired
+                if time.time() - timestamp <= self.ttl:
+                    # Refresh recency
+                    self.cache.move_to_end(key)
+                    self._count_hit(fuzzy)
+                    logger.debug("✅ Cache hit for key: %.20s...", key)
+                    return value
+                
+                self._remove(key)
+                self.expirations += 1
+                logger.debug("🕐 Cache expired for key: %.20s...", key)
+        
+        # L1 miss - fall through to the persistent tier
+        stored = self.l2.get(key) if self.l2 is not None else None
+        
+        with self.lock:
+            if stored is None:
+                if not fuzzy:
+                    self.misses += 1
                 return None
             
+            value, timestamp = stored
+            self._store(key, value, timestamp)
+            self._count_hit(fuzzy)
+            self.l2_hits += 1
+        
+        logger.debug("🗄️ Persistent cache hit for key: %.20s...", key)
+        return value
+    
+    def _count_hit(self, fuzzy: bool) -> None:
+        """Record a hit (lock must be held)"""
+        if fuzzy:
+            self.fuzzy_hits += 1
+        else:
             self.hits += 1
-            logger.debug(f"✅ Cache hit for key: {key[:20]}...")
-            return value
     
     def set(self, key: str, value: Any) -> None:
         """
         ✅ SET CACHE VALUE WITH LRU EVICTION
         """
+        now = time.time()
+        
         with self.lock:
-            # Evict oldest if at capacity
-            if len(self.cache) >= self.maxsize and key not in self.cache:
-                oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k][1])
-                del self.cache[oldest_key]
-                logger.debug(f"🗑️ Evicted cache entry: {oldest_key[:20]}...")
-            
-            self.cache[key] = (value, time.time())
-            logger.debug(f"💾 Cached response for key: {key[:20]}...")
+            self._store(key, value, now)
+        
+        if self.l2 is not None:
+            self.l2.set(key, value, now)
+        logger.debug("💾 Cached response for key: %.20s...", key)
     
-    def clear(self) -> None:
+    def _store(self, key: str, value: Any, timestamp: float) -> None:
+        """
+        Insert into L1, evicting the least recently used entry if full (lock must be held).
+        ``timestamp`` predates newer writes when the entry is promoted from L2;
+        it is then slotted in behind them so ``_expiry`` stays in time order
+        """
+        self._sweep_expired(time.time(), self.SWEEP_BATCH)
+        
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self._expiry.move_to_end(key)
+        elif len(self.cache) >= self.maxsize:
+            # Evict least recently used
+            evicted, _ = self.cache.popitem(last=False)
+            del self._expiry[evicted]
+            self.evictions += 1
+        
+        self.cache[key] = (value, timestamp)
+        self._expiry[key] = timestamp
+        
+        newer = []
+        for other in reversed(self._expiry):
+            if other != key:
+                if self._expiry[other] <= timestamp:
+                    break
+                newer.append(other)
+        for other in reversed(newer):
+            self._expiry.move_to_end(other)
+    
+    def purge_expired(self) -> int:
+        """
+        🧹 REMOVE ALL EXPIRED ENTRIES
+        Returns the number of entries removed
+        """
+        with self.lock:
+            return self._sweep_expired(time.time())
+    
+    def _sweep_expired(self, now: float, limit: Optional[int] = None) -> int:
+        """Pop expired entries from the head of the write-ordered index (lock must be held)"""
+        removed = 0
+        while self._expiry and (limit is None or removed < limit):
+            key, timestamp = next(iter(self._expiry.items()))
+            if now - timestamp <= self.ttl:
+                break
+            self._remove(key)
+            removed += 1
+        self.expirations += removed
+        return removed
+    
+    def _remove(self, key: str) -> None:
+        """Remove a key from both indexes (lock must be held)"""
+        self.cache.pop(key, None)
+        self._expiry.pop(key, None)
+    
+    def clear(self, include_l2: bool = True) -> None:
         """
         🗑️ CLEAR ALL CACHE ENTRIES
         """
         with self.lock:
             self.cache.clear()
+            self._expiry.clear()
             self.hits = 0
             self.misses = 0
-            logger.info("🗑️ Cache cleared")
+            self.evictions = 0
+            self.expirations = 0
+            self.l2_hits = 0
+            self.fuzzy_hits = 0
+        if include_l2 and self.l2 is not None:
+            self.l2.clear()
+        logger.info("🗑️ Cache cleared")
     
     def get_stats(self) -> dict:
         """
@@ -72,17 +171,128 @@ class ResponseCache:
         with self.lock:
             total_requests = self.hits + self.misses
             hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
+            fuzzy_rate = (self.fuzzy_hits / total_requests * 100) if total_requests > 0 else 0
             
-            return {
+            stats = {
                 'size': len(self.cache),
                 'maxsize': self.maxsize,
                 'hits': self.hits,
+                'fuzzy_hits': self.fuzzy_hits,
                 'misses': self.misses,
                 'hit_rate': f"{hit_rate:.1f}",
-                'ttl': self.ttl
+                'fuzzy_hit_rate': f"{fuzzy_rate:.1f}",
+                'ttl': self.ttl,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'l2_hits': self.l2_hits
             }
+        
+        if self.l2 is not None:
+            stats['persistent'] = self.l2.get_stats()
+        return stats
     
     def __len__(self) -> int:
         """Get current cache size"""
         with self.lock:
             return len(self.cache)
+
+
+class ShardedResponseCache:
+    """
+    🧩 LOCK-STRIPED RESPONSE CACHE
+    Spreads keys across N independently locked ResponseCache segments so
+    concurrent workers only contend when they hit the same shard
+    """
+    
+    def __init__(self, maxsize: int = 100, ttl: int = 3600, shards: int = 4, l2=None):
+        self.num_shards = max(1, min(shards, maxsize))
+        # Spread the remainder so the shards add up to exactly maxsize
+        base, extra = divmod(maxsize, self.num_shards)
+        self.shards = [ResponseCache(base + (1 if i < extra else 0), ttl) for i in range(self.num_shards)]
+        self.l2 = l2
+        for shard in self.shards:
+            shard.l2 = l2
+        self.maxsize = maxsize
+        self.ttl = ttl
+    
+    def _shard_for(self, key: str) -> ResponseCache:
+        """Pick the shard for a key (keys are sha256 hex digests, so the prefix is uniform)"""
+        try:
+            index = int(key[:16], 16)
+        except ValueError:
+            index = hash(key)
+        return self.shards[index % self.num_shards]
+    
+    def get(self, key: str, fuzzy: bool = False) -> Optional[Any]:
+        """
+        ✅ GET CACHED VALUE FROM ITS SHARD
+        """
+        return self._shard_for(key).get(key, fuzzy)
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        ✅ SET CACHE VALUE IN ITS SHARD
+        """
+        self._shard_for(key).set(key, value)
+    
+    def purge_expired(self) -> int:
+        """
+        🧹 REMOVE EXPIRED ENTRIES FROM ALL SHARDS
+        """
+        return sum(shard.purge_expired() for shard in self.shards)
+    
+    def clear(self) -> None:
+        """
+        🗑️ CLEAR ALL SHARDS
+        """
+        for shard in self.shards:
+            shard.clear(include_l2=False)
+        if self.l2 is not None:
+            self.l2.clear()
+    
+    def get_stats(self) -> dict:
+        """
+        📊 GET AGGREGATED CACHE STATISTICS
+        """
+        shard_stats = [shard.get_stats() for shard in self.shards]
+        hits = sum(s['hits'] for s in shard_stats)
+        fuzzy_hits = sum(s['fuzzy_hits'] for s in shard_stats)
+        misses = sum(s['misses'] for s in shard_stats)
+        total_requests = hits + misses
+        hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0
+        fuzzy_rate = (fuzzy_hits / total_requests * 100) if total_requests > 0 else 0
+        
+        stats = {
+            'size': sum(s['size'] for s in shard_stats),
+            'maxsize': self.maxsize,
+            'hits': hits,
+            'fuzzy_hits': fuzzy_hits,
+            'misses': misses,
+            'hit_rate': f"{hit_rate:.1f}",
+            'fuzzy_hit_rate': f"{fuzzy_rate:.1f}",
+            'ttl': self.ttl,
+            'evictions': sum(s['evictions'] for s in shard_stats),
+            'expirations': sum(s['expirations'] for s in shard_stats),
+            'l2_hits': sum(s['l2_hits'] for s in shard_stats),
+            'shards': self.num_shards,
+            'shard_stats': shard_stats
+        }
+        
+        if self.l2 is not None:
+            stats['persistent'] = self.l2.get_stats()
+        return stats
+    
+    def __len__(self) -> int:
+        """Get current cache size across shards"""
+        return sum(len(shard) for shard in self.shards)
+
+
+def create_response_cache(maxsize: int, ttl: int, shards: int = 1, l2=None):
+    """
+    🏭 BUILD A RESPONSE CACHE
+    Returns a sharded cache when more than one shard is configured
+    """
+    if shards > 1:
+        logger.info(f"🧩 Using sharded response cache ({shards} shards)")
+        return ShardedResponseCache(maxsize, ttl, shards, l2)
+    return ResponseCache(maxsize, ttl, l2)
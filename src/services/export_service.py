@@ -60,7 +60,8 @@ class ConversationExporter:
                 lines.append(f"**Timestamp:** {conv.timestamp}  ")
                 lines.append(f"**Model:** {conv.model}  ")
                 lines.append(f"**Reasoning Mode:** {conv.reasoning_mode}  ")
-                lines.append(f"**Tokens Used:** {conv.tokens_used}  ")
+                lines.append(f"**Tokens Used:** {conv.tokens_used} ({conv.prompt_tokens} prompt, "
+                             f"{conv.completion_tokens} completion)  ")
                 lines.append(f"**Inference Time:** {conv.inference_time:.2f}s\n")
             
             lines.append(f"**👤 User:**\n{conv.user_message}\n")
@@ -331,7 +332,6 @@ class ConversationExporter:
 
         logger.info(f"✅ PDF exported: {filename}")
         return str(filename)
-
     
     def export(self, conversations: List[ConversationEntry], 
                format_type: str, include_metadata: bool = True) -> Tuple[str, Optional[str]]:
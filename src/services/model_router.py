@@ -0,0 +1,134 @@
+"""
+Model routing: latency tracking, fallbacks and automatic model choice
+"""
+import math
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional
+from src.config.constants import ModelConfig
+from src.utils.logger import logger
+
+
+class ModelRouter:
+    """
+    🧭 MODEL ROUTER
+    Tracks time-to-first-token per model over a sliding window of requests,
+    takes models that keep failing out of rotation for a cooldown, and picks
+    compatible models to fall back to (or to use outright for "auto") from
+    their ``max_context`` and observed p50/p95 latency
+    """
+    
+    def __init__(self, window: int = 100, cooldown: float = 60.0, latency_budget: float = 2.0):
+        self.window = window
+        self.cooldown = cooldown
+        self.latency_budget = latency_budget
+        self.decisions: Counter = Counter()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._failures: Counter = Counter()
+        self._cooling_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def record_latency(self, model_id: str, seconds: float) -> None:
+        """
+        ⏱️ RECORD A MODEL'S TIME TO FIRST TOKEN
+        """
+        with self._lock:
+            samples = self._latencies.get(model_id)
+            if samples is None:
+                samples = self._latencies[model_id] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._cooling_until.pop(model_id, None)
+    
+    def record_failure(self, model_id: str) -> None:
+        """
+        ❄️ COOL DOWN A MODEL THAT FAILED (ERROR, TIMEOUT OR EXHAUSTED QUOTA)
+        """
+        with self._lock:
+            self._failures[model_id] += 1
+            self._cooling_until[model_id] = time.monotonic() + self.cooldown
+    
+    def percentile(self, model_id: str, q: float) -> Optional[float]:
+        """
+        📈 NEAREST-RANK PERCENTILE OF A MODEL'S LATENCY (None without samples)
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(model_id, ()))
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(q / 100 * len(samples)) - 1)]
+    
+    def _candidates(self, tokens: int) -> List[ModelConfig]:
+        """Chat models whose context fits ``tokens`` and that aren't cooling down"""
+        now = time.monotonic()
+        with self._lock:
+            cooling = {model_id for model_id, until in self._cooling_until.items() if until > now}
+        return [
+            model for model in ModelConfig
+            if model.is_chat and model.max_context >= tokens and model.model_id not in cooling
+        ]
+    
+    def fallbacks(self, model_id: str, tokens: int) -> List[str]:
+        """
+        ↪️ COMPATIBLE MODELS TO TRY WHEN ``model_id`` FAILS
+        Closest in size first (a stand-in for quality), then fastest p50
+        """
+        try:
+            size = ModelConfig.get_by_id(model_id).params_b
+        except ValueError:
+            size = ModelConfig.get_recommended().params_b
+        
+        candidates = [model for model in self._candidates(tokens) if model.model_id != model_id]
+        candidates.sort(key=lambda model: (
+            abs(model.params_b - size), self.percentile(model.model_id, 50) or math.inf
+        ))
+        return [model.model_id for model in candidates]
+    
+    def auto(self, tokens: int) -> str:
+        """
+        🤖 PICK A MODEL FOR A REQUEST OF ``tokens`` (PROMPT PLUS COMPLETION)
+        Prefers the recommended model, then the largest, among models whose
+        p95 latency is within budget (or not yet measured); if none is,
+        the one with the lowest p95
+        """
+        candidates = self._candidates(tokens)
+        if not candidates:
+            candidates = [max((model for model in ModelConfig if model.is_chat), key=lambda model: model.max_context)]
+        
+        recommended = ModelConfig.get_recommended()
+        
+        def rank(model: ModelConfig) -> tuple:
+            p95 = self.percentile(model.model_id, 95)
+            over_budget = p95 is not None and p95 > self.latency_budget
+            return (over_budget, p95 if over_budget else 0.0, model is not recommended,
+                    -model.params_b, self.percentile(model.model_id, 50) or 0.0)
+        
+        choice = min(candidates, key=rank).model_id
+        self.record_decision('auto')
+        logger.info(f"🧭 Auto-routed a {tokens}-token request to {choice}")
+        return choice
+    
+    def record_decision(self, decision: str) -> None:
+        """Count a routing decision ('auto', 'fallback')"""
+        with self._lock:
+            self.decisions[decision] += 1
+    
+    def get_stats(self) -> dict:
+        """
+        📊 PER-MODEL LATENCY AND ROUTING STATISTICS
+        """
+        with self._lock:
+            model_ids = list(self._latencies)
+            failures = dict(self._failures)
+            decisions = dict(self.decisions)
+        
+        models = {}
+        for model_id in set(model_ids) | set(failures):
+            p50, p95 = self.percentile(model_id, 50), self.percentile(model_id, 95)
+            models[model_id] = {
+                'samples': len(self._latencies.get(model_id, ())),
+                'p50': round(p50, 3) if p50 is not None else None,
+                'p95': round(p95, 3) if p95 is not None else None,
+                'failures': failures.get(model_id, 0)
+            }
+        return {'models': models, 'decisions': decisions}
@@ -0,0 +1,211 @@
+"""
+Persistent on-disk cache tier backed by SQLite (WAL mode)
+"""
+import atexit
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+from src.utils.logger import logger
+
+
+class SQLiteCacheStore:
+    """
+    🗄️ PERSISTENT L2 CACHE STORE
+    Reads run on per-thread connections; writes are queued and applied by a
+    single background writer that also compacts expired rows periodically
+    """
+    _STOP = object()
+    _CLEAR = object()
+    
+    def __init__(self, path: Path, ttl: int = 3600, compact_interval: int = 300):
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.ttl = ttl
+        self.compact_interval = compact_interval
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compacted = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON responses(created_at)")
+        conn.close()
+        
+        self._writer = threading.Thread(target=self._writer_loop, name="cache-l2-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)  # apply queued writes before the process exits
+        logger.info(f"🗄️ Persistent cache ready at {self.path}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    @property
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        ✅ READ A LIVE ENTRY
+        Returns (value, created_at) or None if missing/expired
+        """
+        try:
+            row = self._reader.execute(
+                "SELECT value, created_at FROM responses WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+            result = (pickle.loads(row[0]), row[1]) if row else None
+        except Exception as e:
+            logger.warning(f"⚠️ Persistent cache read failed: {e}")
+            result = None
+        
+        with self._stats_lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+    
+    def set(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        """
+        ✅ QUEUE AN ASYNCHRONOUS WRITE
+        """
+        self._queue.put((key, value, created_at or time.time()))
+    
+    def clear(self) -> None:
+        """
+        🗑️ QUEUE REMOVAL OF ALL ENTRIES
+        """
+        self._queue.put(self._CLEAR)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued writes have been applied (False on timeout)"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self) -> None:
+        """
+        🔒 FLUSH PENDING WRITES AND STOP THE WRITER
+        """
+        if self._writer.is_alive():
+            self._queue.put(self._STOP)
+            self._writer.join(timeout=5)
+    
+    def compact(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        🧹 DELETE EXPIRED ROWS
+        """
+        conn = conn or self._reader
+        removed = conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+        ).rowcount
+        with self._stats_lock:
+            self.compacted += removed
+        if removed:
+            logger.debug(f"🧹 Compacted {removed} expired persistent cache entries")
+        return removed
+    
+    def _writer_loop(self) -> None:
+        conn = self._connect()
+        next_compaction = time.time() + self.compact_interval
+        pending = None
+        
+        while True:
+            if pending is not None:
+                item, pending = pending, None
+            else:
+                try:
+                    item = self._queue.get(timeout=max(0.0, next_compaction - time.time()))
+                except queue.Empty:
+                    item = None
+            
+            try:
+                if item is self._STOP:
+                    break
+                if item is self._CLEAR:
+                    conn.execute("DELETE FROM responses")
+                elif isinstance(item, threading.Event):
+                    item.set()
+                elif item is not None:
+                    pending = self._write_batch(conn, item)
+                
+                if time.time() >= next_compaction:
+                    self.compact(conn)
+                    next_compaction = time.time() + self.compact_interval
+            except Exception as e:
+                logger.warning(f"⚠️ Persistent cache write failed: {e}")
+        
+        conn.close()
+    
+    def _write_batch(self, conn: sqlite3.Connection, first: tuple) -> Optional[Any]:
+        """
+        Write the given entry plus any entries already queued in one transaction.
+        Returns the first non-write (control) item encountered, if any, even
+        when the write fails, so a queued flush() is always released.
+        """
+        batch = [first]
+        control = None
+        while control is None:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple):
+                batch.append(item)
+            else:
+                control = item
+        
+        rows = []
+        for key, value, created_at in batch:
+            try:
+                rows.append((key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), created_at))
+            except Exception as e:
+                logger.warning(f"⚠️ Persistent cache skipped an unpicklable entry: {e}")
+        
+        try:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")  # a transaction left open would make every later BEGIN fail
+                raise
+        except Exception as e:
+            logger.warning(f"⚠️ Persistent cache write of {len(rows)} entries failed: {e}")
+            return control
+        
+        with self._stats_lock:
+            self.writes += len(rows)
+        return control
+    
+    def get_stats(self) -> dict:
+        """
+        📊 GET PERSISTENT TIER STATISTICS
+        """
+        with self._stats_lock:
+            return {
+                'path': str(self.path),
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'pending_writes': self._queue.qsize(),
+                'compacted': self.compacted
+            }
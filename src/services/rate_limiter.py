@@ -1,66 +1,185 @@
 """
 Token bucket rate limiting service
 """
+import asyncio
 import time
 import threading
-from collections import deque
+from typing import Callable, Dict, Optional, Tuple
 from src.utils.logger import logger
 
 
 class RateLimiter:
     """
     ⏱️ TOKEN BUCKET RATE LIMITER
+    Holds up to ``max_requests`` tokens, refilled continuously at
+    ``max_requests / window_seconds`` per second. State is O(1) and the
+    lock only guards a few arithmetic operations: callers reserve their
+    tokens (the bucket may go negative) and sleep *outside* the lock until
+    the reservation matures, so waiters are served in FIFO order and never
+    block callers that could already proceed.
     """
-    def __init__(self, max_requests: int = 50, window_seconds: int = 60):
+    def __init__(self, max_requests: int = 50, window_seconds: int = 60,
+                 on_wait: Optional[Callable[[float], None]] = None):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = deque()
+        self.rate = max_requests / window_seconds
+        self.on_wait = on_wait
         self.lock = threading.Lock()
+        self._tokens = float(max_requests)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.throttled = 0
+        self.total_wait = 0.0
     
-    def acquire(self) -> bool:
+    def _refill(self, now: float) -> None:
+        """Credit tokens earned since the last update (lock must be held)"""
+        self._tokens = min(float(self.max_requests), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def _reserve(self, cost: float, timeout: Optional[float],
+                 clamp: bool = False) -> Optional[Tuple[float, float]]:
         """
-        ✅ ACQUIRE RATE LIMIT TOKEN
-        Returns True if request is allowed, False otherwise
+        Take ``cost`` tokens, returning (seconds the caller must wait before
+        using them, tokens taken), or None (and take nothing) if the wait
+        exceeds ``timeout``. With ``clamp`` a cost above the capacity takes a
+        full bucket instead of failing; that is decided under the lock, as
+        update_from_headers may shrink the capacity at any time
         """
         with self.lock:
-            current_time = time.time()
-            
-            # Remove expired requests
-            while self.requests and current_time - self.requests[0] > self.window_seconds:
-                self.requests.popleft()
-            
-            # Check if under limit
-            if len(self.requests) < self.max_requests:
-                self.requests.append(current_time)
-                logger.debug(f"✅ Rate limit check passed ({len(self.requests)}/{self.max_requests})")
-                return True
-            
-            # Calculate wait time
-            wait_time = self.window_seconds - (current_time - self.requests[0])
-            logger.warning(f"⏳ Rate limit exceeded. Wait {wait_time:.1f}s")
-            
-            # Wait and retry
-            time.sleep(wait_time + 0.1)
-            self.requests.popleft()
-            self.requests.append(time.time())
-            return True
+            if cost > self.max_requests:
+                if not clamp:
+                    raise ValueError(f"Cost {cost} exceeds bucket capacity {self.max_requests}")
+                cost = float(self.max_requests)
+            now = time.monotonic()
+            self._refill(now)
+            wait_time = max(0.0, (cost - self._tokens) / self.rate, self._paused_until - now)
+            if timeout is not None and wait_time > timeout:
+                return None
+            self._tokens -= cost
+            if wait_time:
+                self.throttled += 1
+                self.total_wait += wait_time
+        
+        if wait_time and self.on_wait is not None:
+            self.on_wait(wait_time)
+        return wait_time, cost
+    
+    def available_in(self, cost: float = 1) -> float:
+        """
+        ⏳ SECONDS UNTIL ``cost`` TOKENS COULD BE TAKEN (without taking them)
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            cost = min(cost, float(self.max_requests))
+            return max(0.0, (cost - self._tokens) / self.rate, self._paused_until - now)
+    
+    def reconcile(self, reserved: float, actual: float) -> None:
+        """
+        🔁 SETTLE A RESERVATION AGAINST ACTUAL USE
+        Unused tokens go back to the bucket; overruns are charged as debt
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self._tokens = min(float(self.max_requests), self._tokens + reserved - actual)
+    
+    def pause(self, seconds: float) -> None:
+        """
+        ⏸️ HOLD ALL RESERVATIONS FOR ``seconds`` (e.g. until a server-advertised reset)
+        """
+        with self.lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def update_from_headers(self, remaining: Optional[float], reset_after: Optional[float],
+                            limit: Optional[float] = None) -> None:
+        """
+        📨 ALIGN THE BUCKET WITH THE SERVER'S VIEW OF THE BUDGET
+        Adopts an advertised per-window ``limit``, never holds more tokens than
+        the server says remain, and pauses until the reset once they run out
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            if limit and int(limit) != self.max_requests:
+                logger.info(f"📨 Rate limit adjusted from {self.max_requests} to {int(limit)} per {self.window_seconds}s")
+                self.max_requests = int(limit)
+                self.rate = self.max_requests / self.window_seconds
+            exhausted = remaining is not None and remaining <= 0 and bool(reset_after)
+            if remaining is not None and not exhausted:
+                self._tokens = min(self._tokens, remaining)
+        
+        if exhausted:
+            self.pause(reset_after)  # the server's budget is back after the reset
+    
+    def try_acquire(self, cost: float = 1) -> bool:
+        """
+        ✅ TAKE TOKENS ONLY IF AVAILABLE NOW
+        """
+        return self.acquire(cost, timeout=0)
+    
+    def acquire(self, cost: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        ✅ ACQUIRE RATE LIMIT TOKENS
+        Blocks until the tokens are available; returns False without taking
+        any if that would take longer than ``timeout`` seconds
+        """
+        return self.reserve(cost, timeout) is not None
+    
+    async def aacquire(self, cost: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        ✅ ACQUIRE RATE LIMIT TOKENS WITHOUT BLOCKING THE EVENT LOOP
+        """
+        return await self.areserve(cost, timeout) is not None
+    
+    def reserve(self, cost: float = 1, timeout: Optional[float] = None, clamp: bool = False) -> Optional[float]:
+        """
+        ✅ LIKE ACQUIRE, RETURNING THE TOKENS TAKEN (None on timeout)
+        """
+        reservation = self._reserve(cost, timeout, clamp)
+        if reservation is None:
+            return None
+        
+        wait_time, taken = reservation
+        if wait_time:
+            logger.warning(f"⏳ Rate limit reached. Waiting {wait_time:.1f}s")
+            time.sleep(wait_time)
+        else:
+            logger.debug("✅ Rate limit check passed")
+        return taken
+    
+    async def areserve(self, cost: float = 1, timeout: Optional[float] = None,
+                       clamp: bool = False) -> Optional[float]:
+        """
+        ✅ ASYNC COUNTERPART OF RESERVE
+        """
+        reservation = self._reserve(cost, timeout, clamp)
+        if reservation is None:
+            return None
+        
+        wait_time, taken = reservation
+        if wait_time:
+            logger.warning(f"⏳ Rate limit reached. Waiting {wait_time:.1f}s")
+            try:
+                await asyncio.sleep(wait_time)
+            except asyncio.CancelledError:
+                self.reconcile(taken, 0)
+                raise
+        return taken
     
     def get_stats(self) -> dict:
         """
         📊 GET RATE LIMITER STATISTICS
         """
         with self.lock:
-            current_time = time.time()
-            
-            # Remove expired
-            while self.requests and current_time - self.requests[0] > self.window_seconds:
-                self.requests.popleft()
+            self._refill(time.monotonic())
+            remaining = max(0, int(self._tokens))
             
             return {
-                'current_requests': len(self.requests),
+                'current_requests': self.max_requests - remaining,
                 'max_requests': self.max_requests,
                 'window_seconds': self.window_seconds,
-                'remaining': self.max_requests - len(self.requests)
+                'remaining': remaining,
+                'throttled': self.throttled,
+                'total_wait': round(self.total_wait, 2)
             }
     
     def reset(self) -> None:
@@ -68,5 +187,78 @@ class RateLimiter:
         🔄 RESET RATE LIMITER
         """
         with self.lock:
-            self.requests.clear()
+            self._tokens = float(self.max_requests)
+            self._updated = time.monotonic()
+            self.throttled = 0
+            self.total_wait = 0.0
             logger.info("🔄 Rate limiter reset")
+
+
+class TokenRateLimiter:
+    """
+    🔢 TOKENS-PER-MINUTE RATE LIMITER
+    One token bucket per model ID (Groq's TPM limits are per model).
+    Callers reserve their estimated prompt tokens plus ``max_tokens`` before
+    a request and reconcile with the actual usage afterwards.
+    """
+    def __init__(self, tokens_per_minute: int = 30000, overrides: Optional[Dict[str, int]] = None,
+                 on_wait: Optional[Callable[[float], None]] = None):
+        self.tokens_per_minute = tokens_per_minute
+        self.overrides = dict(overrides or {})
+        self.on_wait = on_wait
+        self.buckets: Dict[str, RateLimiter] = {}
+        self.lock = threading.Lock()
+    
+    def bucket(self, model_id: str) -> RateLimiter:
+        """The model's bucket (created on first use)"""
+        with self.lock:
+            limiter = self.buckets.get(model_id)
+            if limiter is None:
+                limit = self.overrides.get(model_id, self.tokens_per_minute)
+                limiter = self.buckets[model_id] = RateLimiter(limit, 60, self.on_wait)
+            return limiter
+    
+    def reserve(self, model_id: str, tokens: int, timeout: Optional[float] = None) -> int:
+        """
+        ✅ RESERVE TOKENS FOR A REQUEST
+        Returns the tokens reserved (pass to reconcile), or 0 on timeout.
+        A request larger than the whole budget waits for a full bucket instead of failing
+        """
+        taken = self.bucket(model_id).reserve(tokens, timeout, clamp=True)
+        return int(taken) if taken is not None else 0
+    
+    async def areserve(self, model_id: str, tokens: int, timeout: Optional[float] = None) -> int:
+        """
+        ✅ RESERVE TOKENS WITHOUT BLOCKING THE EVENT LOOP
+        """
+        taken = await self.bucket(model_id).areserve(tokens, timeout, clamp=True)
+        return int(taken) if taken is not None else 0
+    
+    def reconcile(self, model_id: str, reserved: int, actual: int) -> None:
+        """
+        🔁 SETTLE A RESERVATION WITH THE TOKENS ACTUALLY USED
+        """
+        if reserved:
+            self.bucket(model_id).reconcile(reserved, actual)
+    
+    def update_from_headers(self, model_id: str, remaining: Optional[float], reset_after: Optional[float],
+                            limit: Optional[float] = None) -> None:
+        """
+        📨 ALIGN A MODEL'S BUCKET WITH THE SERVER'S TOKEN BUDGET
+        """
+        self.bucket(model_id).update_from_headers(remaining, reset_after, limit)
+    
+    def get_stats(self) -> dict:
+        """
+        📊 PER-MODEL TOKEN BUDGET STATISTICS
+        """
+        with self.lock:
+            buckets = dict(self.buckets)
+        return {model_id: limiter.get_stats() for model_id, limiter in buckets.items()}
+    
+    def reset(self) -> None:
+        """
+        🔄 RESET ALL MODEL BUCKETS
+        """
+        with self.lock:
+            self.buckets.clear()
@@ -0,0 +1,150 @@
+"""
+Near-duplicate query index for fuzzy cache lookups (MinHash + LSH)
+"""
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from src.utils.logger import logger
+
+
+class SemanticCacheIndex:
+    """
+    🔎 MINHASH SIMILARITY INDEX
+    Maps normalized queries to cache keys so near-duplicate prompts can be
+    served from cache. Signatures are one-permutation MinHash over character
+    n-grams (one hash per n-gram, so signing is linear in query length); LSH
+    banding keeps lookups sub-linear, and candidates are verified against
+    the similarity threshold before being returned. Lookups are scoped
+    (model/mode/params) so fuzzy hits never cross generation settings.
+    """
+    def __init__(self, threshold: float = 0.85, maxsize: int = 1000,
+                 num_perm: int = 64, bands: int = 16, ngram: int = 3):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        
+        self._entries: "OrderedDict[str, Tuple[str, Tuple[int, ...]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+    
+    def _shingles(self, text: str) -> Set[int]:
+        n = self.ngram
+        grams = {text[i:i + n] for i in range(max(1, len(text) - n + 1))}
+        return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), 'big')
+                for g in grams}
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        ✍️ COMPUTE MINHASH SIGNATURE
+        """
+        k = self.num_perm
+        bins: List[Optional[int]] = [None] * k
+        for h in self._shingles(text):
+            index, value = h % k, h // k
+            if bins[index] is None or value < bins[index]:
+                bins[index] = value
+        
+        # Densify empty bins by borrowing from the next non-empty bin
+        filled = [i for i in range(k) if bins[i] is not None]
+        if not filled:
+            return tuple([0] * k)
+        for i in range(k):
+            if bins[i] is None:
+                donor = next((j for j in filled if j > i), filled[0])
+                bins[i] = bins[donor] + (donor - i) % k
+        return tuple(bins)
+    
+    def _band_keys(self, scope: str, sig: Tuple[int, ...]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        return [(scope, i, sig[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+    
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+    
+    def add(self, scope: str, text: str, cache_key: str) -> None:
+        """
+        ✅ INDEX A CACHED QUERY
+        """
+        sig = self.signature(text)
+        with self._lock:
+            if cache_key in self._entries:
+                self._discard(cache_key)
+            elif len(self._entries) >= self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+            
+            self._entries[cache_key] = (scope, sig)
+            for band in self._band_keys(scope, sig):
+                self._buckets[band].add(cache_key)
+    
+    def lookup(self, scope: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        🔎 FIND THE MOST SIMILAR INDEXED QUERY
+        Returns (cache_key, similarity) if one clears the threshold
+        """
+        sig = self.signature(text)
+        best: Optional[Tuple[str, float]] = None
+        
+        with self._lock:
+            self.lookups += 1
+            candidates: Set[str] = set()
+            for band in self._band_keys(scope, sig):
+                candidates |= self._buckets.get(band, set())
+            
+            for key in candidates:
+                score = self.similarity(sig, self._entries[key][1])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (key, score)
+            
+            if best is not None:
+                self.matches += 1
+                self._entries.move_to_end(best[0])
+        
+        if best is not None:
+            logger.debug(f"🔎 Fuzzy cache match {best[0][:8]}... (similarity {best[1]:.2f})")
+        return best
+    
+    def _discard(self, cache_key: str) -> None:
+        """Remove a key from the index (lock must be held)"""
+        scope, sig = self._entries.pop(cache_key)
+        for band in self._band_keys(scope, sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(cache_key)
+                if not bucket:
+                    del self._buckets[band]
+    
+    def clear(self) -> None:
+        """
+        🗑️ CLEAR THE INDEX
+        """
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.lookups = 0
+            self.matches = 0
+    
+    def get_stats(self) -> dict:
+        """
+        📊 GET INDEX STATISTICS
+        """
+        with self._lock:
+            return {
+                'indexed': len(self._entries),
+                'lookups': self.lookups,
+                'matches': self.matches,
+                'threshold': self.threshold
+            }
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,146 @@
+"""
+Single-flight coalescing of identical in-flight requests
+"""
+import asyncio
+import threading
+from typing import AsyncGenerator, Dict, Generator, List, Tuple
+from src.utils.logger import logger
+
+
+class Flight:
+    """
+    ✈️ ONE IN-FLIGHT GENERATION
+    The leader publishes chunks; any number of followers (threads or
+    event-loop tasks) read them back in order as they arrive
+    """
+    
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks: List[str] = []
+        self.done = False
+        self.completed = False
+        self._cond = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+    
+    def _notify(self) -> None:
+        """Wake every waiter (condition must be held)"""
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # that follower's event loop has shut down
+    
+    def publish(self, chunk: str) -> None:
+        """Append a chunk and wake followers"""
+        with self._cond:
+            self.chunks.append(chunk)
+            self._notify()
+    
+    def finish(self, completed: bool) -> None:
+        """Mark the flight over; ``completed`` is False if the leader was abandoned"""
+        with self._cond:
+            self.done = True
+            self.completed = completed
+            self._notify()
+    
+    def wait(self, index: int) -> Tuple[List[str], bool]:
+        """
+        Block until there are chunks after ``index`` or the flight is over;
+        returns (new_chunks, done)
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.chunks) > index or self.done)
+            return self.chunks[index:], self.done
+    
+    async def await_chunks(self, index: int) -> Tuple[List[str], bool]:
+        """Async counterpart of wait"""
+        loop = asyncio.get_running_loop()
+        while True:
+            event = asyncio.Event()
+            with self._cond:
+                if len(self.chunks) > index or self.done:
+                    return self.chunks[index:], self.done
+                self._async_waiters.append((loop, event))
+            try:
+                await event.wait()
+            finally:
+                with self._cond:
+                    self._async_waiters.remove((loop, event))
+    
+    def subscribe(self) -> Generator[str, None, None]:
+        """
+        📡 FOLLOW THE LEADER'S STREAM FROM THE BEGINNING
+        """
+        index = 0
+        while True:
+            chunks, done = self.wait(index)
+            index += len(chunks)
+            yield from chunks
+            if done:
+                return
+    
+    async def asubscribe(self) -> AsyncGenerator[str, None]:
+        """
+        📡 FOLLOW THE LEADER'S STREAM WITHOUT BLOCKING THE EVENT LOOP
+        """
+        index = 0
+        while True:
+            chunks, done = await self.await_chunks(index)
+            index += len(chunks)
+            for chunk in chunks:
+                yield chunk
+            if done:
+                return
+
+
+class SingleFlight:
+    """
+    🛫 REQUEST COALESCING
+    The first caller for a key becomes the leader and does the work; callers
+    arriving while it is in flight follow its chunk stream instead of
+    repeating the request
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+    
+    def join(self, key: str) -> Tuple[Flight, bool]:
+        """
+        ✈️ JOIN OR START THE FLIGHT FOR A KEY
+        Returns (flight, is_leader)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.followers += 1
+                logger.info(f"🛫 Coalesced with in-flight request {key[:8]}...")
+                return flight, False
+            
+            flight = self._flights[key] = Flight(key)
+            self.leaders += 1
+            return flight, True
+    
+    def land(self, flight: Flight, completed: bool) -> None:
+        """
+        🛬 END A FLIGHT
+        Later callers start a new one (or hit the cache)
+        """
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        flight.finish(completed)
+    
+    def get_stats(self) -> dict:
+        """
+        📊 GET COALESCING STATISTICS
+        """
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'leaders': self.leaders,
+                'followers': self.followers
+            }
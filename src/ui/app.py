@@ -1,6 +1,7 @@
 """
 Main Gradio application interface
 """
+import threading
 import gradio as gr
 from src.core.reasoner import AdvancedReasoner
 from src.core.prompt_engine import PromptEngine
@@ -19,6 +20,8 @@ def create_ui() -> gr.Blocks:
     
     # Initialize reasoner and components
     reasoner = AdvancedReasoner()
+    if AppConfig.ENABLE_CONNECTION_WARMUP:
+        threading.Thread(target=reasoner.client_manager.warm_up, name="groq-warmup", daemon=True).start()
     components = UIComponents()
     handlers = EventHandlers(reasoner)
     
@@ -230,19 +233,31 @@ def create_ui() -> gr.Blocks:
         # State management
         sidebar_visible_state = gr.State(value=True)
         
-        # Message submission
+        # Message submission - the async handler streams on the event loop, so
+        # concurrent chats are bounded by the rate limiter rather than threads
+        if AppConfig.ENABLE_ASYNC_STREAMING:
+            message_handler = handlers.aprocess_message
+            chat_concurrency = AppConfig.MAX_CONCURRENT_STREAMS
+        else:
+            message_handler = handlers.process_message
+            chat_concurrency = AppConfig.MAX_WORKERS
+        
         submit_btn.click(
-            handlers.process_message,
+            message_handler,
             [msg, chatbot, reasoning_mode, enable_critique, model, 
              temperature, max_tokens, prompt_template, use_cache],
-            [chatbot, metrics_display]
+            [chatbot, metrics_display],
+            concurrency_limit=chat_concurrency,
+            concurrency_id="chat"
         ).then(lambda: "", None, msg)
         
         msg.submit(
-            handlers.process_message,
+            message_handler,
             [msg, chatbot, reasoning_mode, enable_critique, model, 
              temperature, max_tokens, prompt_template, use_cache],
-            [chatbot, metrics_display]
+            [chatbot, metrics_display],
+            concurrency_limit=chat_concurrency,
+            concurrency_id="chat"
         ).then(lambda: "", None, msg)
         
         # Chat controls
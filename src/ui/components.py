@@ -2,7 +2,7 @@
 Reusable UI components
 """
 from src.config.settings import AppConfig
-from src.config.constants import ReasoningMode, ModelConfig
+from src.config.constants import AUTO_MODEL_ID, ReasoningMode, ModelConfig
 from src.core.reasoner import AdvancedReasoner
 from src.core.prompt_engine import PromptEngine
 from src.utils.logger import logger
@@ -126,12 +126,19 @@ class UIComponents:
         """
         ℹ️ GENERATE SYSTEM INFO HTML
         """
+        pool = reasoner.client_manager.get_pool_stats()
+        connections = (f"{pool['active']} active / {pool['idle']} idle" if pool['pool_stats']
+                       else "connection counts unavailable")
+        keys = reasoner.client_manager.pool.get_stats()
         return f"""
         **Session ID:** `{reasoner.session_id}`  
         **Environment:** `{AppConfig.ENV}`  
         **Cache Size:** {AppConfig.CACHE_SIZE} entries  
         **Cache TTL:** {AppConfig.CACHE_TTL}s  
+        **Cache Shards:** {AppConfig.CACHE_SHARDS}  
         **Rate Limit:** {AppConfig.RATE_LIMIT_REQUESTS} req/{AppConfig.RATE_LIMIT_WINDOW}s  
+        **API Keys:** {len(keys)} ({sum(1 for key in keys if not key['ejected_for'])} in rotation)  
+        **Connection Pool:** {connections} of {pool['max_connections']} ({pool['utilization']}%, {'HTTP/2' if pool['http2'] else 'HTTP/1.1'})  
         **Max History:** {AppConfig.MAX_HISTORY_LENGTH} messages  
         **Available Models:** {len(ModelConfig)} models  
         **Reasoning Modes:** {len(ReasoningMode)} modes
@@ -148,11 +155,14 @@ class UIComponents:
         | **Environment** | `{AppConfig.ENV}` |
         | **Debug Mode** | `{AppConfig.DEBUG}` |
         | **Max History Length** | {AppConfig.MAX_HISTORY_LENGTH} messages |
+        | **Context Budget** | {AppConfig.CONTEXT_MAX_PROMPT_TOKENS} prompt tokens max (less on small-context models) |
         | **Max Conversation Storage** | {AppConfig.MAX_CONVERSATION_STORAGE} conversations |
         | **Cache Size** | {AppConfig.CACHE_SIZE} entries |
         | **Cache TTL** | {AppConfig.CACHE_TTL} seconds |
         | **Rate Limit** | {AppConfig.RATE_LIMIT_REQUESTS} requests per {AppConfig.RATE_LIMIT_WINDOW}s |
         | **Request Timeout** | {AppConfig.REQUEST_TIMEOUT} seconds |
+        | **Connect Timeout** | {AppConfig.HTTP_CONNECT_TIMEOUT} seconds |
+        | **HTTP Pool** | {AppConfig.HTTP_MAX_CONNECTIONS} connections, {AppConfig.HTTP_MAX_KEEPALIVE} kept alive for {AppConfig.HTTP_KEEPALIVE_EXPIRY}s |
         | **Max Retries** | {AppConfig.MAX_RETRIES} attempts |
         | **Export Directory** | `{AppConfig.EXPORT_DIR}` |
         | **Backup Directory** | `{AppConfig.BACKUP_DIR}` |
@@ -172,5 +182,5 @@ class UIComponents:
     
     @staticmethod
     def get_model_choices() -> list:
-        """Get model choices"""
-        return [m.model_id for m in ModelConfig]
+        """Get model choices ("auto" lets the router pick per request)"""
+        return [AUTO_MODEL_ID] + [m.model_id for m in ModelConfig]
@@ -19,42 +19,83 @@ class EventHandlers:
         self.reasoner = reasoner
         self.components = UIComponents()
     
+    INPUT_ERROR = "⚠️ **Input Error:** Please enter a message before submitting."
+    
+    def _open_turn(self, message, history) -> Tuple[list, bool]:
+        """
+        💬 APPEND THE USER'S MESSAGE
+        Returns (history, valid); an empty message gets an input error as the reply instead
+        """
+        history = history or []
+        if not message or not message.strip():
+            history.append({"role": "assistant", "content": self.INPUT_ERROR})
+            return history, False
+        
+        history.append({"role": "user", "content": message})
+        return history, True
+    
+    @staticmethod
+    def _request(message, history, mode, critique, model_name, temp, tokens, template, cache) -> tuple:
+        """Arguments for the reasoner's generate calls; ``history`` ends with the reply being streamed"""
+        return (message, history[:-1], model_name, ReasoningMode(mode),
+                critique, temp, tokens, template, cache)
+    
+    def _fail_turn(self, history, error: Exception, handler: str) -> list:
+        """Replace the reply being streamed with the error"""
+        error_msg = f"❌ **Unexpected Error:** {str(error)}\n\nPlease try again or check the logs for details."
+        history[-1]["content"] = error_msg
+        logger.error(f"Error in {handler}: {error}", exc_info=True)
+        return history
+    
     def process_message(self, message, history, mode, critique, model_name, 
                        temp, tokens, template, cache):
         """
         🔄 PROCESS MESSAGE WITH STREAMING
         """
-        if not message or not message.strip():
-            history = history or []
-            history.append({
-                "role": "assistant", 
-                "content": "⚠️ **Input Error:** Please enter a message before submitting."
-            })
-            return history, self.components.get_metrics_html(self.reasoner)
+        history, valid = self._open_turn(message, history)
+        yield history, self.components.get_metrics_html(self.reasoner)
+        if not valid:
+            return
         
-        history = history or []
-        mode_enum = ReasoningMode(mode)
+        # Add empty assistant message for streaming
+        history.append({"role": "assistant", "content": ""})
+        
+        # Updates arrive coalesced; metrics only change once the response completes
+        metrics_html = self.components.get_metrics_html(self.reasoner)
+        
+        try:
+            request = self._request(message, history, mode, critique, model_name, temp, tokens, template, cache)
+            for response in self.reasoner.generate_response(*request):
+                history[-1]["content"] = response
+                yield history, metrics_html
+        except Exception as e:
+            self._fail_turn(history, e, "process_message")
         
-        # Add user message
-        history.append({"role": "user", "content": message})
         yield history, self.components.get_metrics_html(self.reasoner)
+    
+    async def aprocess_message(self, message, history, mode, critique, model_name,
+                               temp, tokens, template, cache):
+        """
+        🔄 PROCESS MESSAGE WITH ASYNC STREAMING
+        Runs on Gradio's event loop instead of holding a worker thread
+        """
+        history, valid = self._open_turn(message, history)
+        metrics_html = self.components.get_metrics_html(self.reasoner)
+        yield history, metrics_html
+        if not valid:
+            return
         
-        # Add empty assistant message for streaming
         history.append({"role": "assistant", "content": ""})
         
         try:
-            for response in self.reasoner.generate_response(
-                message, history[:-1], model_name, mode_enum, 
-                critique, temp, tokens, template, cache
-            ):
+            request = self._request(message, history, mode, critique, model_name, temp, tokens, template, cache)
+            async for response in self.reasoner.agenerate_response(*request):
                 history[-1]["content"] = response
-                yield history, self.components.get_metrics_html(self.reasoner)
-                
+                yield history, metrics_html
         except Exception as e:
-            error_msg = f"❌ **Unexpected Error:** {str(e)}\n\nPlease try again or check the logs for details."
-            history[-1]["content"] = error_msg
-            logger.error(f"Error in process_message: {e}", exc_info=True)
-            yield history, self.components.get_metrics_html(self.reasoner)
+            self._fail_turn(history, e, "aprocess_message")
+        
+        yield history, self.components.get_metrics_html(self.reasoner)
     
     def reset_chat(self):
         """🗑️ RESET CHAT"""
@@ -138,14 +179,26 @@ class EventHandlers:
             <p><strong>⚠️  Errors:</strong> {analytics['error_count']}</p>
             </div>"""
             
+            cache_stats = self.reasoner.cache.get_stats()
             cache_html = f"""**💾 Cache Performance:**
-- ✅ Hits: {analytics['cache_hits']}
+- ✅ Exact Hits: {analytics['cache_hits']}
+- 🔎 Fuzzy Hits: {analytics['cache_fuzzy_hits']}
 - ❌ Misses: {analytics['cache_misses']}
 - 📊 Total: {analytics['cache_hits'] + analytics['cache_misses']}
-- 📈 Hit Rate: {self.reasoner.cache.get_stats()['hit_rate']}%
+- 📈 Hit Rate: {cache_stats['hit_rate']}% exact / {cache_stats['fuzzy_hit_rate']}% fuzzy
             """
+            prefix = analytics['prefix_cache']
+            if prefix['calls']:
+                cache_html += (f"\n**🧩 Provider Prefix Cache:** {prefix['hit_rate']}% of calls, "
+                               f"{prefix['token_hit_rate']}% of prompt tokens")
+                if prefix['ttft_saved'] is not None:
+                    cache_html += f"\n- ⚡ First token {prefix['ttft_saved'] * 1000:.0f} ms sooner on a hit"
             
             model_dist_html = f"**🤖 Most Used Model:** {analytics['most_used_model']}"
+            model_dist_html += f"\n\n**🧭 Routing:** {analytics['auto_routed']} auto, {analytics['model_fallbacks']} fallbacks"
+            for model_id, latency in analytics['model_latency'].items():
+                if latency['samples']:
+                    model_dist_html += f"\n- `{model_id}`: p50 {latency['p50']}s / p95 {latency['p95']}s to first token"
             mode_dist_html = f"**🧠 Most Used Mode:** {analytics['most_used_mode']}"
             
             return analytics_html, cache_html, model_dist_html, mode_dist_html
@@ -175,7 +228,7 @@ class EventHandlers:
     def clear_cache_action(self):
         """🗑️ CLEAR CACHE"""
         try:
-            self.reasoner.cache.clear()
+            self.reasoner.clear_cache()
             logger.info("Cache cleared by user")
             return "✅ **Success:** Cache cleared successfully!"
         except Exception as e:
@@ -4,7 +4,10 @@ Utilities package initialization
 from .logger import logger, setup_logging
 from .decorators import handle_groq_errors, with_rate_limit, timer_decorator
 from .validators import validate_input, validate_temperature, validate_max_tokens
-from .helpers import generate_session_id, format_timestamp, truncate_text
+from .helpers import generate_session_id, format_timestamp, truncate_text, normalize_query
+from .streaming import StreamBuffer, coalesce_stream, acoalesce_stream
+from .tokens import TokenCounter, estimate_tokens, estimate_messages_tokens, token_counter
+from .rate_limit_headers import parse_rate_limit_headers, advertised_wait, QuotaExceededError
 
 __all__ = [
     'logger',
@@ -17,5 +20,16 @@ __all__ = [
     'validate_max_tokens',
     'generate_session_id',
     'format_timestamp',
-    'truncate_text'
+    'truncate_text',
+    'normalize_query',
+    'StreamBuffer',
+    'coalesce_stream',
+    'acoalesce_stream',
+    'estimate_tokens',
+    'estimate_messages_tokens',
+    'TokenCounter',
+    'token_counter',
+    'parse_rate_limit_headers',
+    'advertised_wait',
+    'QuotaExceededError'
 ]
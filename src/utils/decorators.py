@@ -1,18 +1,143 @@
 """
 Utility decorators for error handling and timing
 """
+import asyncio
+import inspect
 import time
 from functools import wraps
-from typing import Callable, Any
+from typing import AsyncGenerator, Callable, Generator, List, Any, Optional
 import groq
+from src.utils.rate_limit_headers import QuotaExceededError, advertised_wait
 from src.utils.logger import logger
 
 
-def handle_groq_errors(max_retries: int = 3, retry_delay: float = 1.0) -> Callable:
+def _retry_wait(error: Exception, attempt: int, max_retries: int, retry_delay: float,
+                max_wait: Optional[float] = None) -> float:
+    """
+    Classify a Groq error: return seconds to wait before retrying,
+    or raise for errors that retrying cannot fix.
+    Rate-limit retries wait for the reset the server advertises, when it sends one;
+    a reset further away than ``max_wait`` raises QuotaExceededError instead
+    """
+    wait_time = retry_delay * (2 ** attempt)
+    
+    if isinstance(error, QuotaExceededError):
+        logger.error(f"🚫 {error}")
+        raise error
+    if isinstance(error, groq.RateLimitError):
+        response = getattr(error, 'response', None)
+        advertised = advertised_wait(response.headers) if response is not None else None
+        if advertised is not None:
+            wait_time = advertised
+        if max_wait is not None and wait_time > max_wait:
+            logger.error(f"🚫 Rate limit resets in {wait_time:.0f}s, more than the {max_wait:.0f}s we wait")
+            raise QuotaExceededError.after(wait_time) from error
+        logger.warning(f"⏳ Rate limit hit. Waiting {wait_time:.1f}s... (Attempt {attempt + 1}/{max_retries})")
+    elif isinstance(error, groq.APIConnectionError):
+        logger.warning(f"🔌 Connection error. Retrying in {wait_time:.1f}s... (Attempt {attempt + 1}/{max_retries})")
+    elif isinstance(error, groq.AuthenticationError):
+        logger.error(f"🔑 Authentication failed: {error}")
+        raise ValueError("Invalid GROQ_API_KEY. Please check your API key.") from error
+    elif isinstance(error, groq.BadRequestError):
+        logger.error(f"❌ Invalid request: {error}")
+        raise ValueError(f"Invalid request parameters: {str(error)}") from error
+    else:
+        logger.error(f"❌ Unexpected error: {error}", exc_info=True)
+    
+    return wait_time
+
+
+def _record_retry(args: tuple, metrics_attr: Optional[str], backoff: float, resumed: bool) -> None:
+    """Report a retry to the decorated method's metrics object, if it names one"""
+    metrics = getattr(args[0], metrics_attr, None) if metrics_attr and args else None
+    if metrics is not None:
+        metrics.record_retry(backoff, resumed)
+
+
+def handle_groq_errors(max_retries: int = 3, retry_delay: float = 1.0, max_wait: Optional[float] = None,
+                       metrics_attr: Optional[str] = None, resume: bool = False) -> Callable:
     """
     🛡️ GROQ API ERROR HANDLER WITH EXPONENTIAL BACKOFF
+    Generator functions (sync and async) are retried transparently until
+    their first item. After partial output an error is re-raised, unless
+    ``resume`` is set: the call is then retried with ``resume_from=<output
+    so far>`` so the function can request just the continuation.
+    Rate limits that reset more than ``max_wait`` seconds away (e.g. a daily
+    quota) fail fast with QuotaExceededError instead of sleeping.
+    ``metrics_attr`` names an object whose
+    ``record_retry(backoff, resumed)`` is called for every retry.
     """
     def decorator(func: Callable) -> Callable:
+        if inspect.isasyncgenfunction(func):
+            @wraps(func)
+            async def async_gen_wrapper(*args, **kwargs) -> AsyncGenerator[Any, None]:
+                last_exception = None
+                emitted: List[Any] = []
+                
+                for attempt in range(max_retries):
+                    call_kwargs = dict(kwargs, resume_from="".join(emitted)) if emitted else kwargs
+                    stream = func(*args, **call_kwargs)
+                    started = False
+                    try:
+                        async for item in stream:
+                            started = True
+                            if resume:
+                                emitted.append(item)
+                            yield item
+                        return
+                    except Exception as e:
+                        if started and not resume:
+                            raise
+                        last_exception = e
+                        wait_time = _retry_wait(e, attempt, max_retries, retry_delay, max_wait)
+                        if attempt < max_retries - 1:
+                            backoff_start = time.monotonic()
+                            await asyncio.sleep(wait_time)
+                            _record_retry(args, metrics_attr, time.monotonic() - backoff_start, bool(emitted))
+                    finally:
+                        await stream.aclose()
+                
+                error_msg = f"Failed after {max_retries} attempts: {str(last_exception)}"
+                logger.error(error_msg)
+                raise Exception(error_msg) from last_exception
+            
+            return async_gen_wrapper
+        
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def gen_wrapper(*args, **kwargs) -> Generator[Any, None, None]:
+                last_exception = None
+                emitted: List[Any] = []
+                
+                for attempt in range(max_retries):
+                    call_kwargs = dict(kwargs, resume_from="".join(emitted)) if emitted else kwargs
+                    stream = func(*args, **call_kwargs)
+                    started = False
+                    try:
+                        for item in stream:
+                            started = True
+                            if resume:
+                                emitted.append(item)
+                            yield item
+                        return
+                    except Exception as e:
+                        if started and not resume:
+                            raise
+                        last_exception = e
+                        wait_time = _retry_wait(e, attempt, max_retries, retry_delay, max_wait)
+                        if attempt < max_retries - 1:
+                            backoff_start = time.monotonic()
+                            time.sleep(wait_time)
+                            _record_retry(args, metrics_attr, time.monotonic() - backoff_start, bool(emitted))
+                    finally:
+                        stream.close()
+                
+                error_msg = f"Failed after {max_retries} attempts: {str(last_exception)}"
+                logger.error(error_msg)
+                raise Exception(error_msg) from last_exception
+            
+            return gen_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             last_exception = None
@@ -20,33 +145,13 @@ def handle_groq_errors(max_retries: int = 3, retry_delay: float = 1.0) -> Callab
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
-                    
-                except groq.RateLimitError as e:
-                    last_exception = e
-                    wait_time = retry_delay * (2 ** attempt)
-                    logger.warning(f"⏳ Rate limit hit. Waiting {wait_time:.1f}s... (Attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                    
-                except groq.APIConnectionError as e:
-                    last_exception = e
-                    wait_time = retry_delay * (2 ** attempt)
-                    logger.warning(f"🔌 Connection error. Retrying in {wait_time:.1f}s... (Attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                    
-                except groq.AuthenticationError as e:
-                    logger.error(f"🔑 Authentication failed: {e}")
-                    raise ValueError("Invalid GROQ_API_KEY. Please check your API key.") from e
-                    
-                except groq.BadRequestError as e:
-                    logger.error(f"❌ Invalid request: {e}")
-                    raise ValueError(f"Invalid request parameters: {str(e)}") from e
-                    
                 except Exception as e:
                     last_exception = e
-                    logger.error(f"❌ Unexpected error: {e}", exc_info=True)
-                    if attempt == max_retries - 1:
-                        break
-                    time.sleep(retry_delay * (2 ** attempt))
+                    wait_time = _retry_wait(e, attempt, max_retries, retry_delay, max_wait)
+                    if attempt < max_retries - 1:
+                        backoff_start = time.monotonic()
+                        time.sleep(wait_time)
+                        _record_retry(args, metrics_attr, time.monotonic() - backoff_start, False)
             
             error_msg = f"Failed after {max_retries} attempts: {str(last_exception)}"
             logger.error(error_msg)
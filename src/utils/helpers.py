@@ -2,6 +2,8 @@
 Helper utility functions
 """
 import hashlib
+import re
+import unicodedata
 import uuid
 from datetime import datetime
 from typing import Optional
@@ -35,10 +37,18 @@ def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
     return text[:max_length - len(suffix)] + suffix
 
 
+def normalize_query(text: str) -> str:
+    """
+    🧽 NORMALIZE QUERY FOR CACHE LOOKUPS
+    Unicode (NFKC) folding, case folding and whitespace collapsing
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
 def sanitize_filename(filename: str) -> str:
     """
     🧹 SANITIZE FILENAME
     """
-    import re
     filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
     return filename[:255]
@@ -0,0 +1,87 @@
+"""
+Parsing of Groq rate-limit response headers
+"""
+import re
+from typing import Any, Dict, Mapping, Optional
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_duration(value: Any) -> Optional[float]:
+    """Seconds in a rate-limit reset value such as "7.66s", "2m59.56s", "120ms" or "30" """
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(text)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_SECONDS[unit] for number, unit in parts)
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Dict[str, Optional[float]]:
+    """
+    📨 READ GROQ RATE-LIMIT HEADERS
+    Groq reports requests per day and tokens per minute; values missing
+    from the response are None
+    """
+    def number(name: str) -> Optional[float]:
+        value = headers.get(name)
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+    
+    return {
+        'remaining_requests': number('x-ratelimit-remaining-requests'),
+        'reset_requests': parse_duration(headers.get('x-ratelimit-reset-requests')),
+        'limit_tokens': number('x-ratelimit-limit-tokens'),
+        'remaining_tokens': number('x-ratelimit-remaining-tokens'),
+        'reset_tokens': parse_duration(headers.get('x-ratelimit-reset-tokens')),
+        'retry_after': parse_duration(headers.get('retry-after'))
+    }
+
+
+def advertised_wait(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    ⏳ SECONDS THE SERVER ASKS US TO WAIT AFTER A 429
+    retry-after if sent, otherwise the reset time of whichever budget is exhausted
+    """
+    limits = parse_rate_limit_headers(headers)
+    if limits['retry_after'] is not None:
+        return limits['retry_after']
+    
+    waits = [
+        limits[reset] for remaining, reset in (('remaining_requests', 'reset_requests'),
+                                               ('remaining_tokens', 'reset_tokens'))
+        if limits[reset] is not None and not limits[remaining]
+    ]
+    return max(waits) if waits else None
+
+
+def describe_wait(seconds: float) -> str:
+    """Human-readable duration for a rate-limit reset ("45s", "12m", "3h05m")"""
+    if seconds >= 3600:
+        return f"{int(seconds // 3600)}h{int(seconds % 3600 // 60):02d}m"
+    if seconds >= 60:
+        return f"{int(seconds // 60)}m"
+    return f"{seconds:.0f}s"
+
+
+class QuotaExceededError(RuntimeError):
+    """
+    🚫 A RATE LIMIT THAT WON'T RESET SOON ENOUGH TO WAIT FOR
+    ``retry_after`` is the number of seconds until the budget is back (None if unknown)
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+    
+    @classmethod
+    def after(cls, seconds: Optional[float], budget: str = "request") -> "QuotaExceededError":
+        when = f"resets in {describe_wait(seconds)}" if seconds else "is exhausted"
+        return cls(f"Groq {budget} quota {when}. Try again later, or add API keys via GROQ_API_KEYS.", seconds)
@@ -0,0 +1,89 @@
+"""
+Streaming helpers: linear-time accumulation and coalesced UI updates
+"""
+import time
+from typing import AsyncGenerator, AsyncIterable, Callable, Generator, Iterable, List
+
+
+class StreamBuffer:
+    """
+    🧵 APPEND-ONLY TEXT BUFFER
+    Accumulates deltas in a list and only joins when the text is requested,
+    so building an n-character response costs O(n) instead of O(n²)
+    """
+    
+    def __init__(self):
+        self._parts: List[str] = []
+        self._text = ""
+        self._dirty = False
+        self.chars_copied = 0
+    
+    def append(self, delta: str) -> None:
+        """Add a delta to the buffer"""
+        if delta:
+            self._parts.append(delta)
+            self._dirty = True
+    
+    @property
+    def text(self) -> str:
+        """Current full text (joined lazily)"""
+        if self._dirty:
+            self._text = "".join(self._parts)
+            self._parts = [self._text]
+            self._dirty = False
+            self.chars_copied += len(self._text)
+        return self._text
+    
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+def coalesce_stream(deltas: Iterable[str],
+                    interval: float = 0.05,
+                    max_chars: int = 4096,
+                    clock: Callable[[], float] = time.monotonic) -> Generator[str, None, None]:
+    """
+    ⏱️ COALESCE DELTAS INTO CUMULATIVE UPDATES
+    Yields the accumulated text at most once per ``interval`` seconds, or
+    sooner once ``max_chars`` new characters are pending, plus a final flush.
+    An empty delta forces a flush (producers send one before a long pause)
+    """
+    buffer = StreamBuffer()
+    pending = 0
+    last_flush = clock()
+    
+    for delta in deltas:
+        buffer.append(delta)
+        pending += len(delta)
+        now = clock()
+        if pending and (not delta or now - last_flush >= interval or pending >= max_chars):
+            yield buffer.text
+            pending = 0
+            last_flush = now
+    
+    if pending:
+        yield buffer.text
+
+
+async def acoalesce_stream(deltas: AsyncIterable[str],
+                           interval: float = 0.05,
+                           max_chars: int = 4096,
+                           clock: Callable[[], float] = time.monotonic) -> AsyncGenerator[str, None]:
+    """
+    ⏱️ ASYNC VARIANT OF coalesce_stream
+    """
+    buffer = StreamBuffer()
+    pending = 0
+    last_flush = clock()
+    
+    async for delta in deltas:
+        buffer.append(delta)
+        pending += len(delta)
+        now = clock()
+        if pending and (not delta or now - last_flush >= interval or pending >= max_chars):
+            yield buffer.text
+            pending = 0
+            last_flush = now
+    
+    if pending:
+        yield buffer.text
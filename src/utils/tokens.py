@@ -0,0 +1,122 @@
+"""
+Token count estimation
+"""
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+CHARS_PER_TOKEN = 4  # rough average for English text with Llama-family tokenizers
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separator tokens added per chat message
+
+
+def chars_to_tokens(chars: int) -> int:
+    """Estimated tokens for a character count"""
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    🔢 ESTIMATE TOKENS IN A TEXT
+    Cheap character-based estimate, good enough for budgeting
+    """
+    return chars_to_tokens(len(text)) if text else 0
+
+
+def estimate_messages_tokens(messages: List[Dict]) -> int:
+    """
+    🔢 ESTIMATE PROMPT TOKENS FOR A CHAT MESSAGE ARRAY
+    """
+    return sum(estimate_tokens(msg.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+
+
+# Roughly the pre-tokenizer split used by Llama-3/tiktoken-style BPE vocabularies
+_PIECES = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+_CHARS_PER_SUBWORD = 8  # pieces longer than this split into several tokens
+
+
+def count_pieces(text: str) -> int:
+    """Raw token estimate from pre-tokenizer pieces (uncalibrated)"""
+    return sum(1 + (len(piece) - 1) // _CHARS_PER_SUBWORD for piece in _PIECES.findall(text))
+
+
+class TokenCounter:
+    """
+    🔢 CALIBRATED, CACHED TOKEN COUNTER
+    Counts pre-tokenizer pieces (a closer estimate than characters for code,
+    numbers and punctuation) and scales them by a ratio learned from the
+    prompt token counts the API reports. Raw counts are memoized per text,
+    so re-packing a conversation each turn only counts its new messages.
+    """
+    def __init__(self, maxsize: int = 4096, smoothing: float = 0.2):
+        self.maxsize = maxsize
+        self.smoothing = smoothing
+        self.ratio = 1.0
+        self.hits = 0
+        self.misses = 0
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _raw(self, text: str) -> int:
+        with self._lock:
+            count = self._counts.get(text)
+            if count is not None:
+                self._counts.move_to_end(text)
+                self.hits += 1
+                return count
+        
+        count = count_pieces(text)
+        with self._lock:
+            self.misses += 1
+            self._counts[text] = count
+            if len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return count
+    
+    def _raw_messages(self, messages: List[Dict]) -> int:
+        return sum(self._raw(msg.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+    
+    def count(self, text: str) -> int:
+        """
+        🔢 ESTIMATED TOKENS IN A TEXT
+        """
+        return math.ceil(self._raw(text) * self.ratio) if text else 0
+    
+    def count_message(self, message: Dict) -> int:
+        """Estimated tokens for one chat message, including its overhead"""
+        return self.count(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+    
+    def count_messages(self, messages: List[Dict]) -> int:
+        """
+        🔢 ESTIMATED PROMPT TOKENS FOR A CHAT MESSAGE ARRAY
+        """
+        return math.ceil(self._raw_messages(messages) * self.ratio)
+    
+    def calibrate(self, messages: List[Dict], reported_tokens: int) -> None:
+        """
+        📐 LEARN FROM THE PROMPT TOKENS THE API REPORTED FOR ``messages``
+        Moves the scaling ratio a step towards reported/raw (bounded to 0.5-2x)
+        """
+        raw = self._raw_messages(messages)
+        if raw <= 0 or reported_tokens <= 0:
+            return
+        observed = min(2.0, max(0.5, reported_tokens / raw))
+        with self._lock:
+            self.ratio += self.smoothing * (observed - self.ratio)
+    
+    def get_stats(self) -> dict:
+        """
+        📊 GET TOKEN COUNTER STATISTICS
+        """
+        with self._lock:
+            return {
+                'ratio': round(self.ratio, 3),
+                'cached': len(self._counts),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Shared by prompt packing and request budgeting so calibration benefits both
+token_counter = TokenCounter()
@@ -0,0 +1,5 @@
+import importlib.util
+
+# These suites import the app, which needs the groq SDK; without it they are left out instead of erroring
+if importlib.util.find_spec("groq") is None:
+    collect_ignore = ["test_api.py", "test_cache.py", "test_reasoner.py"]
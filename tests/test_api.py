@@ -1,2 +1,222 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.client_pool import GroqClientPool, GroqKey
+from src.api.groq_client import GroqClientManager
+from src.config.settings import AppConfig
+from src.config.constants import ModelConfig
+from src.models.metrics import ConversationMetrics
+from src.services.model_router import ModelRouter
+from src.services.rate_limiter import RateLimiter, TokenRateLimiter
+from src.utils.decorators import handle_groq_errors
+from src.utils.rate_limit_headers import QuotaExceededError, advertised_wait, parse_duration
+
+
 def test_placeholder():
     assert True
+
+
+def test_async_generator_retried_before_first_item():
+    attempts = []
+
+    @handle_groq_errors(max_retries=3, retry_delay=0)
+    async def stream():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("transient")
+        yield "ok"
+
+    async def collect():
+        return [item async for item in stream()]
+
+    assert asyncio.run(collect()) == ["ok"]
+    assert len(attempts) == 2
+
+
+def test_rate_limiter_token_bucket():
+    limiter = RateLimiter(max_requests=2, window_seconds=1)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert not limiter.acquire(timeout=0.1)  # next token is ~0.5s away
+
+    start = time.monotonic()
+    assert limiter.acquire()
+    assert 0.3 < time.monotonic() - start < 1.0
+    assert limiter.get_stats()['throttled'] == 1
+
+
+def test_rate_limiter_async_waiters_are_fifo():
+    limiter = RateLimiter(max_requests=1, window_seconds=0.1)
+    order = []
+
+    async def worker(i):
+        await limiter.aacquire()
+        order.append(i)
+
+    async def main():
+        await asyncio.gather(*(worker(i) for i in range(4)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3]
+
+
+def test_token_rate_limiter_reserves_per_model_and_reconciles():
+    limiter = TokenRateLimiter(tokens_per_minute=1000, overrides={"small": 100})
+    reserved = limiter.reserve("big", 900)
+    assert reserved == 900
+    assert limiter.reserve("big", 500, timeout=0) == 0  # budget exhausted for this model
+    assert limiter.reserve("small", 100, timeout=0) == 100  # other models are unaffected
+
+    limiter.reconcile("big", reserved, 300)  # only 300 were actually used
+    assert limiter.reserve("big", 500, timeout=0) == 500
+    assert limiter.get_stats()["small"]["max_requests"] == 100
+
+
+def test_rate_limit_headers_parsing():
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration("7") == 7.0
+    assert advertised_wait({"retry-after": "3"}) == 3.0
+    assert advertised_wait({
+        "x-ratelimit-remaining-requests": "10", "x-ratelimit-reset-requests": "1h",
+        "x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "7.5s",
+    }) == 7.5
+    assert advertised_wait({"x-ratelimit-remaining-tokens": "100"}) is None
+
+
+def test_rate_limiter_pauses_until_advertised_reset():
+    limiter = RateLimiter(max_requests=100, window_seconds=1)
+    limiter.update_from_headers(remaining=0, reset_after=0.3)
+    assert not limiter.try_acquire()
+    start = time.monotonic()
+    assert limiter.acquire()
+    assert time.monotonic() - start >= 0.25
+
+
+def test_token_rate_limiter_clamps_to_capacity_shrunk_by_headers():
+    limiter = TokenRateLimiter(tokens_per_minute=1000)
+    limiter.update_from_headers("model", remaining=None, reset_after=None, limit=500)
+    assert limiter.reserve("model", 800, timeout=0) == 500  # a full bucket, not a ValueError
+    assert limiter.bucket("model").available_in(800) > 0
+
+
+def test_quota_errors_are_not_retried():
+    attempts = []
+
+    @handle_groq_errors(max_retries=3, retry_delay=0, max_wait=60)
+    def call():
+        attempts.append(1)
+        raise QuotaExceededError.after(7200)
+
+    with pytest.raises(QuotaExceededError, match="resets in 2h00m") as excinfo:
+        call()
+    assert excinfo.value.retry_after == 7200 and len(attempts) == 1
+
+
+def test_sync_generator_retried_before_first_item_and_resumed_after():
+    class Client:
+        def __init__(self):
+            self.calls = []
+            self.metrics = ConversationMetrics()
+
+        @handle_groq_errors(max_retries=3, retry_delay=0, metrics_attr="metrics", resume=True)
+        def stream(self, resume_from=""):
+            self.calls.append(resume_from)
+            if len(self.calls) == 1:
+                raise RuntimeError("connect failed")
+            if not resume_from:
+                yield "Hello "
+                raise RuntimeError("connection dropped")
+            yield "world"
+
+    client = Client()
+    assert list(client.stream()) == ["Hello ", "world"]
+    assert client.calls == ["", "", "Hello "]
+    assert client.metrics.api_retries == 2 and client.metrics.api_resumes == 1
+
+
+def test_sync_generator_error_after_output_raises_without_resume():
+    @handle_groq_errors(max_retries=3, retry_delay=0)
+    def stream():
+        yield "partial"
+        raise RuntimeError("dropped")
+
+    with pytest.raises(RuntimeError):
+        list(stream())
+
+
+def test_client_manager_uses_pooled_http_client(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    GroqClientManager().reset()
+    manager = GroqClientManager()
+    try:
+        stats = manager.get_pool_stats()
+        assert stats["max_connections"] == AppConfig.HTTP_MAX_CONNECTIONS
+        assert stats["active"] == 0 and stats["utilization"] == 0.0
+        assert manager._http_client is not None and manager._async_http_client is not None
+        assert stats["pool_stats"]
+    finally:
+        async_http_client = manager._async_http_client
+        manager.reset()
+    assert async_http_client.is_closed
+
+
+def test_client_pool_routes_to_least_loaded_key_and_ejects():
+    def make_key(name):
+        return GroqKey(name, object(), object(), RateLimiter(10, 60), TokenRateLimiter(1000))
+
+    first, second = make_key("key-0001"), make_key("key-0002")
+    pool = GroqClientPool([first, second])
+    leased = pool.acquire()
+    assert pool.acquire() is not leased  # the other key has nothing in flight
+    pool.release(leased)
+
+    pool.eject(first, 60, "rate limited")
+    assert pool.peek() is second
+    assert pool.has_healthy() and not pool.has_healthy(exclude=[second])
+    assert pool.acquire(exclude=[second]) is None  # ejected keys are never leased
+    assert 59 < pool.available_in(exclude=[second]) <= 60
+    assert first.rate_limiter.try_acquire()  # ejection leaves the key's limiter alone
+
+
+def test_per_model_rate_limit_pauses_only_that_model():
+    import groq
+    from src.core.reasoner import AdvancedReasoner
+
+    def rate_limited(**headers):
+        response = SimpleNamespace(status_code=429, request=None, headers=headers)
+        return groq.RateLimitError("rate limited", response=response, body=None)
+
+    key = GroqKey("key-0001", object(), object(), RateLimiter(10, 60), TokenRateLimiter(1000))
+    reasoner = SimpleNamespace(client_manager=SimpleNamespace(pool=GroqClientPool([key])))
+    tried = []
+    error = rate_limited(**{"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "30s"})
+    assert not AdvancedReasoner._fail_over(reasoner, key, "big", error, tried)
+    assert tried == [key] and reasoner.client_manager.pool.has_healthy()
+    assert key.token_limiter.bucket("big").available_in() > 29
+    assert key.token_limiter.reserve("small", 100, timeout=0) == 100 and key.rate_limiter.try_acquire()
+
+    error = rate_limited(**{"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2h"})
+    AdvancedReasoner._fail_over(reasoner, key, "small", error, [])
+    assert not reasoner.client_manager.pool.has_healthy()
+
+
+def test_model_router_percentiles_fallbacks_and_auto():
+    router = ModelRouter(window=10, cooldown=60, latency_budget=1.0)
+    recommended = ModelConfig.get_recommended().model_id
+    for seconds in [0.2, 0.3, 0.4, 5.0]:
+        router.record_latency(recommended, seconds)
+    assert router.percentile(recommended, 50) == 0.3
+    assert router.percentile(recommended, 95) == 5.0
+
+    assert router.auto(1000) != recommended  # p95 over budget
+    fallbacks = router.fallbacks(recommended, 20000)
+    assert fallbacks and all(ModelConfig.get_by_id(m).max_context >= 20000 for m in fallbacks)
+    assert not any("guard" in m for m in fallbacks)
+
+    router.record_failure(fallbacks[0])
+    assert fallbacks[0] not in router.fallbacks(recommended, 20000)
+    assert router.get_stats()["decisions"] == {"auto": 1}
@@ -1,2 +1,145 @@
+import threading
+
+from src.services.cache_service import ResponseCache, ShardedResponseCache, create_response_cache
+from src.services.single_flight import SingleFlight
+
+
 def test_placeholder():
     assert True
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # refresh "a"
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_expired_entries_are_purged(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.services.cache_service.time.time", lambda: now[0])
+    cache = ResponseCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    now[0] += 10
+    assert cache.purge_expired() == 2
+    assert len(cache) == 0
+
+
+def test_entries_promoted_from_l2_expire_in_time_order(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.services.cache_service.time.time", lambda: now[0])
+    l2 = type("L2", (), {"get": lambda self, key: ("old", 992.0) if key == "old" else None,
+                         "set": lambda self, key, value, timestamp: None})()
+    cache = ResponseCache(maxsize=10, ttl=10, l2=l2)
+    cache.set("new", "new")
+    assert cache.get("old") == "old"  # promoted with its original write time
+    now[0] += 3
+    assert cache.purge_expired() == 1
+    assert cache.get("new") == "new" and "old" not in cache.cache
+
+
+def test_sharded_cache_capacity_matches_maxsize():
+    cache = ShardedResponseCache(maxsize=10, ttl=60, shards=4)
+    assert sorted(shard.maxsize for shard in cache.shards) == [2, 2, 3, 3]
+    assert cache.maxsize == 10
+    assert ShardedResponseCache(maxsize=2, ttl=60, shards=4).num_shards == 2
+
+
+def test_sharded_cache_aggregates_stats():
+    cache = ShardedResponseCache(maxsize=16, ttl=60, shards=4)
+    keys = [f"{i:x}" * 64 for i in range(8)]
+    for key in keys:
+        cache.set(key, key)
+    assert all(cache.get(key) == key for key in keys)
+    assert cache.get("f" * 64) is None
+    stats = cache.get_stats()
+    assert stats['shards'] == 4
+    assert stats['size'] == len(cache) == 8
+    assert (stats['hits'], stats['misses']) == (8, 1)
+    assert len(stats['shard_stats']) == 4
+
+
+def test_create_response_cache_picks_implementation():
+    assert isinstance(create_response_cache(10, 60, 1), ResponseCache)
+    assert isinstance(create_response_cache(10, 60, 4), ShardedResponseCache)
+
+
+def test_persistent_tier_survives_new_l1(tmp_path):
+    from src.services.persistent_cache import SQLiteCacheStore
+
+    store = SQLiteCacheStore(tmp_path / "responses.db", ttl=60)
+    ResponseCache(maxsize=10, ttl=60, l2=store).set("key", "value")
+    store.flush(timeout=5)
+
+    fresh = ResponseCache(maxsize=10, ttl=60, l2=store)
+    assert fresh.get("key") == "value"
+    assert fresh.get_stats()['l2_hits'] == 1
+    assert fresh.get("missing") is None
+    store.close()
+
+
+def test_persistent_tier_recovers_from_a_failed_batch(tmp_path):
+    from src.services.persistent_cache import SQLiteCacheStore
+
+    store = SQLiteCacheStore(tmp_path / "responses.db", ttl=60)
+    store.set("bad", threading.Lock())  # unpicklable: skipped, the rest of the batch is written
+    store.set("good", "value")
+    store.flush(timeout=5)
+    assert store.get("good")[0] == "value" and store.get("bad") is None
+
+    store._queue.put(("broken", "x", None))  # violates NOT NULL: the whole batch rolls back
+    store.set("lost", "value")
+    assert store.flush(timeout=5)  # released despite the failure
+    store.set("after", "value")
+    store.flush(timeout=5)
+    assert store.get("after")[0] == "value"  # no transaction was left open
+    store.close()
+
+
+def test_semantic_index_matches_near_duplicates_within_scope():
+    from src.services.semantic_index import SemanticCacheIndex
+
+    index = SemanticCacheIndex(threshold=0.8)
+    query = "what is the capital of france and why is it historically important?"
+    index.add("scope", query, "key")
+    assert index.lookup("scope", query.rstrip("?"))[0] == "key"
+    assert index.lookup("other-scope", query) is None
+    assert index.lookup("scope", "how do airplanes stay in the air?") is None
+
+
+def test_normalize_query_folds_case_whitespace_and_unicode():
+    from src.utils.helpers import normalize_query
+
+    assert normalize_query("  What IS ＡＩ?\n") == normalize_query("what is ai?")
+
+
+def test_cached_response_round_trips_chunks():
+    from src.models.cached_response import CachedResponse
+
+    cached = CachedResponse.from_chunks(["Hel", "lo ", "world"], [0.1, 0.2, 0.3])
+    assert cached.text == "Hello world"
+    assert list(cached.iter_chunks()) == [("Hel", 0.1), ("lo ", 0.2), ("world", 0.3)]
+
+
+def test_single_flight_followers_share_the_leaders_stream():
+    flights = SingleFlight()
+    flight, leader = flights.join("key")
+    follower_flight, follower_leader = flights.join("key")
+    assert leader and not follower_leader and follower_flight is flight
+
+    received = []
+    follower = threading.Thread(target=lambda: received.extend(follower_flight.subscribe()))
+    follower.start()
+    for chunk in ["a", "b", "c"]:
+        flight.publish(chunk)
+    flights.land(flight, completed=True)
+    follower.join(timeout=5)
+
+    assert received == ["a", "b", "c"]
+    assert flights.join("key")[1]  # a new request after landing leads again